@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+⏱️ Image URL Normalizer Microbenchmark
+======================================
+Times image_urls.large_image_url() against the chain of ten uncompiled
+re.sub calls main.py used to run per image URL, over every Amazon image URL
+found in scraped_data/, and reports URLs where the results differ.
+
+Usage:
+    python benchmark_image_urls.py
+    python benchmark_image_urls.py --rounds 50 --data-dir ../scraped_data
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from typing import Iterable, Set
+
+from image_urls import large_image_url
+
+SCRIPT_DIR = os.path.dirname(__file__)
+DEFAULT_DATA_DIR = os.path.join(SCRIPT_DIR, "..", "scraped_data")
+
+# The previous convert_to_large() in main.py, kept as the baseline
+LEGACY_PATTERNS = [
+    (r'_AC_US\d+_', '_AC_SL1500_'),
+    (r'_AC_SX\d+_', '_AC_SL1500_'),
+    (r'_AC_SY\d+_', '_AC_SL1500_'),
+    (r'_SX\d+_', '_SL1500_'),
+    (r'_SY\d+_', '_SL1500_'),
+    (r'_SS\d+_', '_SL1500_'),
+    (r'_SR\d+,\d+_', '_SL1500_'),
+    (r'_AC_UL\d+_', '_AC_SL1500_'),
+    (r'_AC_SR\d+,\d+_', '_AC_SL1500_'),
+    (r'\._[A-Z]{2}\d+_', '._AC_SL1500_'),
+]
+
+
+def legacy_convert_to_large(url: str) -> str:
+    result = url
+    for pattern, replacement in LEGACY_PATTERNS:
+        result = re.sub(pattern, replacement, result)
+    return result
+
+
+def collect_urls(data_dir: str) -> Set[str]:
+    """Every media-amazon.com URL in the scraped product JSON files"""
+    urls: Set[str] = set()
+
+    def walk(value):
+        if isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+        elif isinstance(value, str) and "media-amazon.com/images/" in value:
+            urls.add(value)
+
+    for path in glob.glob(os.path.join(data_dir, "*.json")):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                walk(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return urls
+
+
+def time_calls(func, urls: Iterable[str], rounds: int) -> float:
+    """Mean microseconds per call"""
+    urls = list(urls)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url in urls:
+            func(url)
+    return (time.perf_counter() - start) / (rounds * len(urls)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image URL normalization")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Directory of scraped product JSON")
+    parser.add_argument("--rounds", type=int, default=20, help="Passes over the URL set")
+    args = parser.parse_args()
+
+    urls = sorted(collect_urls(args.data_dir))
+    if not urls:
+        print(f"❌ No image URLs found in {args.data_dir}")
+        return
+    print(f"🖼️ {len(urls)} unique image URLs from {args.data_dir}\n")
+
+    legacy = time_calls(legacy_convert_to_large, urls, args.rounds)
+    large_image_url.cache_clear()
+    cold = time_calls(large_image_url.__wrapped__, urls, args.rounds)
+    warm = time_calls(large_image_url, urls, args.rounds)
+
+    print(f"  Legacy re.sub chain:     {legacy:7.2f} µs/url")
+    print(f"  Fused regex (uncached):  {cold:7.2f} µs/url  ({legacy / cold:.1f}x)")
+    print(f"  Fused regex (memoized):  {warm:7.2f} µs/url  ({legacy / warm:.1f}x)")
+
+    # Crop tokens are removed on purpose now; everything else must match
+    changed = [url for url in urls
+               if "_CR" not in url and legacy_convert_to_large(url) != large_image_url(url)]
+    if changed:
+        print(f"\n⚠️ {len(changed)} URLs normalize differently:")
+        for url in changed[:10]:
+            print(f"   {url}\n     legacy: {legacy_convert_to_large(url)}\n     fused:  {large_image_url(url)}")
+    else:
+        print("\n✅ Same output as the legacy chain on every URL (crop tokens aside)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+⏱️ Product Page Parse Benchmark
+===============================
+Times parse_product_page() on real pages with the old per-lookup tree walks
+(single_pass=False) and with the single-pass DomIndex (single_pass=True),
+and checks both produce the same product dict.
+
+Pages come from the raw page archive (product pages only) unless HTML files
+are given on the command line.
+
+Usage:
+    python benchmark_parse.py                 # Archived product pages
+    python benchmark_parse.py page1.html ...  # Specific files
+    python benchmark_parse.py --repeat 5 --limit 20
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+from main import parse_product_page
+from page_archive import ASIN_PATTERN, PageArchive
+
+# Fields that legitimately differ between two parses of the same page
+VOLATILE_FIELDS = ("scraped_at",)
+
+
+def load_pages(paths: List[str], limit: int) -> List[Tuple[str, bytes]]:
+    """(url, html) pairs from files or the archive"""
+    pages = []
+    if paths:
+        for path in paths:
+            with open(path, 'rb') as f:
+                # Any /dp/ URL works; the ASIN only feeds the output dict
+                pages.append((f"https://www.amazon.ae/dp/{os.path.basename(path)[:10]}", f.read()))
+    else:
+        for entry, content in PageArchive().iter_pages():
+            if ASIN_PATTERN.search(entry["url"]):
+                pages.append((entry["url"], content))
+    return pages[:limit] if limit else pages
+
+
+def time_parse(url: str, html: bytes, single_pass: bool, repeat: int, backend: Optional[str] = None):
+    """Best-of-N parse time (ms) and the parsed dict"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = parse_product_page(html, url, single_pass=single_pass, backend=backend)
+            timings.append((time.perf_counter() - start) * 1000)
+    if result:
+        for field in VOLATILE_FIELDS:
+            result.pop(field, None)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark product page parsing")
+    parser.add_argument("files", nargs="*", help="HTML files (default: archived product pages)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page, best one counts")
+    parser.add_argument("--limit", type=int, default=0, help="Max pages to benchmark")
+    args = parser.parse_args()
+
+    pages = load_pages(args.files, args.limit)
+    if not pages:
+        print("❌ No pages to benchmark (archive is empty - run a scrape first or pass HTML files)")
+        return
+
+    print(f"⏱️ Benchmarking {len(pages)} pages, best of {args.repeat}\n")
+    before_times, after_times, mismatches = [], [], []
+    for url, html in pages:
+        before, before_result = time_parse(url, html, single_pass=False, repeat=args.repeat)
+        after, after_result = time_parse(url, html, single_pass=True, repeat=args.repeat)
+        before_times.append(before)
+        after_times.append(after)
+        same = before_result == after_result
+        if not same:
+            mismatches.append(url)
+        print(f"  {'✅' if same else '❌'} {url[:70]:70} {before:8.1f}ms → {after:8.1f}ms")
+
+    print(f"\n{'='*60}")
+    print(f"📊 Per-page parse time (median): "
+          f"{statistics.median(before_times):.1f}ms → {statistics.median(after_times):.1f}ms "
+          f"({statistics.median(before_times) / statistics.median(after_times):.2f}x)")
+    print(f"   Total: {sum(before_times):.0f}ms → {sum(after_times):.0f}ms")
+    if mismatches:
+        print(f"❌ {len(mismatches)} pages produced different output:")
+        for url in mismatches:
+            print(f"   {url}")
+    else:
+        print("✅ Identical output on every page")
+
+
+if __name__ == "__main__":
+    main()
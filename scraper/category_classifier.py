@@ -0,0 +1,178 @@
+"""
+🗂️ Category Classifier
+======================
+normalize_category() used to loop over every CATEGORY_MAPPING key (lowering
+both sides each time) and then over every SUBCATEGORY_KEYWORDS keyword for
+each product. CategoryClassifier compiles both tables once into trie-shaped
+matchers and answers the same question in a single scan per string:
+
+    1. Exact mapping of the primary breadcrumb ("Kitchen & Dining - Mugs")
+    2. First mapping key (in table order) found in the breadcrumb, or
+       containing it
+    3. First keyword category (in table order) found in the product title
+    4. "General"
+
+Step 2 depends only on the breadcrumb, so it is memoized; Amazon has a few
+hundred breadcrumbs but every product repeats one. classify_many() scans a
+whole batch of titles in one regex pass for the import scripts.
+
+Usage:
+    classifier = CategoryClassifier(CATEGORY_MAPPING, SUBCATEGORY_KEYWORDS)
+    classifier.classify("Kitchen - Container Sets", "Airtight food storage")
+    classifier.classify_many([(raw_category, title), ...])
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_CATEGORY = "General"
+BREADCRUMB_CACHE_SIZE = 4096
+
+# Joins keys/titles into one haystack; never part of a key or keyword
+SEPARATOR = "\x00"
+
+
+def _trie_pattern(words: Sequence[str]) -> re.Pattern:
+    """Overlapping matcher: at every position, the first word (in the given
+    order) that starts there is captured as group 1.
+
+    Amazon keys share long prefixes ("Home & Kitchen", "Home Décor", ...),
+    so words are grouped by first character to keep the alternation shallow.
+    """
+    branches: Dict[str, List[str]] = {}
+    for word in words:
+        branches.setdefault(word[0], []).append(re.escape(word[1:]))
+    alternatives = []
+    for first, tails in branches.items():
+        alternatives.append(re.escape(first) + "(?:" + "|".join(tails) + ")")
+    return re.compile("(?=(" + "|".join(alternatives) + "))")
+
+
+class CategoryClassifier:
+    """Precompiled breadcrumb/title classifier over one category taxonomy"""
+
+    def __init__(self, mapping: Dict[str, str], keywords: Dict[str, List[str]],
+                 default: str = DEFAULT_CATEGORY, cache_size: int = BREADCRUMB_CACHE_SIZE):
+        """
+        Args:
+            mapping: Breadcrumb name -> category; earlier keys win partial matches
+            keywords: Category -> title keywords; earlier categories win
+            default: Category when nothing matches
+            cache_size: Distinct breadcrumbs to memoize
+        """
+        self.mapping = dict(mapping)
+        self.default = default
+
+        # Step 2: mapping keys, lowered once, ranked by table order
+        self._keys = list(self.mapping)
+        lowered = [key.lower() for key in self._keys]
+        self._key_rank = {}
+        for rank, key in enumerate(lowered):
+            self._key_rank.setdefault(key, rank)
+        self._key_pattern = _trie_pattern(lowered)
+        self._key_haystack = SEPARATOR.join(lowered)
+        self._key_offsets = []
+        offset = 0
+        for key in lowered:
+            self._key_offsets.append(offset)
+            offset += len(key) + len(SEPARATOR)
+
+        # Step 3: title keywords, ranked by their category's table order
+        self._categories = list(keywords)
+        ranked = []
+        for rank, category in enumerate(self._categories):
+            for keyword in keywords[category]:
+                ranked.append((rank, keyword.lower()))
+        self._keyword_rank = {}
+        for rank, keyword in ranked:
+            self._keyword_rank.setdefault(keyword, rank)
+        self._keyword_pattern = _trie_pattern([keyword for _, keyword in ranked])
+
+        self._breadcrumb_category = lru_cache(maxsize=cache_size)(self._match_breadcrumb)
+
+    def classify(self, raw_category: Optional[str], title: str = "") -> str:
+        """Category for a breadcrumb ("Primary - Subcategory") and product title"""
+        category = self.breadcrumb_category(raw_category)
+        if category is not None:
+            return category
+        return self.title_category(title) or self.default
+
+    def classify_many(self, items: Iterable[Tuple[Optional[str], str]]) -> List[str]:
+        """classify() for many (raw_category, title) pairs at once
+
+        Breadcrumbs go through the memoized lookup; the titles still left
+        over are scanned together in one pass.
+        """
+        results: List[Optional[str]] = []
+        pending: List[int] = []
+        titles: List[str] = []
+        for raw_category, title in items:
+            category = self.breadcrumb_category(raw_category)
+            if category is None:
+                pending.append(len(results))
+                titles.append((title or "").lower().replace(SEPARATOR, " "))
+            results.append(category)
+
+        if titles:
+            for index, category in zip(pending, self._scan_titles(titles)):
+                results[index] = category or self.default
+        return results
+
+    def breadcrumb_category(self, raw_category: Optional[str]) -> Optional[str]:
+        """Mapped category for a breadcrumb, or None to fall back on the title"""
+        return self._breadcrumb_category((raw_category or DEFAULT_CATEGORY).strip())
+
+    def title_category(self, title: str) -> Optional[str]:
+        """Category of the highest-ranked keyword in the title, or None"""
+        best = None
+        for match in self._keyword_pattern.finditer((title or "").lower()):
+            rank = self._keyword_rank[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return None if best is None else self._categories[best]
+
+    def cache_info(self):
+        """Breadcrumb cache statistics"""
+        return self._breadcrumb_category.cache_info()
+
+    def _match_breadcrumb(self, raw_category: str) -> Optional[str]:
+        # Exact match on the primary breadcrumb
+        primary = raw_category.split(" - ")[0].strip() if " - " in raw_category else raw_category
+        if primary in self.mapping:
+            return self.mapping[primary]
+
+        # First key (table order) that is inside the breadcrumb or contains it
+        raw_lower = raw_category.lower()
+        best = None
+        for match in self._key_pattern.finditer(raw_lower):
+            rank = self._key_rank[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+        if SEPARATOR not in raw_lower:
+            position = self._key_haystack.find(raw_lower)
+            if position != -1:
+                rank = bisect_right(self._key_offsets, position) - 1
+                if best is None or rank < best:
+                    best = rank
+        return None if best is None else self.mapping[self._keys[best]]
+
+    def _scan_titles(self, titles: List[str]) -> List[Optional[str]]:
+        """title_category() for each title, in one regex pass over all of them"""
+        haystack = SEPARATOR.join(titles)
+        best: List[Optional[int]] = [None] * len(titles)
+        index = 0
+        end = len(titles[0])
+        for match in self._keyword_pattern.finditer(haystack):
+            # Matches come in haystack order, so the owning title only moves forward
+            start = match.start()
+            while start > end:
+                index += 1
+                end += len(titles[index]) + len(SEPARATOR)
+            rank = self._keyword_rank[match.group(1)]
+            if best[index] is None or rank < best[index]:
+                best[index] = rank
+        return [None if rank is None else self._categories[rank] for rank in best]
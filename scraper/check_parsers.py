@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+🧪 Parser Backend Check
+=======================
+Parses every archived product page with each installed HTML parser backend
+(see parser_backends.py) and checks the extracted product dicts are
+identical to the html.parser reference, with per-backend parse times.
+
+Run this before changing HTML_PARSER.
+
+Usage:
+    python check_parsers.py                  # Archived product pages
+    python check_parsers.py page1.html ...   # Specific files
+    python check_parsers.py --limit 20 --show-diff
+"""
+
+import argparse
+import statistics
+
+from benchmark_parse import load_pages, time_parse
+from parser_backends import FALLBACK_BACKEND, available_backends
+
+
+def diff_keys(reference: dict, other: dict) -> list:
+    """Top-level fields whose values differ"""
+    if reference is None or other is None:
+        return ["<page not parsed>"]
+    keys = set(reference) | set(other)
+    return sorted(key for key in keys if reference.get(key) != other.get(key))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends on archived pages")
+    parser.add_argument("files", nargs="*", help="HTML files (default: archived product pages)")
+    parser.add_argument("--limit", type=int, default=0, help="Max pages to check")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per page for timing")
+    parser.add_argument("--show-diff", action="store_true", help="Print differing fields")
+    args = parser.parse_args()
+
+    pages = load_pages(args.files, args.limit)
+    if not pages:
+        print("❌ No pages to check (archive is empty - run a scrape first or pass HTML files)")
+        return
+
+    backends = available_backends()
+    print(f"🧪 Checking {len(pages)} pages with: {', '.join(backends)}\n")
+
+    timings = {backend: [] for backend in backends}
+    mismatches = {backend: 0 for backend in backends}
+    for url, html in pages:
+        results = {}
+        for backend in backends:
+            elapsed, results[backend] = time_parse(url, html, single_pass=True,
+                                                   repeat=args.repeat, backend=backend)
+            timings[backend].append(elapsed)
+
+        reference = results[FALLBACK_BACKEND]
+        for backend in backends:
+            if backend == FALLBACK_BACKEND:
+                continue
+            fields = diff_keys(reference, results[backend])
+            if fields:
+                mismatches[backend] += 1
+                print(f"  ❌ {backend:12} {url[:70]}")
+                if args.show_diff:
+                    for field in fields:
+                        print(f"      {field}: {str(reference and reference.get(field))[:80]!r}")
+                        print(f"      {'':{len(field)}}  {str(results[backend] and results[backend].get(field))[:80]!r}")
+
+    print(f"\n{'='*60}")
+    for backend in backends:
+        status = "reference" if backend == FALLBACK_BACKEND else (
+            "✅ identical" if not mismatches[backend] else f"❌ {mismatches[backend]} pages differ")
+        print(f"  {backend:12} median {statistics.median(timings[backend]):7.1f}ms   {status}")
+
+
+if __name__ == "__main__":
+    main()
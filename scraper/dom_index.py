@@ -0,0 +1,195 @@
+"""
+🗂️ Single-Pass DOM Index
+========================
+Walks a parsed page once and files every element under its tag name, id,
+classes and data-hook. DomIndex answers the page-level find / find_all /
+select calls made by the product extractors in main.py from those tables,
+so a product page is traversed once instead of once per lookup (dozens of
+full-tree walks over a ~1MB Amazon page before).
+
+Lookups it cannot answer from the index (regex / callable matchers,
+attribute or pseudo selectors, ...) fall back to the wrapped soup, so the
+results are always identical to calling the soup directly. Lookups on the
+returned tags (inside a review card, a table row, ...) are ordinary
+BeautifulSoup calls on small subtrees.
+
+Usage:
+    page = DomIndex(make_soup(html))
+    page.find("span", id="productTitle")
+    page.select("#altImages li img")
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+# "tag#id.class1.class2" - the only compound selector syntax served from the index
+COMPOUND_PATTERN = re.compile(r'^([a-zA-Z][\w-]*)?((?:[#.][\w-]+)*)$')
+SIMPLE_PART_PATTERN = re.compile(r'([#.])([\w-]+)')
+
+# find() arguments that are not attribute filters; lookups using them go to the soup
+SEARCH_ARGUMENTS = frozenset({"string", "text", "recursive", "limit", "attrs"})
+
+Compound = Tuple[Optional[str], Optional[str], Tuple[str, ...]]  # (tag name, id, classes)
+
+
+class DomIndex:
+    """Page-level lookups answered from one traversal of the tree"""
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+        self.by_name: Dict[str, List[Tag]] = defaultdict(list)
+        self.by_id: Dict[str, List[Tag]] = defaultdict(list)
+        self.by_class: Dict[str, List[Tag]] = defaultdict(list)
+        self.by_hook: Dict[str, List[Tag]] = defaultdict(list)
+        self._position: Dict[int, int] = {}
+        self.fallbacks = 0  # Lookups that had to walk the soup
+
+        position = 0
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                continue
+            self._position[id(node)] = position
+            position += 1
+
+            self.by_name[node.name].append(node)
+            attrs = node.attrs
+            if "id" in attrs:
+                self.by_id[attrs["id"]].append(node)
+            if "class" in attrs:
+                for cls in attrs["class"]:
+                    self.by_class[cls].append(node)
+            if "data-hook" in attrs:
+                self.by_hook[attrs["data-hook"]].append(node)
+
+    # ------------------------------------------------------------------
+    # BeautifulSoup-compatible API
+    # ------------------------------------------------------------------
+    def find(self, name=None, attrs=None, **kwargs) -> Optional[Tag]:
+        """Same as soup.find(...) for the page"""
+        candidates = self._candidates(name, attrs, kwargs)
+        if candidates is None:
+            self.fallbacks += 1
+            return self.soup.find(name, attrs or {}, **kwargs)
+        return candidates[0] if candidates else None
+
+    def find_all(self, name=None, attrs=None, **kwargs) -> List[Tag]:
+        """Same as soup.find_all(...) for the page"""
+        candidates = self._candidates(name, attrs, kwargs)
+        if candidates is None:
+            self.fallbacks += 1
+            return self.soup.find_all(name, attrs or {}, **kwargs)
+        return candidates
+
+    def select(self, selector: str) -> List[Tag]:
+        """Same as soup.select(...) for descendant-combinator selectors"""
+        chains = []
+        for group in selector.split(","):
+            chain = [self._parse_compound(part) for part in group.split()]
+            if not chain or None in chain:
+                self.fallbacks += 1
+                return self.soup.select(selector)
+            chains.append(chain)
+
+        matches = {}
+        for chain in chains:
+            for tag in self._lookup(chain[-1]):
+                if self._matches_ancestors(tag, chain[:-1]):
+                    matches[id(tag)] = tag
+        return sorted(matches.values(), key=lambda tag: self._position[id(tag)])
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _candidates(self, name, attrs, kwargs) -> Optional[List[Tag]]:
+        """Matching tags in document order, or None if the index can't tell"""
+        if SEARCH_ARGUMENTS.intersection(kwargs):
+            return None
+        criteria = dict(attrs or {})
+        for key, value in kwargs.items():
+            criteria["class" if key == "class_" else key] = value
+        if name is not None and not isinstance(name, str):
+            return None
+        if any(not isinstance(value, str) for value in criteria.values()):
+            return None
+        if " " in criteria.get("class", ""):
+            return None  # Whole class-string matching; leave it to bs4
+
+        if "id" in criteria:
+            pool = self.by_id.get(criteria["id"], [])
+        elif "data-hook" in criteria:
+            pool = self.by_hook.get(criteria["data-hook"], [])
+        elif "class" in criteria:
+            pool = self.by_class.get(criteria["class"], [])
+        elif name is not None:
+            pool = self.by_name.get(name, [])
+        else:
+            return None
+
+        return [tag for tag in pool if self._matches(tag, name, criteria)]
+
+    @staticmethod
+    def _matches(tag: Tag, name: Optional[str], criteria: Dict[str, str]) -> bool:
+        if name is not None and tag.name != name:
+            return False
+        for key, value in criteria.items():
+            actual = tag.attrs.get(key)
+            if key == "class":
+                if actual is None or value not in actual:
+                    return False
+            elif actual != value:
+                return False
+        return True
+
+    @staticmethod
+    def _parse_compound(text: str) -> Optional[Compound]:
+        match = COMPOUND_PATTERN.match(text)
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+        tag_id = None
+        classes = []
+        for kind, value in SIMPLE_PART_PATTERN.findall(match.group(2)):
+            if kind == "#":
+                if tag_id is not None:
+                    return None
+                tag_id = value
+            else:
+                classes.append(value)
+        name = match.group(1).lower() if match.group(1) else None
+        return name, tag_id, tuple(classes)
+
+    def _lookup(self, compound: Compound) -> List[Tag]:
+        name, tag_id, classes = compound
+        if tag_id is not None:
+            pool = self.by_id.get(tag_id, [])
+        elif classes:
+            pool = self.by_class.get(classes[0], [])
+        else:
+            pool = self.by_name.get(name, [])
+        return [tag for tag in pool if self._matches_compound(tag, compound)]
+
+    @staticmethod
+    def _matches_compound(tag: Tag, compound: Compound) -> bool:
+        name, tag_id, classes = compound
+        if name is not None and tag.name != name:
+            return False
+        if tag_id is not None and tag.attrs.get("id") != tag_id:
+            return False
+        if classes:
+            tag_classes = tag.attrs.get("class") or ()
+            return all(cls in tag_classes for cls in classes)
+        return True
+
+    def _matches_ancestors(self, tag: Tag, chain: List[Compound]) -> bool:
+        """Descendant combinators: match the chain right to left up the parents"""
+        remaining = len(chain)
+        for parent in tag.parents:
+            if remaining == 0:
+                break
+            if isinstance(parent, BeautifulSoup):
+                break
+            if self._matches_compound(parent, chain[remaining - 1]):
+                remaining -= 1
+        return remaining == 0
@@ -4,24 +4,88 @@ Generates professional, comprehensive product reviews with detailed scoring and
 """
 
 import json
-from typing import Dict, List, Optional, Any
-from curl_cffi import requests as crequests
+import re
+from typing import Dict, List, Optional, Any, Tuple
+
+from http_session import SessionPool, get_session_pool
+from llm_cache import LLMCache, get_llm_cache
+from ollama_dispatcher import OllamaDispatcher, get_ollama_dispatcher
+from ollama_stream import STOP_BUDGET, split_sections, stream_generate
+
+# Sampling options sent with every generation (part of the response cache key)
+OLLAMA_OPTIONS = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+}
+
+# Streaming early-stop: reviews end with a one-paragraph verdict, anything
+# after it is discarded; no response may run past the length budget
+REVIEW_END_SECTION = "VERDICT"
+MAX_RESPONSE_CHARS = 16000  # Per language
+
+# Sections of a review, in prompt order
+REVIEW_SECTIONS = ["DETAILED_DESC", "TARGET_AUDIENCE", "USE_CASES", "PROS", "CONS", "SCORES", "VERDICT"]
+
+# Language blocks of a bilingual review (see generate_bilingual_review)
+LANGUAGE_MARKERS = {"en": "ENGLISH", "ar": "ARABIC"}
+LANGUAGE_BLOCK_RE = re.compile(r"###\s*(ENGLISH|ARABIC)\s*###")
+
+# Arabic labels for the score categories; the bilingual prompt scores once in English
+SCORE_LABELS_AR = {
+    "Quality": "الجودة",
+    "Value for Money": "القيمة مقابل المال",
+    "Performance": "الأداء",
+    "Durability": "المتانة",
+    "Features": "الميزات",
+}
+
+# Platforms of a batched social generation (see generate_all_social_content)
+SOCIAL_PLATFORMS = ["instagram", "facebook", "twitter", "linkedin"]
+SOCIAL_BLOCK_RE = re.compile(r"###\s*(INSTAGRAM|FACEBOOK|TWITTER|LINKEDIN)\s*###", re.IGNORECASE)
+
+# What each platform's block should contain in a batched social prompt
+SOCIAL_BRIEFS = {
+    "instagram": """Engaging Instagram caption: eye-catching headline with emojis, a 1-2 sentence hook,
+a "Why You'll Love It:" section with 4-5 emoji bullet points (emoji + **Bold Category** – specific detail),
+a call to action (e.g. 🛒 **Tap the link in bio to grab yours!** 🛒), the price if it's a good deal,
+and 15-20 hashtags including #DubaiShopping #UAEDeals #TechDealsUAE #SmartShopping.""",
+    "facebook": """Facebook post that encourages engagement and shares: an attention-grabbing question or
+statement, 2-3 conversational paragraphs about the benefits, 3-5 key feature bullet points,
+a strong call to action and 5-8 hashtags.""",
+    "twitter": """Twitter thread of 3 tweets, each under 280 characters: Tweet 1 hook + key benefit,
+Tweet 2 top 3 features, Tweet 3 price + call to action, with relevant hashtags.""",
+    "linkedin": """Professional LinkedIn post for business professionals: 2-3 paragraphs on professional
+benefits, productivity improvements, ROI and value proposition, with professional hashtags.""",
+}
 
 
 class EnhancedAIGenerator:
     """Advanced AI content generator for product reviews and descriptions"""
     
-    def __init__(self, ollama_url: str = "http://localhost:11434/api/generate", model: str = "devstral-small-2:24b"):
+    def __init__(self, ollama_url: str = "http://localhost:11434/api/generate", model: str = "devstral-small-2:24b",
+                 sessions: Optional[SessionPool] = None, cache: Optional[LLMCache] = None,
+                 use_cache: bool = True, dispatcher: Optional[OllamaDispatcher] = None,
+                 timeout: Optional[float] = None):
         self.ollama_url = ollama_url
         self.model = model
-        
-    def generate_professional_review(self, product_data: Dict[str, Any], language: str = "en") -> Dict[str, Any]:
+        # Concurrency limit and priority queue for requests to the Ollama host
+        self.dispatcher = dispatcher or get_ollama_dispatcher()
+        # Seconds per request, queue wait included (None = dispatcher default)
+        self.timeout = timeout
+        # Persistent connection to the Ollama host, shared across calls
+        self.sessions = sessions or get_session_pool()
+        # Responses to identical prompts are reused across runs
+        self.cache = (cache or get_llm_cache()) if use_cache else None
+        
+    def generate_professional_review(self, product_data: Dict[str, Any], language: str = "en",
+                                     priority: float = 0.0) -> Dict[str, Any]:
         """
         Generate a comprehensive professional product review
         
         Args:
             product_data: Dictionary containing product information (title, features, price, etc.)
             language: Language code ('en' for English, 'ar' for Arabic)
+            priority: Queue priority at the Ollama host (higher is served first)
             
         Returns:
             Dictionary containing structured review content
@@ -30,7 +94,8 @@ class EnhancedAIGenerator:
         prompt = self._create_review_prompt(product_data, language)
         
         try:
-            response = self._call_ollama(prompt)
+            response, sections = self._call_ollama_sections(prompt, priority=priority,
+                                                            stop_section=REVIEW_END_SECTION)
             
             # DEBUG: Show what we got from AI
             print(f"\n🔍 DEBUG - Raw AI Response Preview (first 500 chars):")
@@ -46,7 +111,7 @@ class EnhancedAIGenerator:
                 print("⚠️ WARNING: No ### section markers found in AI response!")
                 print("The AI didn't follow the requested format.")
             
-            parsed_review = self._parse_review_response(response)
+            parsed_review = self._parse_review_response(response, sections)
             return parsed_review
         except Exception as e:
             print(f"❌ Error generating review: {e}")
@@ -54,10 +119,49 @@ class EnhancedAIGenerator:
             traceback.print_exc()
             return self._get_fallback_review(product_data, language)
     
+    def generate_bilingual_review(self, product_data: Dict[str, Any],
+                                  priority: float = 0.0) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate the English and Arabic reviews from a single prompt
+        
+        The product context is sent (and prefilled) once instead of twice. If
+        the model drops one of the two language blocks, that language is
+        generated on its own with generate_professional_review.
+        
+        Args:
+            product_data: Dictionary containing product information
+            priority: Queue priority at the Ollama host (higher is served first)
+            
+        Returns:
+            {"en": review, "ar": review}, each in the generate_professional_review format
+        """
+        
+        prompt = self._create_bilingual_prompt(product_data)
+        
+        try:
+            # Stop after the Arabic block's verdict
+            response, sections = self._call_ollama_sections(
+                prompt, priority=priority, stop_section=REVIEW_END_SECTION,
+                stop_count=len(LANGUAGE_MARKERS),
+                max_chars=MAX_RESPONSE_CHARS * len(LANGUAGE_MARKERS))
+            reviews = self._parse_bilingual_response(response, sections)
+        except Exception as e:
+            print(f"❌ Error generating bilingual review: {e}")
+            reviews = {}
+        
+        for language in LANGUAGE_MARKERS:
+            if language not in reviews:
+                print(f"⚠️ No {LANGUAGE_MARKERS[language].title()} block in bilingual response, generating it separately")
+                reviews[language] = self.generate_professional_review(product_data, language, priority=priority)
+        return reviews
+    
     def generate_social_content(self, product_data: Dict[str, Any], platform: str = "instagram") -> str:
         """
         Generate platform-specific social media content
         
+        A variant already generated for this product (by this or another
+        script, e.g. in a generate_all_social_content batch) is reused.
+        
         Args:
             product_data: Dictionary containing product information
             platform: Social platform ('instagram', 'facebook', 'twitter', 'linkedin')
@@ -66,14 +170,65 @@ class EnhancedAIGenerator:
             Formatted social media caption/post
         """
         
+        cached = self._get_social_variant(product_data, platform)
+        if cached is not None:
+            print(f"♻️ Reusing {platform} post generated earlier")
+            return cached
+        
         prompt = self._create_social_prompt(product_data, platform)
         
         try:
-            response = self._call_ollama(prompt)
-            return response.strip()
+            response = self._call_ollama(prompt).strip()
         except Exception as e:
             print(f"❌ Error generating social content: {e}")
             return self._get_fallback_social(product_data, platform)
+        
+        self._put_social_variant(product_data, platform, response)
+        return response
+    
+    def generate_all_social_content(self, product_data: Dict[str, Any], platforms: Optional[List[str]] = None,
+                                    priority: float = 0.0) -> Dict[str, str]:
+        """
+        Generate posts for several platforms in one model call
+        
+        The model writes one ###PLATFORM### block per platform and the
+        response is split per platform. Each variant is cached per product,
+        so a later generate_social_content call for the same product and
+        platform reuses it. Platforms missing from the response are
+        generated on their own.
+        
+        Args:
+            product_data: Dictionary containing product information
+            platforms: Platforms to generate (all of SOCIAL_PLATFORMS by default)
+            priority: Queue priority at the Ollama host (higher is served first)
+            
+        Returns:
+            {platform: post text}
+        """
+        
+        platforms = list(platforms or SOCIAL_PLATFORMS)
+        content: Dict[str, str] = {}
+        for platform in platforms:
+            cached = self._get_social_variant(product_data, platform)
+            if cached is not None:
+                content[platform] = cached
+        missing = [platform for platform in platforms if platform not in content]
+        
+        if len(missing) > 1:
+            prompt = self._create_multi_social_prompt(product_data, missing)
+            try:
+                response = self._call_ollama(prompt, priority=priority)
+                for platform, text in self._parse_social_response(response).items():
+                    if platform in missing:
+                        content[platform] = text
+                        self._put_social_variant(product_data, platform, text)
+            except Exception as e:
+                print(f"❌ Error generating batched social content: {e}")
+        
+        for platform in platforms:
+            if platform not in content:
+                content[platform] = self.generate_social_content(product_data, platform)
+        return {platform: content[platform] for platform in platforms}
     
     def _create_review_prompt(self, product_data: Dict[str, Any], language: str) -> str:
         """Create the AI prompt for professional review generation"""
@@ -193,6 +348,98 @@ IMPORTANT GUIDELINES:
 - Consider UAE climate, lifestyle, and market context
 - Be honest but constructive in criticism
 - Output ONLY the formatted review, no additional commentary
+"""
+        
+        return prompt
+    
+    def _create_bilingual_prompt(self, product_data: Dict[str, Any]) -> str:
+        """Create one prompt asking for the review in English, then in Arabic"""
+        
+        title = product_data.get('title', 'Product')
+        features = product_data.get('raw_desc', '')
+        price = product_data.get('price', {})
+        current_price = price.get('current_price', 'N/A')
+        currency = price.get('currency', 'AED')
+        category = product_data.get('category', 'General')
+        brand = product_data.get('brand', 'Various')
+        
+        prompt = f"""
+You are a professional product reviewer for the UAE market. Create a comprehensive, detailed review for this product that will help customers make an informed purchase decision. Write it twice: first in English, then the same review in Modern Standard Arabic.
+
+Product: {title}
+Brand: {brand}
+Category: {category}
+Features: {features}
+Price: {current_price} {currency}
+
+Write the review in this EXACT format:
+
+###ENGLISH###
+[Executive Summary - 2-3 sentences highlighting the key value proposition and who should buy this]
+
+###DETAILED_DESC###
+[Detailed product description in 4-5 paragraphs covering: key features, technical specifications, build quality, performance characteristics, and real-world applications. Be specific with measurements, materials, and capabilities.]
+
+###TARGET_AUDIENCE###
+[Who should buy this product? Describe 2-3 specific user profiles that would benefit most from this product]
+
+###USE_CASES###
+[List 3-4 specific, practical use case scenarios where this product excels]
+
+###PROS###
+- [Pro 1 - Be specific and measurable, e.g., "Superior absorption capacity - holds up to 8x its weight in liquid"]
+- [Pro 2 - Include technical details where relevant]
+- [Pro 3]
+- [Pro 4]
+- [Pro 5]
+- [Pro 6]
+- [Pro 7]
+- [Pro 8]
+
+###CONS###
+- [Con 1 - Be fair and constructive, e.g., "Initial microfibre scent noticeable until first wash"]
+- [Con 2]
+- [Con 3]
+- [Con 4]
+- [Con 5]
+
+###SCORES###
+{{"Quality": 92, "Value for Money": 88, "Performance": 90, "Durability": 89, "Features": 87}}
+
+###VERDICT###
+[A concluding paragraph (3-4 sentences) with your expert recommendation, best price context for UAE market, and final verdict on whether this is a smart purchase]
+
+###ARABIC###
+[الملخص التنفيذي باللغة العربية]
+
+###DETAILED_DESC###
+[الوصف التفصيلي باللغة العربية]
+
+###TARGET_AUDIENCE###
+[الجمهور المستهدف باللغة العربية]
+
+###USE_CASES###
+[حالات الاستخدام باللغة العربية]
+
+###PROS###
+- [المزايا باللغة العربية، نفس عدد المزايا في النسخة الإنجليزية]
+
+###CONS###
+- [العيوب باللغة العربية، نفس عدد العيوب في النسخة الإنجليزية]
+
+###VERDICT###
+[الحكم النهائي باللغة العربية]
+
+IMPORTANT GUIDELINES:
+- Use professional, engaging language
+- Include specific measurements, capacities, or technical specs in descriptions
+- Pros and cons should be balanced and realistic
+- Scores should be out of 100 and reflect the actual product quality; give them once, in the English block
+- The Arabic block must say the same things as the English block, written naturally for Arabic readers, not word for word
+- Keep the section markers exactly as shown, in English, in both blocks
+- Consider UAE climate, lifestyle, and market context
+- Be honest but constructive in criticism
+- Output ONLY the formatted review, no additional commentary
 """
         
         return prompt
@@ -277,34 +524,104 @@ Focus on:
         
         return prompt
     
-    def _call_ollama(self, prompt: str, timeout: int = 300) -> str:
-        """Call Ollama API with the given prompt"""
+    def _create_multi_social_prompt(self, product_data: Dict[str, Any], platforms: List[str]) -> str:
+        """Create one prompt asking for a post per platform, each in its own block"""
+        
+        title = product_data.get('title', 'Product')
+        features = product_data.get('raw_desc', '')[:500]  # Limit for context
+        price = product_data.get('price', {})
+        current_price = price.get('current_price', 'Check Link')
+        currency = price.get('currency', 'AED')
+        
+        blocks = "\n\n".join(
+            f"###{platform.upper()}###\n[{SOCIAL_BRIEFS.get(platform, f'{platform.title()} post')}]"
+            for platform in platforms
+        )
+        
+        prompt = f"""
+You are a social media expert for the UAE market. Write a post for each platform below about this product.
+
+Product: {title}
+Features: {features}
+Price: {current_price} {currency}
+
+Write every post in this EXACT format, one block per platform, in this order:
+
+{blocks}
+
+IMPORTANT GUIDELINES:
+- Start each block with its ###PLATFORM### marker exactly as shown
+- Each post must stand on its own; don't refer to the other platforms
+- Use emojis strategically and keep the tone right for each platform
+- Output plain text with normal line breaks (no markdown code blocks)
+- Output ONLY the posts, no additional commentary
+"""
+        
+        return prompt
+    
+    def _call_ollama(self, prompt: str, timeout: Optional[float] = None, priority: float = 0.0,
+                     stop_section: Optional[str] = None, stop_count: int = 1,
+                     max_chars: int = MAX_RESPONSE_CHARS) -> str:
+        """Call Ollama API with the given prompt (answered from the cache when possible)
+        
+        Requests wait for a dispatcher slot, highest priority first; the
+        timeout covers that wait plus the generation. The response is
+        streamed and generation stops once stop_section has completed
+        stop_count times or the response passes max_chars characters.
+        """
+        return self._call_ollama_sections(prompt, timeout, priority, stop_section, stop_count, max_chars)[0]
+    
+    def _call_ollama_sections(self, prompt: str, timeout: Optional[float] = None, priority: float = 0.0,
+                              stop_section: Optional[str] = None, stop_count: int = 1,
+                              max_chars: int = MAX_RESPONSE_CHARS) -> Tuple[str, List[Tuple[str, str]]]:
+        """_call_ollama, plus the response's ###SECTION### blocks as (name, content) pairs
+        
+        The sections come from the stream as it is read; a cached response
+        is split once on the way out.
+        """
+        
+        # The stop settings decide where a response is cut, so they are part of the key
+        cache_options = {**OLLAMA_OPTIONS, "stop_section": stop_section,
+                         "stop_count": stop_count, "max_chars": max_chars}
+        if self.cache is not None:
+            cached = self.cache.get(self.model, cache_options, prompt)
+            if cached is not None:
+                print("♻️ Reusing cached AI response")
+                return cached, split_sections(cached)
         
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.7,
-                "top_p": 0.9,
-            }
+            "options": OLLAMA_OPTIONS,
         }
         
-        response = crequests.post(
-            self.ollama_url,
-            json=payload,
-            impersonate="chrome110",
-            timeout=timeout
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("response", "").strip()
-        else:
-            raise Exception(f"Ollama API error: {response.status_code}")
+        with self.dispatcher.slot(priority, timeout if timeout is not None else self.timeout) as remaining:
+            result = stream_generate(
+                self.sessions.session(self.ollama_url),
+                self.ollama_url,
+                payload,
+                timeout=remaining,
+                stop_section=stop_section,
+                stop_count=stop_count,
+                max_chars=max_chars,
+            )
+        
+        ttft = f"{result.ttft:.1f}s" if result.ttft is not None else "n/a"
+        print(f"⚡ AI response: first token {ttft}, {len(result.text)} chars in {result.elapsed:.1f}s "
+              f"({result.stop_reason})")
+        
+        # A response cut off by the length budget is used once but not kept
+        if self.cache is not None and result.stop_reason != STOP_BUDGET:
+            self.cache.put(self.model, cache_options, prompt, result.text)
+        return result.text, result.sections
     
-    def _parse_review_response(self, response: str) -> Dict[str, Any]:
-        """Parse the AI-generated review into structured format"""
+    def _parse_review_response(self, response: str,
+                               sections: Optional[List[Tuple[str, str]]] = None) -> Dict[str, Any]:
+        """Parse the AI-generated review into structured format
+        
+        sections are the ###SECTION### blocks already split off while
+        streaming; without them (or if the model wrote none) the text is split here.
+        """
         
         result = {
             "summary": "",
@@ -327,6 +644,13 @@ Focus on:
             if parts[0].strip() and not parts[0].strip().startswith('['):
                 result["summary"] = parts[0].strip()
             
+            if any(name in REVIEW_SECTIONS for name, _ in sections or ()):
+                for name, content in sections:
+                    # Skip instruction text in brackets
+                    if name in REVIEW_SECTIONS and content and not content.startswith('['):
+                        self._store_section_content(result, name, content)
+                return result
+            
             # Process remaining sections
             # Format is: ###SECTION_NAME\ncontent\n###NEXT_SECTION
             current_section = None
@@ -339,7 +663,7 @@ Focus on:
                 
                 # Check if this part starts with a known section name
                 section_found = False
-                for section_name in ["DETAILED_DESC", "TARGET_AUDIENCE", "USE_CASES", "PROS", "CONS", "SCORES", "VERDICT"]:
+                for section_name in REVIEW_SECTIONS:
                     if part.startswith(section_name):
                         # Save previous section content
                         if current_section and current_content:
@@ -372,6 +696,88 @@ Focus on:
         
         return result
     
+    def _parse_bilingual_response(self, response: str,
+                                  sections: Optional[List[Tuple[str, str]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Split a bilingual response into its language blocks and parse each one
+        
+        Returns {"en": review, "ar": review}; a language whose block is
+        missing or empty is left out. The Arabic review reuses the English
+        scores under Arabic labels. sections are the streamed ###SECTION###
+        blocks, handed on to each language's review.
+        """
+        
+        # Streamed sections grouped by the language block they follow
+        block_sections: Dict[str, List[Tuple[str, str]]] = {}
+        current: List[Tuple[str, str]] = []
+        for name, content in sections or ():
+            if name in LANGUAGE_MARKERS.values():
+                language = "en" if name == LANGUAGE_MARKERS["en"] else "ar"
+                current = []
+                block_sections.setdefault(language, current)
+            else:
+                current.append((name, content))
+        
+        blocks: Dict[str, str] = {}
+        parts = LANGUAGE_BLOCK_RE.split(response)
+        # parts = [preamble, "ENGLISH", block, "ARABIC", block, ...]
+        for marker, block in zip(parts[1::2], parts[2::2]):
+            language = "en" if marker == LANGUAGE_MARKERS["en"] else "ar"
+            if block.strip() and language not in blocks:
+                blocks[language] = block
+        
+        reviews = {}
+        for language, block in blocks.items():
+            review = self._parse_review_response(block, block_sections.get(language))
+            if review["summary"] or review["detailed_description"]:
+                reviews[language] = review
+        
+        if "en" in reviews and "ar" in reviews and not reviews["ar"]["scores"]:
+            reviews["ar"]["scores"] = {
+                SCORE_LABELS_AR.get(name, name): score
+                for name, score in reviews["en"]["scores"].items()
+            }
+            reviews["ar"]["overall_score"] = reviews["en"]["overall_score"]
+        return reviews
+    
+    def _parse_social_response(self, response: str) -> Dict[str, str]:
+        """Split a batched social response into {platform: post}; empty blocks are left out"""
+        
+        posts: Dict[str, str] = {}
+        parts = SOCIAL_BLOCK_RE.split(response)
+        # parts = [preamble, "INSTAGRAM", post, "FACEBOOK", post, ...]
+        for marker, post in zip(parts[1::2], parts[2::2]):
+            platform = marker.lower()
+            post = post.strip()
+            if post and platform not in posts:
+                posts[platform] = post
+        return posts
+    
+    def _social_variant_key(self, product_data: Dict[str, Any]) -> str:
+        """Identity of a product's social posts: same product and price, same posts
+        
+        Only fields every scraper extracts the same way are used, so posts
+        generated by social_batch_scraper.py are found by facebook_scraper.py.
+        """
+        price = product_data.get('price', {})
+        asin = product_data.get('asin', '')
+        if not asin:
+            asin_match = re.search(r'/dp/([A-Z0-9]{10})', product_data.get('url', ''))
+            asin = asin_match.group(1) if asin_match else ''
+        return json.dumps({
+            "asin": asin,
+            "title": product_data.get('title', ''),
+            "price": price.get('current_price'),
+        }, ensure_ascii=False, sort_keys=True)
+    
+    def _get_social_variant(self, product_data: Dict[str, Any], platform: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.get(self.model, {"social_variant": platform}, self._social_variant_key(product_data))
+    
+    def _put_social_variant(self, product_data: Dict[str, Any], platform: str, text: str):
+        if self.cache is not None:
+            self.cache.put(self.model, {"social_variant": platform}, self._social_variant_key(product_data), text)
+    
     def _store_section_content(self, result: Dict[str, Any], section_name: str, content: str):
         """Helper to store parsed section content in the result dict"""
         if section_name == "DETAILED_DESC":
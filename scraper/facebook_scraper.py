@@ -12,14 +12,16 @@ Generates comprehensive Facebook posts for products including:
 
 import os
 import json
-import time
 import re
-import random
 from datetime import datetime
-from curl_cffi import requests as crequests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from enhanced_ai_generator import EnhancedAIGenerator
+from fetch_engine import FetchEngine
+from http_session import SessionPool
+from http_cache import ResponseCache
+from image_urls import large_image_url
+from script_images import extract_script_images, has_image_payload
+from page_archive import PageArchive
 
 load_dotenv()
 
@@ -40,17 +42,16 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+# Persistent per-host sessions (Amazon pages, image CDN, Ollama)
+SESSIONS = SessionPool()
+
+# Shared pooled fetcher, throttled by the process-wide rate limiter
+ENGINE = FetchEngine(headers=HEADERS, sessions=SESSIONS, archive=PageArchive(), cache=ResponseCache())
+
 
 def get_soup(url):
     """Fetch URL and return BeautifulSoup"""
-    try:
-        time.sleep(random.uniform(2, 4))
-        response = crequests.get(url, headers=HEADERS, impersonate="chrome110", timeout=30)
-        if response.status_code == 200:
-            return BeautifulSoup(response.content, "html.parser")
-    except Exception as e:
-        print(f"  ❌ Error: {e}")
-    return None
+    return ENGINE.get_soup(url)
 
 
 def extract_price(soup):
@@ -214,11 +215,7 @@ def extract_all_images(soup):
     def add_image(url, img_type="gallery"):
         if url and url.startswith("http") and url not in seen_urls:
             # Clean URL and convert to high-res
-            clean_url = url.split('?')[0]
-            clean_url = re.sub(r'_AC_US\d+_', '_AC_SL1500_', clean_url)
-            clean_url = re.sub(r'_S[XY]\d+_', '_SL1500_', clean_url)
-            clean_url = re.sub(r'_SS\d+_', '_SL1500_', clean_url)
-            clean_url = re.sub(r'_CR\d+,\d+,\d+,\d+_', '', clean_url)
+            clean_url = large_image_url(url.split('?')[0])
             if clean_url not in seen_urls:
                 images.append({"url": clean_url, "type": img_type})
                 seen_urls.add(clean_url)
@@ -254,17 +251,12 @@ def extract_all_images(soup):
         # Method 3: Alt images from JavaScript data
         scripts = soup.find_all("script", type="text/javascript")
         for script in scripts:
-            if script.string and "'colorImages'" in script.string:
-                try:
-                    hires_matches = re.findall(r'"hiRes"\s*:\s*"([^"]+)"', script.string)
-                    for url in hires_matches:
-                        add_image(url, "hires")
-                    
-                    large_matches = re.findall(r'"large"\s*:\s*"([^"]+)"', script.string)
-                    for url in large_matches:
-                        add_image(url, "large")
-                except:
-                    pass
+            if script.string and has_image_payload(script.string):
+                records = extract_script_images(script.string)
+                for kind, img_type in (("hiRes", "hires"), ("large", "large")):
+                    for record in records:
+                        if record.kind == kind:
+                            add_image(record.url, img_type)
         
         # Method 4: Image block container
         img_block = soup.find("div", id="imageBlock")
@@ -315,8 +307,8 @@ def download_all_images(soup, folder):
             filename = f"image_{i:02d}.{ext}"
             filepath = os.path.join(images_dir, filename)
             
-            response = crequests.get(url, headers=HEADERS, impersonate="chrome110", timeout=30)
-            if response.status_code == 200:
+            response = ENGINE.fetch_sync(url, retries=1, page_type="image")
+            if response is not None:
                 with open(filepath, 'wb') as f:
                     f.write(response.content)
                 downloaded.append(filepath)
@@ -341,7 +333,8 @@ def generate_facebook_post(product_data, generator):
     affiliate_link = product_data.get('affiliate_link', '')
     website_link = product_data.get('website_link', '')
     
-    # Try AI generation first
+    # Try AI generation first (reuses the Facebook variant of an earlier
+    # social_batch_scraper.py run for the same product and price)
     if generator:
         try:
             content = generator.generate_social_content(product_data, "facebook")
@@ -482,7 +475,7 @@ def main():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     try:
-        generator = EnhancedAIGenerator(OLLAMA_API_URL, OLLAMA_MODEL)
+        generator = EnhancedAIGenerator(OLLAMA_API_URL, OLLAMA_MODEL, sessions=SESSIONS)
         print("✅ AI ready")
     except:
         generator = None
@@ -0,0 +1,292 @@
+"""
+⚡ Shared Async Fetch Engine
+============================
+Single pooled fetcher used by every scraper script:
+- Persistent per-host curl_cffi sessions (see http_session.SessionPool)
+- Configurable concurrency limit
+- Shared per-host token-bucket rate limiting (see rate_limiter.py), slowed
+  down by 503s and captcha pages and sped up again by successes
+- Retries with the link scraper's 503 backoff semantics
+- Async API plus a sync wrapper for threaded / sequential scripts
+- Optional raw page archive with offline replay (see page_archive.py)
+- Optional conditional response cache with per page type TTLs (see http_cache.py)
+
+The sync wrapper runs all requests on one background event loop, so any
+number of caller threads share the same session and connection pool.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from http_cache import ResponseCache, page_type_for
+from http_session import SessionPool
+from page_archive import PageArchive
+from parser_backends import make_soup
+from rate_limiter import RateLimiter, get_rate_limiter
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+}
+
+# Markers of Amazon's robot check page (served with HTTP 200)
+CAPTCHA_MARKERS = (
+    b"/errors/validateCaptcha",
+    b"Type the characters you see in this image",
+)
+
+HeadersSpec = Union[Dict[str, str], Callable[[], Dict[str, str]]]
+DelayRange = Tuple[float, float]
+
+
+# ============================================================================
+# DATA STRUCTURES
+# ============================================================================
+@dataclass
+class FetchResult:
+    """A successful HTTP response"""
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+    from_cache: bool = False
+
+
+def is_captcha_page(content: bytes) -> bool:
+    """True if the response body is a robot check instead of the real page"""
+    return any(marker in content for marker in CAPTCHA_MARKERS)
+
+
+# ============================================================================
+# FETCH ENGINE
+# ============================================================================
+class FetchEngine:
+    """Concurrent, connection-reusing fetcher with retry/backoff"""
+
+    def __init__(self,
+                 concurrency: int = 4,
+                 retries: int = 3,
+                 timeout: int = 30,
+                 headers: Optional[HeadersSpec] = None,
+                 retry_delay: DelayRange = (3.0, 6.0),
+                 backoff_503: DelayRange = (10.0, 20.0),
+                 error_delay: DelayRange = (5.0, 10.0),
+                 impersonate: str = "chrome110",
+                 stats: Optional[Dict[str, int]] = None,
+                 sessions: Optional[SessionPool] = None,
+                 archive: Optional[PageArchive] = None,
+                 cache: Optional[ResponseCache] = None,
+                 limiter: Optional[RateLimiter] = None):
+        """
+        Args:
+            concurrency: Maximum requests in flight at once
+            retries: Attempts per URL
+            timeout: Per-request timeout (seconds)
+            headers: Header dict, or a callable returning a fresh dict per request
+            retry_delay: Random pause before each retry, on top of the rate limit
+            backoff_503: Extra pause after a 503 (rate limited) response
+            error_delay: Pause after a connection error
+            impersonate: curl_cffi browser fingerprint
+            stats: Optional counter dict to record request outcomes into
+            sessions: Shared session pool (a private one sized to concurrency otherwise)
+            archive: Store every successful page here, and serve replay=True fetches from it
+            cache: Serve fresh responses from disk and revalidate stale ones
+            limiter: Per-host request budget (the process-wide limiter by default)
+        """
+        self.concurrency = max(1, concurrency)
+        self.retries = max(1, retries)
+        self.timeout = timeout
+        self.headers = headers if headers is not None else DEFAULT_HEADERS
+        self.retry_delay = retry_delay
+        self.backoff_503 = backoff_503
+        self.error_delay = error_delay
+        self.impersonate = impersonate
+        self.stats = stats if stats is not None else defaultdict(int)
+        self.sessions = sessions or SessionPool(pool_size=self.concurrency, impersonate=impersonate)
+        self.archive = archive
+        self.cache = cache
+        self.limiter = limiter or get_rate_limiter()
+
+        # Concurrency limit per event loop; direct async callers on their own
+        # loop get their own semaphore (and async sessions, via the pool).
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None,
+                    retries: Optional[int] = None, replay: bool = False, page_type: Optional[str] = None) -> Optional[FetchResult]:
+        """Fetch a URL, returning the response on HTTP 200 or None on failure.
+        
+        With replay=True the latest archived copy is returned instead and the
+        network is never touched. page_type ('listing', 'product' or 'image')
+        selects the cache TTL and is inferred from the URL when omitted.
+        """
+        if replay:
+            return await self._replay(url)
+
+        page_type = page_type or page_type_for(url)
+        cached = None
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, url)
+            if cached and self.cache.is_fresh(cached):
+                self.stats['cache_hits'] += 1
+                return FetchResult(url=url, status_code=200, content=cached.content, from_cache=True)
+
+        session = self.sessions.async_session(url)
+        semaphore = self._get_semaphore()
+        attempts = max(1, retries or self.retries)
+
+        async with semaphore:
+            for attempt in range(attempts):
+                try:
+                    if attempt > 0:
+                        await asyncio.sleep(random.uniform(*self.retry_delay))
+                    await self.limiter.acquire(url)
+
+                    request_headers = dict(headers or self._headers())
+                    if cached:
+                        request_headers.update(self.cache.conditional_headers(cached))
+
+                    start_time = time.time()
+                    response = await session.get(
+                        url,
+                        headers=request_headers,
+                        impersonate=self.impersonate,
+                        timeout=self.timeout,
+                    )
+
+                    if response.status_code == 200 and is_captcha_page(response.content):
+                        print(f"  ⚠️ Captcha page, slowing down...")
+                        self.stats['requests_captcha'] += 1
+                        self.limiter.record(url, blocked=True)
+                        await asyncio.sleep(random.uniform(*self.backoff_503))
+                    elif response.status_code == 200:
+                        self.stats['requests_success'] += 1
+                        self.limiter.record(url, blocked=False)
+                        if self.archive is not None and page_type != "image":
+                            await asyncio.to_thread(self.archive.store, url, response.content)
+                        if self.cache is not None:
+                            await asyncio.to_thread(
+                                self.cache.put, url, response.content, response.headers, page_type
+                            )
+                        return FetchResult(
+                            url=url,
+                            status_code=response.status_code,
+                            content=response.content,
+                            headers=dict(response.headers),
+                            elapsed=time.time() - start_time,
+                        )
+                    elif response.status_code == 304 and cached:
+                        self.stats['cache_revalidated'] += 1
+                        self.limiter.record(url, blocked=False)
+                        await asyncio.to_thread(self.cache.touch, url)
+                        return FetchResult(
+                            url=url,
+                            status_code=200,
+                            content=cached.content,
+                            elapsed=time.time() - start_time,
+                            from_cache=True,
+                        )
+                    elif response.status_code == 503:
+                        print(f"  ⚠️ Rate limited (503), waiting longer...")
+                        self.stats['requests_blocked'] += 1
+                        self.limiter.record(url, blocked=True)
+                        await asyncio.sleep(random.uniform(*self.backoff_503))
+                    else:
+                        print(f"  ❌ HTTP {response.status_code}: {url[:80]}")
+                        self.stats['requests_failed'] += 1
+
+                except Exception as e:
+                    print(f"  ❌ Error (attempt {attempt + 1}/{attempts}): {e}")
+                    self.stats['requests_error'] += 1
+                    if attempt < attempts - 1:
+                        await asyncio.sleep(random.uniform(*self.error_delay))
+
+        return None
+
+    async def fetch_many(self, urls: List[str], **kwargs) -> List[Optional[FetchResult]]:
+        """Fetch several URLs concurrently, results in input order"""
+        return await asyncio.gather(*(self.fetch(url, **kwargs) for url in urls))
+
+    # ------------------------------------------------------------------
+    # Sync wrapper
+    # ------------------------------------------------------------------
+    def fetch_sync(self, url: str, **kwargs) -> Optional[FetchResult]:
+        """Blocking fetch; safe to call from any number of threads"""
+        return self._run(self.fetch(url, **kwargs))
+
+    def fetch_many_sync(self, urls: List[str], **kwargs) -> List[Optional[FetchResult]]:
+        """Blocking concurrent fetch of several URLs"""
+        return self._run(self.fetch_many(urls, **kwargs))
+
+    def get_soup(self, url: str, parse_only: Optional[SoupStrainer] = None,
+                 **kwargs) -> Optional[BeautifulSoup]:
+        """Fetch a URL and return BeautifulSoup object (only the parse_only regions if given)"""
+        result = self.fetch_sync(url, **kwargs)
+        if result is None:
+            return None
+        return make_soup(result.content, parse_only=parse_only)
+
+    def close(self):
+        """Close the background loop's sessions and stop the loop"""
+        with self._loop_lock:
+            loop = self._loop
+            self._loop = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.sessions.aclose(), loop).result()
+        self._semaphores.pop(loop, None)
+        loop.call_soon_threadsafe(loop.stop)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    async def _replay(self, url: str) -> Optional[FetchResult]:
+        if self.archive is None:
+            raise RuntimeError("Replay requested but the fetch engine has no archive")
+        content = await asyncio.to_thread(self.archive.latest, url)
+        if content is None:
+            print(f"  ⚠️ Not in archive: {url[:80]}")
+            self.stats['replay_missing'] += 1
+            return None
+        self.stats['replay_hits'] += 1
+        return FetchResult(url=url, status_code=200, content=content)
+
+    def _headers(self) -> Dict[str, str]:
+        return self.headers() if callable(self.headers) else self.headers
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="fetch-engine", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
@@ -0,0 +1,149 @@
+"""
+🧊 Conditional HTTP Response Cache
+==================================
+On-disk cache in front of the fetch engine:
+- Responses younger than their page type's TTL are served with zero network
+- Older responses are revalidated with If-None-Match / If-Modified-Since,
+  and a 304 refreshes the entry without re-downloading the body
+- Separate TTLs for listing pages, product pages and images
+
+Layout:
+    http_cache/ab/<sha1 of url>.json       Metadata (url, page type, validators, stored_at)
+    http_cache/ab/<sha1 of url>.body.*     Compressed body (codec from page_archive)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+from page_archive import ASIN_PATTERN, compress, decompress
+
+SCRIPT_DIR = os.path.dirname(__file__)
+DEFAULT_CACHE_DIR = os.path.join(SCRIPT_DIR, "http_cache")
+
+# Time-to-live per page type (seconds)
+DEFAULT_TTLS = {
+    "listing": 6 * 3600,  # Best-seller lists reshuffle a few times a day
+    "product": 12 * 3600,  # Prices and review counts
+    "image": 30 * 86400,  # Product images rarely change
+}
+
+IMAGE_PATTERN = re.compile(r'(media-amazon\.com/images/|\.(?:jpe?g|png|webp|gif)(?:\?|$))', re.IGNORECASE)
+
+
+def page_type_for(url: str) -> str:
+    """Classify a URL as 'image', 'product' or 'listing'"""
+    if IMAGE_PATTERN.search(url):
+        return "image"
+    if ASIN_PATTERN.search(url):
+        return "product"
+    return "listing"
+
+
+@dataclass
+class CacheEntry:
+    """A cached response"""
+    url: str
+    page_type: str
+    stored_at: float
+    content: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class ResponseCache:
+    """URL-keyed response cache with TTLs and conditional revalidation"""
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, ttls: Optional[Dict[str, int]] = None):
+        self.root = root
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Cached response for a URL, fresh or stale"""
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self._body_path(url, meta["codec"]), 'rb') as f:
+                content = decompress(f.read(), meta["codec"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return CacheEntry(
+            url=url,
+            page_type=meta.get("page_type", page_type_for(url)),
+            stored_at=meta["stored_at"],
+            content=content,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """True if the entry is still within its page type's TTL"""
+        ttl = self.ttls.get(entry.page_type, 0)
+        return time.time() - entry.stored_at < ttl
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        """Validator headers for revalidating a stale entry"""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def put(self, url: str, content: bytes, headers: Mapping[str, str],
+            page_type: Optional[str] = None):
+        """Store a 200 response"""
+        lowered = {k.lower(): v for k, v in headers.items()}
+        blob, codec = compress(content)
+        meta = {
+            "url": url,
+            "page_type": page_type or page_type_for(url),
+            "stored_at": time.time(),
+            "etag": lowered.get("etag"),
+            "last_modified": lowered.get("last-modified"),
+            "codec": codec,
+        }
+        self._write(url, meta, blob)
+
+    def touch(self, url: str):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        meta_path, _ = self._paths(url)
+        with self._lock:
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                return
+            meta["stored_at"] = time.time()
+            self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def _write(self, url: str, meta: dict, blob: bytes):
+        meta_path, _ = self._paths(url)
+        with self._lock:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            # Body first, so a reader never sees metadata without its body
+            self._atomic_write(self._body_path(url, meta["codec"]), blob)
+            self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def _paths(self, url: str):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.root, digest[:2], digest)
+        return f"{base}.json", base
+
+    def _body_path(self, url: str, codec: str) -> str:
+        return f"{self._paths(url)[1]}.body.{codec}"
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
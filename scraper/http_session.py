@@ -0,0 +1,95 @@
+"""
+🔌 Shared HTTP Session Pool
+===========================
+Long-lived curl_cffi sessions, one per host, injected into the scrapers,
+the fetch engine and the AI generator. TLS handshakes and DNS lookups are
+paid once per host instead of once per request, and the number of pooled
+connections per host follows the configured concurrency.
+"""
+
+import asyncio
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from curl_cffi import CurlOpt
+from curl_cffi.requests import AsyncSession, Session
+
+
+def host_of(url: str) -> str:
+    """Return the scheme://host[:port] part of a URL"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class SessionPool:
+    """Per-host persistent sessions (sync and async)"""
+
+    def __init__(self, pool_size: int = 4, impersonate: str = "chrome110"):
+        """
+        Args:
+            pool_size: Connections kept alive per host (match your concurrency)
+            impersonate: curl_cffi browser fingerprint for every session
+        """
+        self.pool_size = max(1, pool_size)
+        self.impersonate = impersonate
+        self._sessions: Dict[str, Session] = {}
+        self._async_sessions: Dict[Tuple[str, asyncio.AbstractEventLoop], AsyncSession] = {}
+        self._lock = threading.Lock()
+
+    def session(self, url: str) -> Session:
+        """Blocking session for the URL's host.
+
+        curl_cffi keeps one curl handle per thread inside a Session, so a
+        single session can be shared by all worker threads.
+        """
+        host = host_of(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = Session(
+                    impersonate=self.impersonate,
+                    curl_options={CurlOpt.MAXCONNECTS: self.pool_size},
+                )
+                self._sessions[host] = session
+            return session
+
+    def async_session(self, url: str) -> AsyncSession:
+        """Async session for the URL's host on the running event loop"""
+        key = (host_of(url), asyncio.get_running_loop())
+        with self._lock:
+            session = self._async_sessions.get(key)
+            if session is None:
+                session = AsyncSession(impersonate=self.impersonate, max_clients=self.pool_size)
+                self._async_sessions[key] = session
+            return session
+
+    async def aclose(self):
+        """Close the async sessions bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key in self._async_sessions if key[1] is loop]
+            sessions = [self._async_sessions.pop(key) for key in keys]
+        for session in sessions:
+            await session.close()
+
+    def close(self):
+        """Close all blocking sessions"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+_default_pool: Optional[SessionPool] = None
+_default_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """Process-wide pool for callers that aren't handed one explicitly"""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = SessionPool()
+        return _default_pool
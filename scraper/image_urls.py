@@ -0,0 +1,56 @@
+"""
+🖼️ Amazon Image URL Normalizer
+==============================
+Amazon encodes the rendition of an image in "_..._" tokens before the file
+extension (`._AC_US40_.jpg`, `._SX300_SY200_.jpg`, `._SR38,50_.jpg`, ...).
+large_image_url() rewrites every size token to the 1500px rendition and
+drops crop tokens in a single regex pass, replacing the chains of ten
+re.sub calls the scrapers used to run per URL. Results are memoized, since
+the same thumbnails show up again on every page of a product family.
+
+Rewrites (the same results the old main.py chain produced, plus crops):
+    _AC_US40_ / _AC_SX300_ / _AC_SY200_ / _AC_UL320_ / _AC_SS40_   ->  _AC_SL1500_
+    _SX300_ / _SY200_ / _SS40_ / _SR38,50_                           ->  _SL1500_
+    ._XX123_  (any other two-letter size code right after the dot)   ->  ._AC_SL1500_
+    _CR0,0,500,500_                                                  ->  removed
+"""
+
+import re
+from functools import lru_cache
+
+LARGE_SIZE = "SL1500"
+
+# One token per match: optional leading dot, optional AC_ prefix, two-letter
+# code and its numbers. The closing underscore is only looked at, so it can
+# open the next token ("_SX300_SY200_").
+SIZE_TOKEN = re.compile(r'(\.)?_(AC_)?([A-Z]{2})(\d+(?:,\d+){0,3})(?=_)')
+
+# code -> number of comma-separated values it takes, for tokens that always become SL1500
+RESIZE_CODES = {"SX": 1, "SY": 1, "SS": 1, "SR": 2}
+RESIZE_CODES_AC = {**RESIZE_CODES, "US": 1, "UL": 1}
+CROP_CODE = "CR"
+CROP_VALUES = 4
+
+
+def _rewrite(match: re.Match) -> str:
+    dot, ac, code, numbers = match.groups()
+    dot = dot or ""
+    values = numbers.count(",") + 1
+
+    if code == CROP_CODE and values == CROP_VALUES and not ac:
+        return dot
+    if ac:
+        if RESIZE_CODES_AC.get(code) == values:
+            return f"{dot}_AC_{LARGE_SIZE}"
+        return match.group(0)
+    if RESIZE_CODES.get(code) == values or (dot and values == 1):
+        return f"{dot}_AC_{LARGE_SIZE}" if dot else f"_{LARGE_SIZE}"
+    return match.group(0)
+
+
+@lru_cache(maxsize=8192)
+def large_image_url(url: str) -> str:
+    """High-resolution, uncropped version of an Amazon image URL"""
+    if not url:
+        return url
+    return SIZE_TOKEN.sub(_rewrite, url)
@@ -13,18 +13,22 @@ Products are ranked by priority score based on their source and ranking.
 """
 
 import csv
-import time
+import argparse
 import random
 import json
 import re
 from datetime import datetime
-from curl_cffi import requests as crequests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import os
 from dataclasses import dataclass, asdict
 from typing import List, Set, Dict, Optional
 from collections import defaultdict
 
+from fetch_engine import FetchEngine
+from http_cache import ResponseCache
+from page_archive import PageArchive
+from parser_backends import make_soup
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -35,6 +39,8 @@ TARGET_COUNT = 2000  # Increased target for better product selection
 MAX_PAGES_PER_CATEGORY = 3  # Scrape up to 3 pages per category
 RETRY_ATTEMPTS = 3
 REQUEST_TIMEOUT = 30
+REQUEST_CONCURRENCY = 3  # Max listing pages fetched in parallel
+LISTING_CACHE_TTL = 6 * 3600  # Re-runs within this window reuse cached listing pages
 
 # Priority-weighted product sources (higher = better quality products)
 PRODUCT_SOURCES = {
@@ -117,15 +123,71 @@ class ProductInfo:
         return self.priority_score
 
 
+# ============================================================================
+# LISTING PAGE PARSING
+# ============================================================================
+class ListingRegions(SoupStrainer):
+    """Keep only the parts of a listing page the link scraper reads.
+    
+    Product grid containers (with everything inside them), the pagination
+    bar and links; headers, scripts, styles and the rest of the page are
+    skipped while parsing instead of being built into the tree.
+    """
+    
+    CONTAINER_CLASSES = ("zg-item-immersion", "p13n-sc-uncoverable-faceout")
+    
+    def wanted(self, name: str, attrs) -> bool:
+        if name == "a":
+            return "href" in attrs
+        classes = attrs.get("class") or ""
+        if not isinstance(classes, str):
+            classes = " ".join(classes)
+        if name == "div":
+            return "data-asin" in attrs or self.CONTAINER_CLASSES[1] in classes
+        if name == "li":
+            return self.CONTAINER_CLASSES[0] in classes
+        if name == "ul":
+            return "a-pagination" in classes.split()
+        return False
+    
+    # Beautiful Soup >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return self.wanted(name, attrs or {})
+    
+    def allow_string_creation(self, string) -> bool:
+        return False
+    
+    # Beautiful Soup < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return markup_name if self.wanted(markup_name, dict(markup_attrs)) else None
+    
+    def search(self, markup):
+        return None
+
+
+LISTING_REGIONS = ListingRegions()
+
+
 # ============================================================================
 # SCRAPER CLASS
 # ============================================================================
 class EnhancedLinkScraper:
-    def __init__(self):
+    def __init__(self, replay: bool = False):
+        self.replay = replay  # Read listing pages from the archive, not the network
         self.products: Dict[str, ProductInfo] = {}  # ASIN -> ProductInfo
         self.categories_scraped: Set[str] = set()
         self.stats = defaultdict(int)
         self.session_start = datetime.now()
+        self.engine = FetchEngine(
+            concurrency=REQUEST_CONCURRENCY,
+            retries=RETRY_ATTEMPTS,
+            timeout=REQUEST_TIMEOUT,
+            headers=self.get_headers,
+            retry_delay=(3.0, 6.0),
+            stats=self.stats,
+            archive=PageArchive(),
+            cache=ResponseCache(ttls={"listing": LISTING_CACHE_TTL}),
+        )
         
     def get_headers(self) -> dict:
         """Get request headers with randomized User-Agent"""
@@ -147,37 +209,15 @@ class EnhancedLinkScraper:
     
     def get_soup(self, url: str, retries: int = RETRY_ATTEMPTS) -> Optional[BeautifulSoup]:
         """Fetch URL with retry logic and anti-blocking measures"""
-        for attempt in range(retries):
-            try:
-                # Variable delay to appear more human
-                delay = random.uniform(1.5, 4.0) if attempt == 0 else random.uniform(3.0, 6.0)
-                time.sleep(delay)
-                
-                print(f"  📡 Fetching: {url[:80]}...")
-                response = crequests.get(
-                    url, 
-                    headers=self.get_headers(), 
-                    impersonate="chrome110",
-                    timeout=REQUEST_TIMEOUT
-                )
-                
-                if response.status_code == 200:
-                    self.stats['requests_success'] += 1
-                    return BeautifulSoup(response.content, "html.parser")
-                elif response.status_code == 503:
-                    print(f"  ⚠️ Rate limited (503), waiting longer...")
-                    time.sleep(random.uniform(10, 20))
-                else:
-                    print(f"  ❌ HTTP {response.status_code}")
-                    self.stats['requests_failed'] += 1
-                    
-            except Exception as e:
-                print(f"  ❌ Error (attempt {attempt + 1}/{retries}): {e}")
-                self.stats['requests_error'] += 1
-                if attempt < retries - 1:
-                    time.sleep(random.uniform(5, 10))
-                    
-        return None
+        print(f"  📡 Fetching: {url[:80]}...")
+        return self.engine.get_soup(url, retries=retries, replay=self.replay, parse_only=LISTING_REGIONS)
+    
+    def get_soups(self, urls: List[str]) -> List[Optional[BeautifulSoup]]:
+        """Fetch several URLs in parallel, results in input order"""
+        for url in urls:
+            print(f"  📡 Fetching: {url[:80]}...")
+        results = self.engine.fetch_many_sync(urls, replay=self.replay)
+        return [make_soup(r.content, parse_only=LISTING_REGIONS) if r else None for r in results]
     
     def extract_asin(self, url: str) -> Optional[str]:
         """Extract ASIN from product URL"""
@@ -388,13 +428,17 @@ class EnhancedLinkScraper:
                 self.add_products(products)
                 print(f"     Page 1: +{len(products)} products")
                 
-                # Additional pages
+                # Additional pages (fetched in parallel), only as many as the
+                # target still needs at page 1's yield
+                remaining = TARGET_COUNT - len(self.products)
+                if remaining <= 0:
+                    return
                 page_urls = self.get_pagination_urls(soup, cat_url)
-                for i, page_url in enumerate(page_urls, start=2):
+                page_urls = page_urls[:-(-remaining // max(len(products), 1))]
+                page_soups = self.get_soups(page_urls)
+                for i, soup in enumerate(page_soups, start=2):
                     if len(self.products) >= TARGET_COUNT:
                         return
-                    
-                    soup = self.get_soup(page_url)
                     if soup:
                         products = self.extract_products_with_ranking(
                             soup, source_name, source_config['priority'], cat_name
@@ -458,6 +502,8 @@ class EnhancedLinkScraper:
         print(f"Successful Requests: {self.stats['requests_success']}")
         print(f"Failed Requests: {self.stats['requests_failed']}")
         print(f"Request Errors: {self.stats['requests_error']}")
+        print(f"Blocked (503/captcha): {self.stats['requests_blocked'] + self.stats['requests_captcha']}")
+        print(f"Throttle: {self.engine.limiter.format_metrics()}")
         print(f"Categories Scraped: {len(self.categories_scraped)}")
         print(f"Duration: {duration}")
         print("=" * 60)
@@ -506,7 +552,12 @@ def save_products(products: List[ProductInfo]):
 
 
 if __name__ == "__main__":
-    scraper = EnhancedLinkScraper()
+    parser = argparse.ArgumentParser(description="Amazon best-seller link scraper")
+    parser.add_argument("--replay", action="store_true",
+                        help="Read listing pages from the raw page archive instead of the network")
+    args = parser.parse_args()
+    
+    scraper = EnhancedLinkScraper(replay=args.replay)
     products = scraper.scrape_all()
     
     print(f"\n🎉 Finished! Collected {len(products)} unique product links.")
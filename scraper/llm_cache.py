@@ -0,0 +1,153 @@
+"""
+🧠 Persistent LLM Response Cache
+================================
+A 24B model call takes 30-60s, and reruns of main_enhanced.py,
+social_batch_scraper.py or facebook_scraper.py send exactly the same prompts
+for products that haven't changed. LLMCache stores each response in SQLite
+keyed by a hash of model + options + prompt, so repeated prompts are
+answered from disk.
+
+Entries expire after a TTL (default 7 days) and the cache is bounded: once it
+holds more than max_entries responses, the least recently used ones are
+evicted.
+
+Usage:
+    cache = get_llm_cache()
+    response = cache.get(model, options, prompt)
+    if response is None:
+        response = call_the_model(...)
+        cache.put(model, options, prompt, response)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+SCRIPT_DIR = os.path.dirname(__file__)
+DEFAULT_CACHE_PATH = os.path.join(SCRIPT_DIR, "llm_cache", "responses.sqlite")
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL = 7 * 86400  # Seconds
+EVICT_BATCH = 100  # Evict a little below the bound so eviction doesn't run on every put
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_use ON responses (used_at);
+"""
+
+
+def cache_key(model: str, options: Optional[Dict[str, Any]], prompt: str) -> str:
+    """Stable hash of everything that determines a generation"""
+    material = json.dumps({"model": model, "options": options or {}, "prompt": prompt},
+                          ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed, size-bounded LRU cache of model responses with a TTL"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            path: SQLite file
+            max_entries: Responses kept before least recently used ones are evicted
+            ttl: Seconds a response stays valid (0 = forever)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def get(self, model: str, options: Optional[Dict[str, Any]], prompt: str) -> Optional[str]:
+        """Cached response, or None if missing or expired"""
+        key = cache_key(model, options, prompt)
+        now = time.time()
+        with self._lock:
+            db = self._connect_locked()
+            row = db.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                if row is not None:
+                    with db:
+                        db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            with db:
+                db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, model: str, options: Optional[Dict[str, Any]], prompt: str, response: str):
+        """Store a response, evicting least recently used entries past max_entries"""
+        if not response:
+            return
+        key = cache_key(model, options, prompt)
+        now = time.time()
+        with self._lock:
+            db = self._connect_locked()
+            with db:
+                db.execute("INSERT OR REPLACE INTO responses (key, model, response, created_at, used_at) "
+                           "VALUES (?, ?, ?, ?, ?)", (key, model, response, now, now))
+                count = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_entries:
+                    excess = count - self.max_entries + min(EVICT_BATCH, self.max_entries // 10)
+                    db.execute("DELETE FROM responses WHERE key IN "
+                               "(SELECT key FROM responses ORDER BY used_at LIMIT ?)", (excess,))
+
+    def purge_expired(self) -> int:
+        """Delete every expired response; returns how many were removed"""
+        if not self.ttl:
+            return 0
+        with self._lock:
+            db = self._connect_locked()
+            with db:
+                return db.execute("DELETE FROM responses WHERE created_at < ?",
+                                  (time.time() - self.ttl,)).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process and the number of stored responses"""
+        with self._lock:
+            entries = self._connect_locked().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        with self._lock:
+            db, self._db = self._db, None
+        if db is not None:
+            db.close()
+
+    def _connect_locked(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            with db:
+                db.executescript(CACHE_SCHEMA)
+            self._db = db
+        return self._db
+
+
+_default_cache: Optional[LLMCache] = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide cache shared by every generator"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
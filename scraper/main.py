@@ -1,14 +1,23 @@
 import os
 import json
-import time
 import re
 import csv
+import argparse
 from dotenv import load_dotenv
-from curl_cffi import requests as crequests
-from bs4 import BeautifulSoup
 from supabase import create_client, Client
 from datetime import datetime
 from enhanced_ai_generator import EnhancedAIGenerator
+from dom_index import DomIndex
+from fetch_engine import FetchEngine
+from http_session import SessionPool
+from http_cache import ResponseCache
+from image_urls import large_image_url
+from page_archive import PageArchive
+from parser_backends import make_soup
+from price_history import PriceHistory
+from script_images import extract_script_images, has_image_payload
+from snapshot_store import SnapshotStore
+from taxonomy import CLASSIFIER
 
 # Load environment variables from .env file
 load_dotenv()
@@ -19,6 +28,8 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 AMAZON_TAG = os.getenv("AMAZON_PARTNER_TAG", "techdealsuae-21")
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = "devstral-small-2:24b"  # Updated to use the working model
+FETCH_CONCURRENCY = 4  # Max product page requests in flight
+HTTP_CACHE_TTLS = {"product": 12 * 3600, "image": 30 * 86400}  # Seconds before a cached response is revalidated
 
 # Headers for requests
 HEADERS = {
@@ -27,6 +38,23 @@ HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
 }
 
+# Persistent per-host sessions shared by the fetcher and the Ollama calls
+SESSIONS = SessionPool(pool_size=FETCH_CONCURRENCY)
+
+# Shared pooled fetcher for product pages (archived, and cached per HTTP_CACHE_TTLS)
+ENGINE = FetchEngine(
+    concurrency=FETCH_CONCURRENCY,
+    headers=HEADERS,
+    sessions=SESSIONS,
+    archive=PageArchive(),
+    cache=ResponseCache(ttls=HTTP_CACHE_TTLS),
+)
+
+# Every scraped product record, appended to compressed segments (scraped_data/snapshots/)
+SNAPSHOTS = SnapshotStore()
+# Per-ASIN price series fed by every saved snapshot (scraped_data/price_history/)
+PRICE_HISTORY = PriceHistory()
+
 if not SUPABASE_URL or not SUPABASE_KEY:
     print("❌ Warning: Missing SUPABASE_URL or SUPABASE_KEY.")
 
@@ -37,131 +65,14 @@ except Exception as e:
     exit(1)
 
 
-# Category mapping for consistent product classification
-CATEGORY_MAPPING = {
-    # Electronics
-    "Electronics": "Electronics",
-    "Computers": "Electronics",
-    "Cell Phones & Accessories": "Electronics",
-    "Camera & Photo": "Electronics",
-    "Television & Video": "Electronics",
-    "Car Electronics": "Electronics",
-    "Wearable Technology": "Electronics",
-    "Headphones": "Electronics",
-    "Portable Audio & Video": "Electronics",
-    
-    # Home & Kitchen
-    "Home & Kitchen": "Home & Kitchen",
-    "Kitchen & Dining": "Home & Kitchen",
-    "Furniture": "Home & Kitchen",
-    "Bedding": "Home & Kitchen",
-    "Bath": "Home & Kitchen",
-    "Home Décor": "Home & Kitchen",
-    "Lighting & Ceiling Fans": "Home & Kitchen",
-    "Heating, Cooling & Air Quality": "Home & Kitchen",
-    
-    # Fashion
-    "Clothing, Shoes & Jewelry": "Fashion",
-    "Men's Fashion": "Fashion",
-    "Women's Fashion": "Fashion",
-    "Girls' Fashion": "Fashion",
-    "Boys' Fashion": "Fashion",
-    "Watches": "Fashion",
-    "Luggage & Travel Gear": "Fashion",
-    
-    # Beauty & Personal Care
-    "Beauty & Personal Care": "Beauty & Health",
-    "Health & Household": "Beauty & Health",
-    "Personal Care": "Beauty & Health",
-    "Skin Care": "Beauty & Health",
-    "Hair Care": "Beauty & Health",
-    
-    # Sports & Outdoors
-    "Sports & Outdoors": "Sports & Outdoors",
-    "Exercise & Fitness": "Sports & Outdoors",
-    "Outdoor Recreation": "Sports & Outdoors",
-    "Sports": "Sports & Outdoors",
-    
-    # Toys & Games
-    "Toys & Games": "Toys & Games",
-    "Games": "Toys & Games",
-    "Video Games": "Toys & Games",
-    
-    # Books & Media
-    "Books": "Books & Media",
-    "Kindle Store": "Books & Media",
-    "Movies & TV": "Books & Media",
-    "Music": "Books & Media",
-    
-    # Baby & Kids
-    "Baby": "Baby & Kids",
-    "Baby Products": "Baby & Kids",
-    "Kids' Fashion": "Baby & Kids",
-    
-    # Office & School
-    "Office Products": "Office & School",
-    "Office & School Supplies": "Office & School",
-    
-    # Automotive
-    "Automotive": "Automotive",
-    "Car & Motorbike": "Automotive",
-    
-    # Pet Supplies
-    "Pet Supplies": "Pet Supplies",
-    
-    # Tools & Home Improvement
-    "Tools & Home Improvement": "Tools & DIY",
-    "DIY & Tools": "Tools & DIY",
-    
-    # Grocery
-    "Grocery & Gourmet Food": "Grocery",
-    "Grocery": "Grocery",
-}
-
-# Subcategory keywords for better classification
-SUBCATEGORY_KEYWORDS = {
-    "Electronics": ["phone", "laptop", "computer", "tablet", "camera", "headphone", "speaker", "tv", "monitor", "keyboard", "mouse", "charger", "cable", "battery", "drone", "smartwatch", "earbuds", "gaming"],
-    "Home & Kitchen": ["kitchen", "furniture", "bedding", "curtain", "rug", "lamp", "table", "chair", "sofa", "mattress", "pillow", "cookware", "appliance", "blender", "coffee"],
-    "Fashion": ["shirt", "dress", "pants", "shoes", "jacket", "watch", "bag", "wallet", "sunglasses", "jewelry", "ring", "necklace", "bracelet"],
-    "Beauty & Health": ["skincare", "makeup", "shampoo", "cream", "lotion", "vitamin", "supplement", "toothbrush", "razor", "perfume"],
-    "Sports & Outdoors": ["fitness", "gym", "yoga", "running", "cycling", "camping", "hiking", "sports", "exercise", "weights"],
-    "Toys & Games": ["toy", "game", "puzzle", "lego", "doll", "action figure", "board game", "playstation", "xbox", "nintendo"],
-    "Books & Media": ["book", "novel", "kindle", "audiobook", "magazine"],
-    "Baby & Kids": ["baby", "infant", "toddler", "diaper", "stroller", "crib"],
-    "Automotive": ["car", "vehicle", "auto", "motor", "tire", "oil"],
-    "Pet Supplies": ["dog", "cat", "pet", "aquarium", "bird"],
-}
-
-
 def normalize_category(raw_category, product_title=""):
     """Normalize and classify product category for consistent organization"""
-    if not raw_category:
-        raw_category = "General"
-    
-    # Clean up category string
-    raw_category = raw_category.strip()
-    
-    # Extract primary category (before any dash or subcategory)
-    primary_category = raw_category.split(" - ")[0].strip() if " - " in raw_category else raw_category
-    
-    # Try direct mapping first
-    if primary_category in CATEGORY_MAPPING:
-        return CATEGORY_MAPPING[primary_category]
-    
-    # Try partial matching
-    for key, mapped_category in CATEGORY_MAPPING.items():
-        if key.lower() in raw_category.lower() or raw_category.lower() in key.lower():
-            return mapped_category
-    
-    # Use keyword-based classification from product title
-    title_lower = product_title.lower()
-    for category, keywords in SUBCATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in title_lower:
-                return category
-    
-    # Default category
-    return "General"
+    return CLASSIFIER.classify(raw_category, product_title)
+
+
+def normalize_categories(items):
+    """normalize_category() for many (raw_category, product_title) pairs"""
+    return CLASSIFIER.classify_many(items)
 
 
 def extract_subcategory(raw_category):
@@ -171,17 +82,25 @@ def extract_subcategory(raw_category):
     return None
 
 
+def fetch_page(url, replay=False):
+    """Fetch a URL and return the raw response body (bytes).
+    
+    Every fetched page is kept in the raw page archive; with replay=True the
+    archived copy is returned instead of hitting the network.
+    """
+    result = ENGINE.fetch_sync(url, replay=replay)
+    if result is None:
+        print(f"❌ Failed to fetch {url}")
+        return None
+    return result.content
+
+
 def get_soup(url):
     """Fetch a URL and return BeautifulSoup object"""
-    try:
-        response = crequests.get(url, headers=HEADERS, impersonate="chrome110", timeout=30)
-        if response.status_code == 200:
-            return BeautifulSoup(response.content, "html.parser")
-        else:
-            print(f"❌ Failed to fetch {url}: Status {response.status_code}")
-    except Exception as e:
-        print(f"❌ Error fetching {url}: {e}")
-    return None
+    html = fetch_page(url)
+    if html is None:
+        return None
+    return make_soup(html)
 
 
 def extract_price(soup):
@@ -274,28 +193,6 @@ def extract_all_images(soup):
             return True
         return False
     
-    def convert_to_large(url):
-        """Convert Amazon thumbnail URL to high-resolution version"""
-        if not url:
-            return url
-        # Common Amazon thumbnail patterns to high-res
-        patterns = [
-            (r'_AC_US\d+_', '_AC_SL1500_'),
-            (r'_AC_SX\d+_', '_AC_SL1500_'),
-            (r'_AC_SY\d+_', '_AC_SL1500_'),
-            (r'_SX\d+_', '_SL1500_'),
-            (r'_SY\d+_', '_SL1500_'),
-            (r'_SS\d+_', '_SL1500_'),
-            (r'_SR\d+,\d+_', '_SL1500_'),
-            (r'_AC_UL\d+_', '_AC_SL1500_'),
-            (r'_AC_SR\d+,\d+_', '_AC_SL1500_'),
-            (r'\._[A-Z]{2}\d+_', '._AC_SL1500_'),
-        ]
-        result = url
-        for pattern, replacement in patterns:
-            result = re.sub(pattern, replacement, result)
-        return result
-    
     try:
         # Method 1: Main image via landingImage (highest priority)
         main_img = soup.find("img", id="landingImage")
@@ -318,49 +215,22 @@ def extract_all_images(soup):
             
             # Fallback to src
             if len(images) == 0 and main_img.get("src"):
-                add_image(convert_to_large(main_img["src"]), "main", main_img.get("alt", ""))
+                add_image(large_image_url(main_img["src"]), "main", main_img.get("alt", ""))
         
         # Method 2: Parse ImageBlockATF script for all gallery images (MOST RELIABLE)
         scripts = soup.find_all("script", type="text/javascript")
         for script in scripts:
-            if script.string:
-                # Look for colorImages data structure
-                if "'colorImages'" in script.string or '"colorImages"' in script.string:
-                    try:
-                        # Extract hiRes images (highest quality)
-                        hi_res_urls = re.findall(r'"hiRes"\s*:\s*"([^"]+)"', script.string)
-                        for url in hi_res_urls:
-                            if url and url != "null":
-                                add_image(url, "gallery")
-                        
-                        # Also extract large images as backup
-                        large_urls = re.findall(r'"large"\s*:\s*"([^"]+)"', script.string)
-                        for url in large_urls:
-                            if url and url != "null":
-                                add_image(url, "gallery")
-                    except Exception as e:
-                        print(f"⚠️ Error parsing colorImages: {e}")
-                
-                # Look for imageGalleryData
-                if "imageGalleryData" in script.string:
-                    try:
-                        urls = re.findall(r'"mainUrl"\s*:\s*"([^"]+)"', script.string)
-                        for url in urls:
-                            add_image(url, "gallery")
-                    except:
-                        pass
-                
-                # Look for P.when ImageBlockATF data
-                if "ImageBlockATF" in script.string:
-                    try:
-                        # Extract all image URLs from this block
-                        all_urls = re.findall(r'https://m\.media-amazon\.com/images/[^"\']+', script.string)
-                        for url in all_urls:
-                            # Only add high-res images (SL1500, SL1000, etc)
-                            if re.search(r'_SL1\d{3}_|_SL\d{4}_', url):
-                                add_image(url, "gallery")
-                    except:
-                        pass
+            if script.string and has_image_payload(script.string):
+                records = extract_script_images(script.string)
+                # hiRes first (highest quality), then large as backup,
+                # imageGalleryData, and finally other 1000px+ renditions
+                for kind in ("hiRes", "large", "mainUrl"):
+                    for record in records:
+                        if record.kind == kind:
+                            add_image(record.url, "gallery")
+                for record in records:
+                    if record.kind == "main" and record.is_high_res:
+                        add_image(record.url, "gallery")
         
         # Method 3: Image gallery thumbnails from HTML
         thumb_selectors = [
@@ -377,7 +247,7 @@ def extract_all_images(soup):
             for img in thumbs:
                 src = img.get("src", "")
                 if src:
-                    full_url = convert_to_large(src)
+                    full_url = large_image_url(src)
                     add_image(full_url, "gallery", img.get("alt", ""))
         
         # Method 4: A+ Content / Enhanced Brand Content images
@@ -394,7 +264,7 @@ def extract_all_images(soup):
             for img in aplus_imgs:
                 src = img.get("src") or img.get("data-src", "")
                 if src and "sprite" not in src and "icon" not in src:
-                    full_url = convert_to_large(src)
+                    full_url = large_image_url(src)
                     add_image(full_url, "aplus", img.get("alt", ""))
         
         # Method 5: Variant images (different colors/styles)
@@ -402,7 +272,7 @@ def extract_all_images(soup):
         for img in variant_buttons:
             src = img.get("src", "")
             if src:
-                full_url = convert_to_large(src)
+                full_url = large_image_url(src)
                 add_image(full_url, "variant", img.get("alt", ""))
         
         # Method 6: Fallback - scan for any remaining product images
@@ -417,7 +287,7 @@ def extract_all_images(soup):
                 for img in soup.select(selector):
                     src = img.get("src", "")
                     if src and "sprite" not in src and "transparent" not in src and "logo" not in src.lower():
-                        add_image(convert_to_large(src), "fallback", img.get("alt", ""))
+                        add_image(large_image_url(src), "fallback", img.get("alt", ""))
         
         print(f"📸 Found {len(images)} total images")
 
@@ -676,19 +546,36 @@ def extract_qa(soup, max_qa=10):
 
 
 
-def scrape_amazon_product_enhanced(url):
+def scrape_amazon_product_enhanced(url, replay=False):
     """Enhanced scraper that extracts all photos, price, and reviews"""
     print(f"\n{'='*60}")
-    print(f"🔍 Scraping: {url}")
+    print(f"🔍 Scraping: {url}{' (replay)' if replay else ''}")
     print(f"{'='*60}")
     
-    soup = get_soup(url)
-    if not soup:
+    html = fetch_page(url, replay=replay)
+    if not html:
         return None
     
+    return parse_product_page(html, url)
+
+
+def parse_product_page(html, url, single_pass=True, backend=None):
+    """Parse a fetched product page into the scraped product dict.
+    
+    Split out from scrape_amazon_product_enhanced so the network fetch and the
+    CPU-bound parse can run in separate pipeline stages.
+    
+    With single_pass=True the tree is walked once into a DomIndex and every
+    extractor's page-level lookup is served from it; single_pass=False queries
+    the soup directly (kept for benchmark_parse.py). backend overrides the
+    HTML_PARSER setting (see parser_backends.py).
+    """
+    soup = make_soup(html, backend)
+    page = DomIndex(soup) if single_pass else soup
+    
     try:
         # Extract Title
-        title_elem = soup.find("span", {"id": "productTitle"})
+        title_elem = page.find("span", {"id": "productTitle"})
         if not title_elem:
             print("⚠️ Could not find product title. Content might be hidden.")
             return None
@@ -696,38 +583,38 @@ def scrape_amazon_product_enhanced(url):
         print(f"📦 Title: {title[:50]}...")
         
         # Extract ALL Images
-        images = extract_all_images(soup)
+        images = extract_all_images(page)
         print(f"📸 Found {len(images)} images")
         
         # Primary image URL (for backwards compatibility)
         image_url = images[0]["url"] if images else ""
         
         # Extract Price Data
-        price_data = extract_price(soup)
+        price_data = extract_price(page)
         print(f"💰 Price: {price_data['currency']} {price_data['current_price']}")
         if price_data["discount_percent"]:
             print(f"   💸 Discount: {price_data['discount_percent']}% off")
         
         # Extract Reviews (increased limit)
-        reviews_data = extract_reviews(soup, max_reviews=20)
+        reviews_data = extract_reviews(page, max_reviews=20)
         print(f"⭐ Rating: {reviews_data['average_rating']} ({reviews_data['total_reviews']} reviews)")
         
         # Extract Specifications
-        specifications = extract_specifications(soup)
+        specifications = extract_specifications(page)
         
         # Extract Q&A
-        qa_data = extract_qa(soup, max_qa=10)
+        qa_data = extract_qa(page, max_qa=10)
         
         # Extract Features (Bullets)
         bullets = []
         try:
-            bullet_div = soup.find("div", id="feature-bullets")
+            bullet_div = page.find("div", id="feature-bullets")
             if bullet_div:
                 bullets = [li.get_text(strip=True) for li in bullet_div.find_all("span", class_="a-list-item")]
             
             # Fallback to product description if bullets are empty or sparse
             if not bullets or len(bullets) < 2:
-                desc_div = soup.find("div", id="productDescription")
+                desc_div = page.find("div", id="productDescription")
                 if desc_div:
                     desc_text = desc_div.get_text(" ", strip=True)
                     if desc_text:
@@ -741,7 +628,7 @@ def scrape_amazon_product_enhanced(url):
         raw_category = "General"
         subcategory = None
         try:
-            breadcrumb_div = soup.find("div", id="wayfinding-breadcrumbs_feature_div")
+            breadcrumb_div = page.find("div", id="wayfinding-breadcrumbs_feature_div")
             if breadcrumb_div:
                 items = breadcrumb_div.find_all("li")
                 clean_items = [i.get_text(strip=True) for i in items if len(i.get_text(strip=True)) > 1]
@@ -760,7 +647,7 @@ def scrape_amazon_product_enhanced(url):
         
         # Extract Brand
         brand = ""
-        brand_elem = soup.find("a", {"id": "bylineInfo"})
+        brand_elem = page.find("a", {"id": "bylineInfo"})
         if brand_elem:
             brand = brand_elem.get_text(strip=True).replace("Visit the ", "").replace(" Store", "")
         
@@ -860,7 +747,7 @@ Respond ONLY with valid JSON in this exact format:
             }
         }
         
-        response = crequests.post(OLLAMA_API_URL, json=payload, impersonate="chrome110", timeout=300)
+        response = SESSIONS.session(OLLAMA_API_URL).post(OLLAMA_API_URL, json=payload, timeout=300)
         
         if response.status_code == 200:
             data = response.json()
@@ -938,7 +825,6 @@ Generate JSON with:
 - insights: array of objects with type, title, text
 - review_highlights: array with quote and keyword
 - keywords: array of positive keywords
-- price_insight: "lowest_price"/"good_deal"/"fair_price"/"wait_for_drop"
 
 Respond ONLY with valid JSON."""
     
@@ -951,12 +837,13 @@ Respond ONLY with valid JSON."""
             "options": {"temperature": 0.6, "num_predict": 1200}
         }
         
-        response = crequests.post(OLLAMA_API_URL, json=payload, impersonate="chrome110", timeout=180)
+        response = SESSIONS.session(OLLAMA_API_URL).post(OLLAMA_API_URL, json=payload, timeout=180)
         
         if response.status_code == 200:
             data = response.json()
             content = data.get("response", "{}").replace("```json", "").replace("```", "").strip()
             result = json.loads(content)
+            result["price_insight"] = price_insight(product_data)["price_insight"]
             print("✅ Enhanced AI analysis generated")
             return result
         else:
@@ -967,6 +854,17 @@ Respond ONLY with valid JSON."""
         return generate_fallback_analysis(product_data)
 
 
+def price_insight(product_data):
+    """Price insight from the product's price history (discount badge when too short)"""
+    price_data = product_data.get('price', {})
+    return PRICE_HISTORY.insight(
+        product_data.get('asin'),
+        price_data.get('current_price'),
+        now=product_data.get('scraped_at'),
+        discount_percent=price_data.get('discount_percent'),
+    )
+
+
 def generate_fallback_analysis(product_data):
     """Generate fallback AI analysis when LLM fails"""
     rating = product_data.get('rating', 4.0)
@@ -992,40 +890,41 @@ def generate_fallback_analysis(product_data):
     insights = []
     if rating >= 4.5:
         insights.append({"type": "positive", "title": "Highly Rated", "text": f"Top rated with {rating} stars"})
-    if discount >= 20:
+    price = price_insight(product_data)
+    if price["price_insight"] == "lowest_price" and price["low"] is not None:
+        insights.append({"type": "positive", "title": "Lowest Price", "text": f"Lowest price in {price['days']} days"})
+    elif discount >= 20:
         insights.append({"type": "positive", "title": "Great Deal", "text": f"{discount}% discount"})
     if reviews_count >= 1000:
         insights.append({"type": "positive", "title": "Verified Choice", "text": f"{reviews_count}+ reviews"})
     if brand and brand != 'Unknown':
         insights.append({"type": "neutral", "title": "Trusted Brand", "text": f"Official {brand} product"})
     
-    price_insight = "lowest_price" if discount >= 25 else "good_deal" if discount >= 15 else "fair_price"
-    
     return {
         "recommendation_score": score,
         "recommendation_level": level,
         "insights": insights[:4],
         "review_highlights": [{"quote": "Quality product", "keyword": "quality"}],
         "keywords": ["Quality", "Value", "Reliable"],
-        "price_insight": price_insight
+        "price_insight": price["price_insight"]
     }
 
 
-def save_product_data(data, output_dir="scraped_data"):
-    """Save scraped data to JSON file"""
-    os.makedirs(output_dir, exist_ok=True)
-    
-    filename = f"{data.get('asin', 'unknown')}_{int(time.time())}.json"
-    filepath = os.path.join(output_dir, filename)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    print(f"💾 Saved to {filepath}")
-    return filepath
+def save_product_data(data):
+    """Append scraped data to the product snapshot store (only if it changed)"""
+    if not data.get('asin'):
+        print("⚠️ Not saving snapshot: product has no ASIN")
+        return None
+    ref, changed = SNAPSHOTS.save(data)
+    PRICE_HISTORY.record_snapshot(data)
+    if changed:
+        print(f"💾 Saved snapshot to {ref.segment} @ {ref.offset}")
+    else:
+        print(f"💾 Unchanged since {ref.scraped_at}, recorded heartbeat")
+    return ref
 
 
-def main():
+def main(replay=False):
     """Main function to run the enhanced scraper"""
     product_urls = []
     csv_path = os.path.join(os.path.dirname(__file__), "products.csv")
@@ -1054,7 +953,7 @@ def main():
     for i, url in enumerate(product_urls, 1):
         print(f"\n[{i}/{len(product_urls)}]")
         
-        data = scrape_amazon_product_enhanced(url)
+        data = scrape_amazon_product_enhanced(url, replay=replay)
         
         if data:
             # Save raw data locally
@@ -1112,9 +1011,6 @@ def main():
                 failed += 1
         else:
             failed += 1
-        
-        # Rate limiting
-        time.sleep(2)
     
     print(f"\n{'='*60}")
     print(f"📊 Summary: {successful} successful, {failed} failed")
@@ -1160,4 +1056,8 @@ def update_site_stats():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Enhanced Amazon product scraper")
+    parser.add_argument("--replay", action="store_true",
+                        help="Read product pages from the raw page archive instead of the network")
+    args = parser.parse_args()
+    main(replay=args.replay)
@@ -3,7 +3,7 @@
 ====================================================
 Production-grade batch processor with:
 - Priority-based processing (best products first)
-- Concurrent worker threads for faster processing
+- Pipelined fetch → parse → AI → upload stages with per-stage workers
 - Automatic progress saving and resume capability
 - Detailed statistics and logging
 - Rate limiting and anti-blocking measures
@@ -24,25 +24,34 @@ from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from main import (
-    scrape_amazon_product_enhanced,
+    fetch_page,
     generate_fallback_content,
     supabase,
     OLLAMA_API_URL,
+    SESSIONS,
     normalize_category
 )
 from enhanced_ai_generator import EnhancedAIGenerator
+from ollama_dispatcher import DEFAULT_MAX_IN_FLIGHT, get_ollama_dispatcher
+from parse_pool import ParsePool
+from rate_limiter import get_rate_limiter
 
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
 CONFIG = {
-    "max_workers": 2,  # Concurrent scraping threads (keep low to avoid blocking)
+    "max_workers": 2,  # Concurrent fetch threads (keep low to avoid blocking)
+    "parse_workers": os.cpu_count() or 2,  # Parse processes (0 = parse in the pipeline threads)
+    "ai_workers": 2 * DEFAULT_MAX_IN_FLIGHT,  # AI threads; extra ones queue by priority for a slot
+    "ollama_parallel": DEFAULT_MAX_IN_FLIGHT,  # Requests in flight at Ollama (OLLAMA_NUM_PARALLEL)
+    "upload_workers": 2,  # Concurrent Supabase uploads
+    "queue_size": 4,  # Max items buffered between pipeline stages
     "batch_size": 50,  # Products per batch before saving progress
-    "min_delay": 3.0,  # Minimum delay between requests (seconds)
-    "max_delay": 6.0,  # Maximum delay between requests
+    "requests_per_second": 0.4,  # Global amazon.ae budget shared by all fetch workers
+    "burst": 2,  # Requests allowed back-to-back after an idle period
     "max_retries": 3,  # Retries for failed products
     "retry_delay": 30,  # Delay before retry (seconds)
-    "ai_timeout": 300,  # AI generation timeout (seconds)
+    "ai_timeout": 300,  # Per-request AI timeout, queue wait included (seconds)
     "priority_threshold": 100,  # Only process products with priority >= this
     "auto_resume": True,  # Automatically resume from last position
 }
@@ -107,11 +116,18 @@ class SessionStats:
 # AI CONTENT GENERATOR
 # ============================================================================
 class AIContentGenerator:
-    """Thread-safe AI content generator with caching"""
+    """Thread-safe AI content generator
+    
+    Generations run concurrently; the shared Ollama dispatcher caps requests
+    in flight at CONFIG["ollama_parallel"] and serves the highest-priority
+    products first.
+    """
     
     def __init__(self):
         self.generator = None
-        self.lock = threading.Lock()
+        self.dispatcher = get_ollama_dispatcher()
+        self.dispatcher.configure(max_in_flight=CONFIG["ollama_parallel"],
+                                  default_timeout=CONFIG["ai_timeout"])
         self._initialize()
     
     def _initialize(self):
@@ -119,47 +135,42 @@ class AIContentGenerator:
         try:
             self.generator = EnhancedAIGenerator(
                 ollama_url=OLLAMA_API_URL, 
-                model="devstral-small-2:24b"
+                model="devstral-small-2:24b",
+                sessions=SESSIONS,
+                dispatcher=self.dispatcher,
             )
             print("✅ AI Generator initialized")
         except Exception as e:
             print(f"⚠️ AI Generator initialization failed: {e}")
             self.generator = None
     
-    def generate_content(self, product_data: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    def generate_content(self, product_data: Dict[str, Any], priority: float = 0.0) -> Optional[Dict[str, str]]:
         """Generate AI content for a product (thread-safe)"""
-        with self.lock:
-            if not self.generator:
-                return self._generate_fallback(product_data)
+        if not self.generator:
+            return self._generate_fallback(product_data)
+        
+        try:
+            # Generate the English and Arabic reviews in one call
+            reviews = self.generator.generate_bilingual_review(product_data, priority=priority)
+            review_en, review_ar = reviews["en"], reviews["ar"]
             
-            try:
-                # Generate English review
-                review_en = self.generator.generate_professional_review(
-                    product_data, language="en"
-                )
-                
-                # Generate Arabic review
-                review_ar = self.generator.generate_professional_review(
-                    product_data, language="ar"
-                )
-                
-                # Format for database
-                desc_en = self.generator.format_for_database(review_en, language="en")
-                desc_ar = self.generator.format_for_database(review_ar, language="ar")
-                
-                return {
-                    "title_en": product_data['title'],
-                    "title_ar": product_data['title'],
-                    "desc_en": desc_en,
-                    "desc_ar": desc_ar,
-                    "overall_score": review_en.get('overall_score', 80),
-                    "pros_count": len(review_en.get('pros', [])),
-                    "cons_count": len(review_en.get('cons', [])),
-                }
-                
-            except Exception as e:
-                print(f"⚠️ AI generation error: {e}")
-                return self._generate_fallback(product_data)
+            # Format for database
+            desc_en = self.generator.format_for_database(review_en, language="en")
+            desc_ar = self.generator.format_for_database(review_ar, language="ar")
+            
+            return {
+                "title_en": product_data['title'],
+                "title_ar": product_data['title'],
+                "desc_en": desc_en,
+                "desc_ar": desc_ar,
+                "overall_score": review_en.get('overall_score', 80),
+                "pros_count": len(review_en.get('pros', [])),
+                "cons_count": len(review_en.get('cons', [])),
+            }
+            
+        except Exception as e:
+            print(f"⚠️ AI generation error: {e}")
+            return self._generate_fallback(product_data)
     
     def _generate_fallback(self, product_data: Dict[str, Any]) -> Dict[str, str]:
         """Generate fallback content when AI fails"""
@@ -369,6 +380,84 @@ def upload_to_database(product_data: Dict, ai_content: Dict) -> Optional[str]:
         raise Exception(f"Database upload failed: {e}")
 
 
+# ============================================================================
+# PIPELINE
+# ============================================================================
+@dataclass
+class PipelineItem:
+    """A product moving through the fetch → parse → AI → upload stages"""
+    index: int
+    task: ProductTask
+    html: Optional[bytes] = None
+    product_data: Optional[Dict[str, Any]] = None
+    ai_content: Optional[Dict[str, Any]] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+_STAGE_DONE = object()  # Sentinel telling a stage worker to shut down
+
+
+class PipelineStage:
+    """Pool of worker threads feeding one pipeline stage.
+    
+    Workers pull items from a bounded inbox, run the stage handler and push
+    the item to the next stage. Failed items skip the remaining stages and go
+    straight to the results queue. When the last worker of a stage exits it
+    sends one sentinel per downstream worker, so shutdown cascades in order.
+    """
+    
+    def __init__(self, name: str, handler, workers: int, inbox: queue.Queue,
+                 outbox: queue.Queue, downstream_workers: int, results: queue.Queue):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.inbox = inbox
+        self.outbox = outbox
+        self.downstream_workers = downstream_workers
+        self.results = results
+        self._alive = workers
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start the stage's worker threads"""
+        for i in range(self.workers):
+            threading.Thread(
+                target=self._worker, name=f"{self.name}-{i + 1}", daemon=True
+            ).start()
+    
+    def _worker(self):
+        while True:
+            item = self.inbox.get()
+            if item is _STAGE_DONE:
+                break
+            
+            try:
+                item = self.handler(item)
+            except Exception as e:
+                mark_task_failed(item.task, f"{self.name}: {e}", exception=True)
+                print(f"     ❌ Error ({self.name}): {e}")
+            
+            if item.task.status == "failed":
+                self.results.put(item)
+            else:
+                self.outbox.put(item)
+        
+        with self._lock:
+            self._alive -= 1
+            last_worker = self._alive == 0
+        if last_worker:
+            for _ in range(self.downstream_workers):
+                self.outbox.put(_STAGE_DONE)
+
+
+def mark_task_failed(task: ProductTask, error: str, exception: bool = False):
+    """Record a failure on a task; only exceptions count towards retry_count"""
+    task.status = "failed"
+    task.error = error
+    if exception:
+        task.retry_count += 1
+
+
 # ============================================================================
 # MAIN PROCESSOR
 # ============================================================================
@@ -380,69 +469,85 @@ class BatchProcessor:
         self.ai_generator = AIContentGenerator()
         self.stats = SessionStats()
         self.lock = threading.Lock()
+        self.parse_pool = ParsePool(workers=CONFIG["parse_workers"])
         
-    def process_single_product(self, task: ProductTask) -> ProductTask:
-        """Process a single product (can be called from thread pool)"""
-        import random
+        # Every fetch worker draws from one shared amazon.ae budget
+        get_rate_limiter().configure("amazon.ae", CONFIG["requests_per_second"], CONFIG["burst"])
+    
+    def _stages(self) -> List[tuple]:
+        """Pipeline stages in order as (name, handler, worker count)"""
+        return [
+            ("fetch", self._fetch_stage, max(1, CONFIG["max_workers"])),
+            ("parse", self._parse_stage, max(1, CONFIG["parse_workers"])),
+            ("ai", self._ai_stage, max(1, CONFIG["ai_workers"])),
+            ("upload", self._upload_stage, max(1, CONFIG["upload_workers"])),
+        ]
+    
+    def _fetch_stage(self, item: PipelineItem) -> PipelineItem:
+        """Stage 1: download the product page"""
+        task = item.task
         
-        # Rate limiting
-        time.sleep(random.uniform(CONFIG["min_delay"], CONFIG["max_delay"]))
+        print(f"\n  📦 [{task.priority_score:.0f}] {task.asin} - {task.title[:40]}...")
+        task.status = "processing"
         
-        try:
-            print(f"\n  📦 [{task.priority_score:.0f}] {task.asin} - {task.title[:40]}...")
-            
-            # 1. Scrape product
-            start_time = time.time()
-            product_data = scrape_amazon_product_enhanced(task.url)
-            scrape_time = time.time() - start_time
-            
-            if not product_data:
-                task.status = "failed"
-                task.error = "Scraping failed - no data returned"
-                return task
-            
-            print(f"     ✓ Scraped ({scrape_time:.1f}s): {product_data['title'][:40]}...")
-            
-            # 2. Generate AI content
-            start_time = time.time()
-            ai_content = self.ai_generator.generate_content(product_data)
-            ai_time = time.time() - start_time
-            
-            if not ai_content:
-                task.status = "failed"
-                task.error = "AI content generation failed"
-                return task
-            
-            print(f"     ✓ AI Generated ({ai_time:.1f}s): Score {ai_content.get('overall_score', 'N/A')}/100")
-            
-            # 3. Upload to database
-            start_time = time.time()
-            product_id = upload_to_database(product_data, ai_content)
-            upload_time = time.time() - start_time
-            
-            print(f"     ✓ Uploaded ({upload_time:.1f}s): ID {product_id}")
-            
-            # Update stats
-            with self.lock:
-                self.stats.products_processed += 1
-                self.stats.ai_generations += 1
-                self.stats.uploads_successful += 1
-                self.stats.total_time_scraping += scrape_time
-                self.stats.total_time_ai += ai_time
-                self.stats.total_time_upload += upload_time
-            
-            task.status = "completed"
-            task.processed_at = datetime.now().isoformat()
-            return task
-            
-        except Exception as e:
-            task.status = "failed"
-            task.error = str(e)
-            task.retry_count += 1
-            with self.lock:
-                self.stats.products_failed += 1
-            print(f"     ❌ Error: {e}")
-            return task
+        start_time = time.time()
+        item.html = fetch_page(task.url)
+        item.timings["fetch"] = time.time() - start_time
+        
+        if not item.html:
+            mark_task_failed(task, "Scraping failed - no data returned")
+        return item
+    
+    def _parse_stage(self, item: PipelineItem) -> PipelineItem:
+        """Stage 2: extract product data from the fetched page"""
+        start_time = time.time()
+        item.product_data = self.parse_pool.parse(item.html, item.task.url)
+        item.html = None  # Raw page is no longer needed
+        item.timings["parse"] = time.time() - start_time
+        
+        if not item.product_data:
+            mark_task_failed(item.task, "Scraping failed - no data returned")
+            return item
+        
+        scrape_time = item.timings["fetch"] + item.timings["parse"]
+        print(f"     ✓ Scraped ({scrape_time:.1f}s): {item.product_data['title'][:40]}...")
+        return item
+    
+    def _ai_stage(self, item: PipelineItem) -> PipelineItem:
+        """Stage 3: generate AI content"""
+        start_time = time.time()
+        item.ai_content = self.ai_generator.generate_content(
+            item.product_data, priority=item.task.priority_score
+        )
+        item.timings["ai"] = time.time() - start_time
+        
+        if not item.ai_content:
+            mark_task_failed(item.task, "AI content generation failed")
+            return item
+        
+        print(f"     ✓ AI Generated ({item.timings['ai']:.1f}s): "
+              f"Score {item.ai_content.get('overall_score', 'N/A')}/100")
+        return item
+    
+    def _upload_stage(self, item: PipelineItem) -> PipelineItem:
+        """Stage 4: upload to the database"""
+        start_time = time.time()
+        product_id = upload_to_database(item.product_data, item.ai_content)
+        item.timings["upload"] = time.time() - start_time
+        
+        print(f"     ✓ Uploaded ({item.timings['upload']:.1f}s): ID {product_id}")
+        
+        with self.lock:
+            self.stats.products_processed += 1
+            self.stats.ai_generations += 1
+            self.stats.uploads_successful += 1
+            self.stats.total_time_scraping += item.timings["fetch"] + item.timings["parse"]
+            self.stats.total_time_ai += item.timings["ai"]
+            self.stats.total_time_upload += item.timings["upload"]
+        
+        item.task.status = "completed"
+        item.task.processed_at = datetime.now().isoformat()
+        return item
     
     def run(self, products: List[ProductTask], start_index: int = 0, max_products: Optional[int] = None):
         """Run the batch processing"""
@@ -482,30 +587,65 @@ class BatchProcessor:
             print("\n✅ No products to process!")
             return
         
-        print(f"\n🚀 Starting batch processing with {CONFIG['max_workers']} workers...\n")
+        stages = self._stages()
+        workers_desc = ", ".join(f"{name}={workers}" for name, _, workers in stages)
+        print(f"\n🚀 Starting pipelined batch processing ({workers_desc})...\n")
         print("=" * 70)
         
-        # Process products
+        # Wire the stages together with bounded queues
+        results: queue.Queue = queue.Queue()
+        inboxes = [queue.Queue(maxsize=CONFIG["queue_size"]) for _ in stages]
+        for n, (name, handler, workers) in enumerate(stages):
+            is_last = n == len(stages) - 1
+            PipelineStage(
+                name, handler, workers,
+                inbox=inboxes[n],
+                outbox=results if is_last else inboxes[n + 1],
+                downstream_workers=1 if is_last else stages[n + 1][2],
+                results=results,
+            ).start()
+        
+        def feed():
+            for original_idx, task in products_to_process:
+                inboxes[0].put(PipelineItem(index=original_idx, task=task))
+            for _ in range(stages[0][2]):
+                inboxes[0].put(_STAGE_DONE)
+        
+        threading.Thread(target=feed, name="feeder", daemon=True).start()
+        
+        # Collect results as they leave the pipeline (possibly out of order)
+        order = [original_idx for original_idx, _ in products_to_process]
+        finished: set = set()
+        next_pos = 0
         batch_count = 0
-        for idx, (original_idx, task) in enumerate(products_to_process):
-            # Process single product
-            result = self.process_single_product(task)
+        
+        while True:
+            item = results.get()
+            if item is _STAGE_DONE:
+                break
             
-            # Update progress
+            result = item.task
             if result.status == "completed":
                 self.progress.mark_processed(result.asin)
             elif result.status == "failed":
                 self.progress.mark_failed(result.asin, result.error, result.url)
+                with self.lock:
+                    self.stats.products_failed += 1
             
-            self.progress.update_index(original_idx)
+            # Only advance the resume index past a contiguous finished prefix
+            finished.add(item.index)
+            while next_pos < len(order) and order[next_pos] in finished:
+                self.progress.update_index(order[next_pos])
+                next_pos += 1
             
             # Save progress periodically
             batch_count += 1
             if batch_count % CONFIG["batch_size"] == 0:
                 self.progress.save()
-                self._print_progress(idx + 1, total_to_process)
+                self._print_progress(batch_count, total_to_process)
         
         # Final save
+        self.parse_pool.close()
         self.progress.save()
         self._print_final_summary(total_to_process)
     
@@ -516,6 +656,8 @@ class BatchProcessor:
         print(f"   Elapsed: {summary['elapsed_time']} | "
               f"Rate: {summary['products_per_hour']}/hour | "
               f"Success: {summary['success_rate']}")
+        print(f"   Throttle: {get_rate_limiter().format_metrics()}")
+        print(f"   AI: {self.ai_generator.dispatcher.format_metrics()}")
         print("=" * 70)
     
     def _print_final_summary(self, total: int):
@@ -0,0 +1,159 @@
+"""
+🎛️ Ollama Request Dispatcher
+============================
+Ollama serves OLLAMA_NUM_PARALLEL generations at once; a single global lock
+around generation leaves all but one of those slots idle. The dispatcher
+lets up to max_in_flight requests run concurrently and queues the rest:
+- Waiting callers are ordered by priority (highest first), FIFO among
+  equal priorities, so high-priority products get content first
+- Each request has a timeout covering both the queue wait and the HTTP
+  call: a request that can't get a slot in time fails with
+  DispatchTimeout without ever reaching the GPU host, and the HTTP call
+  only gets the time that is left
+- Callers run the request in their own thread; the dispatcher only hands
+  out slots, so there are no extra worker threads to manage
+
+Usage:
+    dispatcher = get_ollama_dispatcher()
+    dispatcher.configure(max_in_flight=4)
+    with dispatcher.slot(priority=task.priority_score, timeout=300) as remaining:
+        session.post(url, json=payload, timeout=remaining)
+    print(dispatcher.format_metrics())
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Match the Ollama server's own concurrency (its default is 4 when memory allows)
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv("OLLAMA_NUM_PARALLEL") or 4)
+DEFAULT_TIMEOUT = 300.0  # Seconds per request, queue wait included
+
+
+class DispatchTimeout(TimeoutError):
+    """A request ran out of time before it could be sent"""
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "granted")
+
+    def __init__(self, priority: float, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.granted = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (-self.priority, self.seq) < (-other.priority, other.seq)
+
+
+class OllamaDispatcher:
+    """Priority-ordered slots for concurrent Ollama requests"""
+
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 default_timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            max_in_flight: Requests allowed at the Ollama host at once
+            default_timeout: Seconds per request when the caller gives none
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.default_timeout = default_timeout
+        self._in_flight = 0
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        # Metrics
+        self._completed = 0
+        self._timeouts = 0
+        self._peak_in_flight = 0
+        self._total_wait = 0.0
+
+    def configure(self, max_in_flight: Optional[int] = None, default_timeout: Optional[float] = None):
+        """Change the limits; raising max_in_flight wakes queued requests immediately"""
+        with self._cond:
+            if max_in_flight is not None:
+                self.max_in_flight = max(1, max_in_flight)
+            if default_timeout is not None:
+                self.default_timeout = default_timeout
+            self._grant_locked()
+
+    @contextmanager
+    def slot(self, priority: float = 0.0, timeout: Optional[float] = None) -> Iterator[float]:
+        """Hold one in-flight slot; yields the seconds left of the request timeout
+
+        Raises DispatchTimeout if no slot frees up within the timeout.
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self._acquire(priority, deadline)
+        try:
+            yield max(deadline - time.monotonic(), 0.001)
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._completed += 1
+                self._grant_locked()
+
+    def _acquire(self, priority: float, deadline: float):
+        started = time.monotonic()
+        with self._cond:
+            waiter = _Waiter(priority, next(self._seq))
+            heapq.heappush(self._waiting, waiter)
+            self._grant_locked()
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(waiter)
+                    heapq.heapify(self._waiting)
+                    self._timeouts += 1
+                    raise DispatchTimeout(f"No Ollama slot free within {deadline - started:.0f}s")
+                self._cond.wait(remaining)
+            self._total_wait += time.monotonic() - started
+
+    def _grant_locked(self):
+        """Hand free slots to the highest-priority waiters"""
+        granted = False
+        while self._waiting and self._in_flight < self.max_in_flight:
+            waiter = heapq.heappop(self._waiting)
+            waiter.granted = True
+            self._in_flight += 1
+            granted = True
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        if granted:
+            self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, float]:
+        """Current load and counters since start"""
+        with self._cond:
+            started = self._completed + self._in_flight
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiting),
+                "peak_in_flight": self._peak_in_flight,
+                "completed": self._completed,
+                "timeouts": self._timeouts,
+                "avg_wait": self._total_wait / started if started else 0.0,
+            }
+
+    def format_metrics(self) -> str:
+        m = self.metrics()
+        return (f"ollama {m['in_flight']}/{m['max_in_flight']} in flight, {m['waiting']} queued, "
+                f"avg wait {m['avg_wait']:.1f}s, {m['timeouts']} timeouts")
+
+
+_default_dispatcher: Optional[OllamaDispatcher] = None
+_default_lock = threading.Lock()
+
+
+def get_ollama_dispatcher() -> OllamaDispatcher:
+    """Process-wide dispatcher shared by every AI generator"""
+    global _default_dispatcher
+    with _default_lock:
+        if _default_dispatcher is None:
+            _default_dispatcher = OllamaDispatcher()
+        return _default_dispatcher
@@ -0,0 +1,181 @@
+"""
+🌊 Streaming Ollama Client
+==========================
+With "stream": False every review waits for the whole body, including
+whatever the model keeps writing after the verdict, before a single section
+can be parsed. stream_generate consumes Ollama's NDJSON token stream
+instead:
+- ###SECTION### blocks are split off incrementally as tokens arrive
+  (SectionStream), so completed sections are known mid-generation
+- Generation stops as soon as the stop section completes (e.g. the
+  VERDICT paragraph, or the second VERDICT of a bilingual review) or the
+  response outgrows a length budget; closing the connection makes Ollama
+  abort the request and free its slot
+- Time-to-first-token and total time are measured for every request
+
+Usage:
+    result = stream_generate(session, url, payload, timeout=300,
+                             stop_section="VERDICT", max_chars=16000)
+    print(result.text, result.ttft, result.stop_reason)
+"""
+
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+SECTION_MARKER_RE = re.compile(r"###\s*([A-Z_]+)\s*###")
+MAX_MARKER_LEN = 40  # Unscanned tail kept in case a marker is split across tokens
+PARAGRAPH_BREAK_RE = re.compile(r"\S\s*\n\s*\n\s*\S")
+
+# Why a stream ended
+STOP_DONE = "done"  # The model finished on its own
+STOP_SECTION = "section"  # The stop section completed
+STOP_BUDGET = "budget"  # Length budget exceeded
+
+
+class SectionStream:
+    """Incremental ###SECTION### splitter for a streamed response
+
+    feed() takes the next chunk of text and returns the sections it
+    completed as (name, content) pairs. A section normally completes when
+    the next marker arrives; sections listed in paragraph_sections also
+    complete at their first paragraph break, because anything after a
+    one-paragraph verdict is the model rambling on.
+    """
+
+    def __init__(self, paragraph_sections: Iterable[str] = ()):
+        self.paragraph_sections = set(paragraph_sections)
+        self.completed: List[Tuple[str, str]] = []
+        self.end = 0  # Offset just past the last completed section's content
+        self._text = ""
+        self._current: Optional[str] = None
+        self._start = 0  # Offset of the current section's content
+        self._scan = 0  # Where the next marker search starts
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def current(self) -> Optional[str]:
+        """Name of the section being written (None before the first marker)"""
+        return self._current
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        self._text += chunk
+        newly_completed = []
+        while True:
+            match = SECTION_MARKER_RE.search(self._text, self._scan)
+            if match is None:
+                break
+            self._close(match.start(), newly_completed)
+            self._current, self._start, self._scan = match.group(1), match.end(), match.end()
+
+        if self._current in self.paragraph_sections:
+            match = PARAGRAPH_BREAK_RE.search(self._text, self._start)
+            if match is not None:
+                self._close(match.start() + 1, newly_completed)
+
+        self._scan = max(self._scan, len(self._text) - MAX_MARKER_LEN)
+        return newly_completed
+
+    def finish(self) -> List[Tuple[str, str]]:
+        """Complete the section still being written once the text has ended"""
+        newly_completed = []
+        self._close(len(self._text), newly_completed)
+        return newly_completed
+
+    def _close(self, end: int, newly_completed: List[Tuple[str, str]]):
+        if self._current is not None:
+            section = (self._current, self._text[self._start:end].strip())
+            self.completed.append(section)
+            newly_completed.append(section)
+            self.end = end
+        self._current = None  # Text until the next marker belongs to no section
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Every ###SECTION### of a complete response, as (name, content) pairs"""
+    stream = SectionStream()
+    stream.feed(text)
+    stream.finish()
+    return stream.completed
+
+
+@dataclass
+class StreamResult:
+    text: str
+    ttft: Optional[float]  # Seconds until the first non-empty token
+    elapsed: float
+    stop_reason: str
+    sections: List[Tuple[str, str]]  # Completed sections of text, in order
+
+
+def stream_generate(session, url: str, payload: dict, timeout: float,
+                    stop_section: Optional[str] = None, stop_count: int = 1,
+                    max_chars: Optional[int] = None) -> StreamResult:
+    """POST a generation with "stream": True and read tokens until a stop condition
+
+    Args:
+        session: HTTP session (curl_cffi or requests style)
+        url: Ollama /api/generate endpoint
+        payload: Request body; "stream" is forced on
+        timeout: Seconds for the whole generation
+        stop_section: Stop once this section has completed stop_count times
+        max_chars: Stop once the response is longer than this
+
+    Raises TimeoutError past the timeout, and Exception on Ollama errors.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    stream = SectionStream(paragraph_sections=[stop_section] if stop_section else [])
+    ttft = None
+    stops = 0
+    stop_reason = STOP_DONE
+
+    response = session.post(url, json={**payload, "stream": True}, timeout=timeout, stream=True)
+    try:
+        if response.status_code != 200:
+            raise Exception(f"Ollama API error: {response.status_code}")
+
+        for line in response.iter_lines():
+            if not line:
+                continue
+            message = json.loads(line)
+            if message.get("error"):
+                raise Exception(f"Ollama API error: {message['error']}")
+
+            token = message.get("response", "")
+            if token:
+                if ttft is None:
+                    ttft = time.monotonic() - started
+                for name, _ in stream.feed(token):
+                    if name == stop_section:
+                        stops += 1
+            if message.get("done"):
+                break
+            if stop_section and stops >= stop_count:
+                stop_reason = STOP_SECTION
+                break
+            if max_chars and len(stream.text) > max_chars:
+                stop_reason = STOP_BUDGET
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Ollama generation exceeded {timeout:.0f}s")
+    finally:
+        response.close()  # Mid-stream this cancels the generation on the server
+
+    if stop_reason == STOP_SECTION:
+        text = stream.text[:stream.end]
+    else:
+        text = stream.text
+        stream.finish()  # The last section ran to the end of the response
+    return StreamResult(
+        text=text.strip(),
+        ttft=ttft,
+        elapsed=time.monotonic() - started,
+        stop_reason=stop_reason,
+        sections=stream.completed,
+    )
@@ -0,0 +1,165 @@
+"""
+🗄️ Raw Page Archive
+===================
+Content-addressed, compressed store of every fetched page, so improved
+extractors can be re-run over historical pages without touching the network
+(see --replay in main.py and link_scraper.py).
+
+Layout:
+    page_archive/
+        objects/ab/abcdef...html.zst   Raw page bytes keyed by SHA-256
+        index.jsonl                    One line per fetch: key, url, fetched_at, sha256, ...
+
+Product pages are keyed by ASIN, everything else by URL. Identical pages are
+stored once no matter how often they are fetched. Compression uses zstd when
+the `zstandard` package is installed and falls back to gzip otherwise.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+SCRIPT_DIR = os.path.dirname(__file__)
+DEFAULT_ARCHIVE_DIR = os.path.join(SCRIPT_DIR, "page_archive")
+
+ASIN_PATTERN = re.compile(r'/(?:dp|gp/product)/([A-Z0-9]{10})', re.IGNORECASE)
+
+
+# ============================================================================
+# COMPRESSION
+# ============================================================================
+def compress(data: bytes) -> Tuple[bytes, str]:
+    """Compress bytes with the best available codec, returning (blob, codec)"""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), "zst"
+    return gzip.compress(data, compresslevel=6), "gz"
+
+
+def decompress(blob: bytes, codec: str) -> bytes:
+    """Inverse of compress()"""
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst archive objects")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+def archive_key(url: str) -> str:
+    """ASIN for product pages, the URL itself for everything else"""
+    match = ASIN_PATTERN.search(url)
+    return match.group(1).upper() if match else url
+
+
+# ============================================================================
+# ARCHIVE
+# ============================================================================
+class PageArchive:
+    """Append-only archive of raw fetched pages"""
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._index: Optional[Dict[str, List[dict]]] = None
+        self._lock = threading.Lock()
+
+    def store(self, url: str, content: bytes, fetched_at: Optional[str] = None) -> str:
+        """Archive a fetched page and return its SHA-256"""
+        sha = hashlib.sha256(content).hexdigest()
+        entry = {
+            "key": archive_key(url),
+            "url": url,
+            "fetched_at": fetched_at or datetime.now().isoformat(),
+            "sha256": sha,
+            "size": len(content),
+        }
+
+        with self._lock:
+            existing = self._find_object(sha)
+            if existing:
+                entry["codec"] = existing[1]
+            else:
+                blob, codec = compress(content)
+                path = self._object_path(sha, codec)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(blob)
+                os.replace(tmp_path, path)
+                entry["codec"] = codec
+
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            if self._index is not None:
+                self._index.setdefault(entry["key"], []).append(entry)
+
+        return sha
+
+    def history(self, key_or_url: str) -> List[dict]:
+        """All archived fetches for an ASIN or URL, oldest first"""
+        index = self._load_index()
+        return sorted(index.get(archive_key(key_or_url), []), key=lambda e: e["fetched_at"])
+
+    def latest(self, key_or_url: str) -> Optional[bytes]:
+        """Most recently archived page for an ASIN or URL"""
+        entries = self.history(key_or_url)
+        if not entries:
+            return None
+        return self.load(entries[-1]["sha256"])
+
+    def load(self, sha: str) -> Optional[bytes]:
+        """Read an archived page by content hash"""
+        found = self._find_object(sha)
+        if not found:
+            return None
+        path, codec = found
+        with open(path, 'rb') as f:
+            return decompress(f.read(), codec)
+
+    def iter_pages(self, latest_only: bool = True) -> Iterator[Tuple[dict, bytes]]:
+        """Yield (index entry, raw page) pairs, e.g. as an offline benchmark corpus"""
+        for key in sorted(self._load_index()):
+            entries = self.history(key)
+            for entry in (entries[-1:] if latest_only else entries):
+                content = self.load(entry["sha256"])
+                if content is not None:
+                    yield entry, content
+
+    def _object_path(self, sha: str, codec: str) -> str:
+        return os.path.join(self.objects_dir, sha[:2], f"{sha}.html.{codec}")
+
+    def _find_object(self, sha: str) -> Optional[Tuple[str, str]]:
+        for codec in ("zst", "gz"):
+            path = self._object_path(sha, codec)
+            if os.path.exists(path):
+                return path, codec
+        return None
+
+    def _load_index(self) -> Dict[str, List[dict]]:
+        with self._lock:
+            if self._index is None:
+                index: Dict[str, List[dict]] = {}
+                if os.path.exists(self.index_path):
+                    with open(self.index_path, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            line = line.strip()
+                            if not line:
+                                continue
+                            try:
+                                entry = json.loads(line)
+                            except json.JSONDecodeError:
+                                continue  # Torn write from an interrupted run
+                            index.setdefault(entry["key"], []).append(entry)
+                self._index = index
+            return self._index
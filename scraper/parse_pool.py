@@ -0,0 +1,80 @@
+"""
+🧮 Process-Pool Parse Stage
+===========================
+Parsing a product page (BeautifulSoup + extractors) is pure CPU work and
+serializes under the GIL when run in threads. ParsePool ships the raw HTML
+bytes to worker processes and gets the extracted product dict back, so
+parsing scales across all cores while fetching and uploading stay in I/O
+threads.
+
+Workers are started with forkserver (spawn where unavailable) rather than
+fork, because the parent runs the fetch engine's event loop and pipeline
+threads. The forkserver preloads main.py once, so each worker starts warm.
+If the pool breaks (a worker killed by the OOM killer, ...) parsing
+continues in-process.
+
+Usage:
+    pool = ParsePool(workers=4)
+    product = pool.parse(html_bytes, url)   # Blocking; call from any thread
+    pool.close()
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from main import parse_product_page
+
+
+def _start_method() -> str:
+    methods = multiprocessing.get_all_start_methods()
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+class ParsePool:
+    """Runs parse_product_page in worker processes"""
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers: Worker processes (CPU count by default); 0 parses in-process
+        """
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._broken = False
+        self._lock = threading.Lock()
+
+    def parse(self, html: bytes, url: str) -> Optional[dict]:
+        """Extract the product dict from a raw page (None if it has no product)"""
+        executor = self._get_executor()
+        if executor is None:
+            return parse_product_page(html, url)
+        try:
+            return executor.submit(parse_product_page, html, url).result()
+        except BrokenProcessPool:
+            with self._lock:
+                if not self._broken:
+                    print("⚠️ Parse worker died, parsing in-process from now on")
+                self._broken = True
+            return parse_product_page(html, url)
+
+    def close(self):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self.workers <= 0 or self._broken:
+                return None
+            if self._executor is None:
+                context = multiprocessing.get_context(_start_method())
+                if context.get_start_method() == "forkserver":
+                    context.set_forkserver_preload(["main"])
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._executor
@@ -0,0 +1,141 @@
+"""
+🧩 Pluggable HTML Parser Backends
+=================================
+Every scraper builds its BeautifulSoup trees through make_soup(), so the
+parser can be swapped without touching the extractors:
+
+    html.parser   Pure Python, always available, slowest
+    lxml          libxml2 via bs4's lxml builder (`pip install lxml`)
+    selectolax    Lexbor C parser feeding a bs4 tree (`pip install selectolax`)
+
+The backend is chosen with the HTML_PARSER environment variable (default:
+html.parser; lxml and selectolax are opt-in) or per call. An unavailable
+backend falls back to html.parser with a warning. Different parsers repair
+broken markup differently, so run check_parsers.py against the page archive
+before switching backends.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Union
+
+from bs4 import BeautifulSoup, Comment, SoupStrainer
+from bs4.builder import HTMLTreeBuilder
+
+try:
+    import lxml  # noqa: F401  (only needs to be importable for bs4)
+except ImportError:  # Optional dependency
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # Optional dependency
+    LexborHTMLParser = None
+
+FALLBACK_BACKEND = "html.parser"
+DEFAULT_BACKEND = os.getenv("HTML_PARSER", FALLBACK_BACKEND)
+
+Markup = Union[str, bytes]
+
+
+class SelectolaxTreeBuilder(HTMLTreeBuilder):
+    """bs4 tree builder that lets Lexbor do the tokenizing and tree repair"""
+
+    NAME = "selectolax"
+    ALTERNATE_NAMES = ["lexbor"]
+    features = [NAME] + ALTERNATE_NAMES
+
+    def feed(self, markup: Markup):
+        tree = LexborHTMLParser(markup)
+        root = tree.root
+        if root is None:
+            return
+
+        soup = self.soup
+        node = root
+        # Depth-first walk over Lexbor's tree, replaying it as parser events
+        while node is not None:
+            descend = False
+            if node.is_element_node:
+                soup.handle_starttag(node.tag, None, None, self._attributes(node))
+                if node.first_child is not None:
+                    descend = True
+                else:
+                    soup.endData()
+                    soup.handle_endtag(node.tag)
+            elif node.is_text_node:
+                soup.handle_data(node.text_content or "")
+            elif node.is_comment_node:
+                soup.endData()
+                soup.handle_data(node.comment_content or "")
+                soup.endData(Comment)
+
+            if descend:
+                node = node.first_child
+                continue
+            if node.mem_id == root.mem_id:
+                break
+
+            # Close finished elements on the way back up to the next sibling
+            while node.next is None:
+                node = node.parent
+                soup.endData()
+                soup.handle_endtag(node.tag)
+                if node.mem_id == root.mem_id:
+                    node = None
+                    break
+            if node is not None:
+                node = node.next
+
+    @staticmethod
+    def _attributes(node) -> Dict[str, str]:
+        # Boolean attributes come back as None; html.parser gives ""
+        return {key: ("" if value is None else value) for key, value in node.attributes.items()}
+
+    def test_fragment_to_document(self, fragment: str) -> str:
+        return f"<html><head></head><body>{fragment}</body></html>"
+
+
+_BUILDERS = {
+    "html.parser": lambda: "html.parser",
+    "lxml": lambda: "lxml",
+    "selectolax": lambda: SelectolaxTreeBuilder,
+}
+_warned: set = set()
+_warn_lock = threading.Lock()
+
+
+def backend_available(backend: str) -> bool:
+    """True if the backend's parser library is installed"""
+    if backend == "lxml":
+        return lxml is not None
+    if backend == "selectolax":
+        return LexborHTMLParser is not None
+    return backend == "html.parser"
+
+
+def available_backends() -> List[str]:
+    """Installed backends, slowest first"""
+    return [backend for backend in _BUILDERS if backend_available(backend)]
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Requested (or configured) backend, or html.parser if it isn't usable"""
+    backend = backend or DEFAULT_BACKEND
+    if backend in _BUILDERS and backend_available(backend):
+        return backend
+    with _warn_lock:
+        if backend not in _warned:
+            _warned.add(backend)
+            print(f"⚠️ HTML parser '{backend}' unavailable, using {FALLBACK_BACKEND}")
+    return FALLBACK_BACKEND
+
+
+def make_soup(markup: Markup, backend: Optional[str] = None,
+              parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse HTML with the configured backend, optionally keeping only the
+    regions matched by parse_only"""
+    builder = _BUILDERS[resolve_backend(backend)]()
+    if isinstance(builder, str):
+        return BeautifulSoup(markup, builder, parse_only=parse_only)
+    return BeautifulSoup(markup, builder=builder, parse_only=parse_only)
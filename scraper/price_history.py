@@ -0,0 +1,304 @@
+"""
+📈 Price History
+================
+Per-ASIN price time series built from repeated scrapes, so price insights
+("lowest price in 30 days") come from what the product actually cost instead
+of being guessed from the discount badge or by the LLM.
+
+Layout:
+    scraped_data/price_history/
+        B019HUU8TQ.prices   Header, then one (seconds delta, fils delta) pair
+                            per observation as zigzag varints
+
+Prices are kept as integer minor units (fils) so the delta encoding is
+exact; a typical observation takes 3-5 bytes. Appending writes one pair to
+the end of the file (O(1)); a series is decoded into two array('q') columns
+with itertools.accumulate the first time it is queried. The files are
+derived data: rebuild them from the snapshot store with --rebuild, which
+replays every scrape, including the unchanged ones the store only logged
+as heartbeats, so long-stable prices keep their points in the window.
+
+Usage:
+    history = PriceHistory()
+    history.record("B019HUU8TQ", "2026-01-03T17:09:04", 26.25)
+    history.series("B019HUU8TQ").low(days=30)
+    history.insight("B019HUU8TQ", 24.99, now="2026-01-04T10:00:00")
+
+    python price_history.py --rebuild
+"""
+
+import argparse
+import os
+import statistics
+import threading
+from array import array
+from bisect import bisect_left, insort
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from snapshot_store import DEFAULT_SNAPSHOT_DIR, SnapshotStore
+
+DEFAULT_HISTORY_DIR = os.path.join(os.path.dirname(DEFAULT_SNAPSHOT_DIR), "price_history")
+FILE_MAGIC = b"PRH1"
+MINOR_UNITS = 100  # Fils per dirham
+
+INSIGHT_WINDOW_DAYS = 30
+MIN_HISTORY_POINTS = 3  # Fewer earlier observations: fall back to the discount badge
+LOW_TOLERANCE = 0.005  # Within 0.5% of the window low counts as the low
+GOOD_DEAL_DROP = 0.05  # 5% under the window median
+HIGH_PRICE_RISE = 0.05  # 5% over the window median: wait for a drop
+
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+def _encode_varint(value: int, out: bytearray):
+    value = (value << 1) ^ (value >> 63)  # Zigzag: small negatives stay small
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_pairs(data: bytes, start: int) -> Tuple[List[int], int]:
+    """Zigzag varints from `start`, and the offset just past the last complete pair"""
+    values = []
+    value = shift = 0
+    end = start
+    for offset in range(start, len(data)):
+        byte = data[offset]
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append((value >> 1) ^ -(value & 1))
+        value = shift = 0
+        if len(values) % 2 == 0:
+            end = offset + 1
+    return values[:len(values) - len(values) % 2], end  # A torn final pair is dropped
+
+
+def _epoch_seconds(timestamp) -> int:
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp)
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp())
+    return int(datetime.fromisoformat(timestamp).timestamp())
+
+
+def _to_minor(price: float) -> int:
+    return int(round(float(price) * MINOR_UNITS))
+
+
+# ============================================================================
+# SERIES
+# ============================================================================
+class PriceSeries:
+    """One product's observations: parallel arrays of epoch seconds and fils"""
+
+    def __init__(self, times: Iterable[int] = (), prices: Iterable[int] = ()):
+        self.times = array('q', times)
+        self.prices = array('q', prices)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def append(self, when: int, price: int) -> bool:
+        """Add an observation; out-of-order or repeated timestamps are ignored"""
+        if self.times and when <= self.times[-1]:
+            return False
+        self.times.append(when)
+        self.prices.append(price)
+        return True
+
+    def _window(self, days: Optional[float], now: Optional[int]) -> Tuple[int, int]:
+        """Index range of observations in [now - days, now)"""
+        end = len(self.times) if now is None else bisect_left(self.times, now)
+        if days is None:
+            return 0, end
+        reference = now if now is not None else (self.times[-1] + 1 if self.times else 0)
+        return bisect_left(self.times, reference - int(days * 86400), 0, end), end
+
+    def window_prices(self, days: Optional[float] = None, now=None) -> array:
+        start, end = self._window(days, None if now is None else _epoch_seconds(now))
+        return self.prices[start:end]
+
+    def low(self, days: Optional[float] = None, now=None) -> Optional[float]:
+        """Lowest price in the last `days` (all history by default)"""
+        prices = self.window_prices(days, now)
+        return min(prices) / MINOR_UNITS if prices else None
+
+    def high(self, days: Optional[float] = None, now=None) -> Optional[float]:
+        """Highest price in the last `days`"""
+        prices = self.window_prices(days, now)
+        return max(prices) / MINOR_UNITS if prices else None
+
+    def median(self, days: Optional[float] = None, now=None) -> Optional[float]:
+        """Median price in the last `days`"""
+        prices = self.window_prices(days, now)
+        return statistics.median(prices) / MINOR_UNITS if prices else None
+
+    def rolling_median(self, points: int) -> List[float]:
+        """Median of each observation and the `points - 1` before it"""
+        window: List[int] = []
+        medians = []
+        for index, price in enumerate(self.prices):
+            insort(window, price)
+            if index >= points:
+                del window[bisect_left(window, self.prices[index - points])]
+            middle = len(window) // 2
+            median = window[middle] if len(window) % 2 else (window[middle - 1] + window[middle]) / 2
+            medians.append(median / MINOR_UNITS)
+        return medians
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+class PriceHistory:
+    """Directory of per-ASIN price series files"""
+
+    def __init__(self, root: str = DEFAULT_HISTORY_DIR):
+        self.root = root
+        self._series: Dict[str, PriceSeries] = {}
+        self._lock = threading.Lock()
+
+    def record(self, asin: str, scraped_at, price) -> bool:
+        """Append one observation (None prices are skipped); True if stored"""
+        if not asin or price is None:
+            return False
+        try:
+            when, minor = _epoch_seconds(scraped_at), _to_minor(price)
+        except (TypeError, ValueError):
+            return False
+
+        with self._lock:
+            series = self._load_locked(asin)
+            if len(series) and when <= series.times[-1]:
+                return False  # Out of order or repeated
+            previous = (series.times[-1], series.prices[-1]) if len(series) else (0, 0)
+            out = bytearray() if os.path.exists(self._path(asin)) else bytearray(FILE_MAGIC)
+            _encode_varint(when - previous[0], out)
+            _encode_varint(minor - previous[1], out)
+            os.makedirs(self.root, exist_ok=True)
+            with open(self._path(asin), 'ab') as f:
+                f.write(out)
+            # Only once the deltas are on disk, so the next ones are relative to them
+            series.append(when, minor)
+        return True
+
+    def record_snapshot(self, product: dict) -> bool:
+        """record() a scraped product record's current price"""
+        price = self._snapshot_price(product)
+        return self.record(product.get("asin"), product.get("scraped_at") or datetime.now(), price)
+
+    def series(self, asin: str) -> PriceSeries:
+        """The stored series for an ASIN (empty if never recorded)"""
+        with self._lock:
+            return self._load_locked(asin)
+
+    def insight(self, asin: str, current_price, now=None, discount_percent=None,
+                days: int = INSIGHT_WINDOW_DAYS) -> Dict:
+        """Deterministic price insight for the current price against earlier observations
+
+        Returns {"price_insight", "low", "high", "median", "points", "days"}.
+        With too little history the insight comes from the discount badge.
+        """
+        series = self.series(asin)
+        now = datetime.now() if now is None else now
+        prices = series.window_prices(days, now)
+        result = {"price_insight": None, "low": None, "high": None, "median": None,
+                  "points": len(prices), "days": days}
+
+        if current_price is not None and len(prices) >= MIN_HISTORY_POINTS:
+            low, high = min(prices) / MINOR_UNITS, max(prices) / MINOR_UNITS
+            median = statistics.median(prices) / MINOR_UNITS
+            result.update(low=low, high=high, median=median)
+            current = float(current_price)
+            if current <= low * (1 + LOW_TOLERANCE) and (high > low or current < low):
+                result["price_insight"] = "lowest_price"
+            elif current <= median * (1 - GOOD_DEAL_DROP):
+                result["price_insight"] = "good_deal"
+            elif current >= median * (1 + HIGH_PRICE_RISE):
+                result["price_insight"] = "wait_for_drop"
+            else:
+                result["price_insight"] = "fair_price"
+        else:
+            discount = discount_percent or 0
+            result["price_insight"] = "lowest_price" if discount >= 25 else "good_deal" if discount >= 15 else "fair_price"
+        return result
+
+    def rebuild(self, store: SnapshotStore) -> int:
+        """Recreate every series from the snapshot store; returns observations stored
+
+        Each scrape (snapshot or "seen at" heartbeat) is recorded with the
+        price of the newest snapshot at or before it.
+        """
+        with self._lock:
+            self._series = {}
+            if os.path.isdir(self.root):
+                for name in os.listdir(self.root):
+                    if name.endswith(".prices"):
+                        os.remove(os.path.join(self.root, name))
+        stored = 0
+        for asin in store.asins():
+            refs = store.refs(asin)
+            prices = [self._snapshot_price(store.load(ref)) for ref in refs]
+            current = -1
+            for seen_at in store.seen_times(asin):
+                while current + 1 < len(refs) and refs[current + 1].scraped_at <= seen_at:
+                    current += 1
+                if current >= 0:
+                    stored += self.record(asin, seen_at, prices[current])
+        return stored
+
+    @staticmethod
+    def _snapshot_price(product: dict):
+        return (product.get("price") or {}).get("current_price")
+
+    def _path(self, asin: str) -> str:
+        return os.path.join(self.root, f"{asin}.prices")
+
+    def _load_locked(self, asin: str) -> PriceSeries:
+        series = self._series.get(asin)
+        if series is not None:
+            return series
+        series = PriceSeries()
+        path = self._path(asin)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            if data.startswith(FILE_MAGIC):
+                values, end = _decode_pairs(data, len(FILE_MAGIC))
+                if end < len(data):
+                    # Cut a torn tail so the next append doesn't extend a partial varint
+                    with open(path, 'r+b') as f:
+                        f.truncate(end)
+                series = PriceSeries(accumulate(values[0::2]), accumulate(values[1::2]))
+        self._series[asin] = series
+        return series
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Product price history")
+    parser.add_argument("--root", default=DEFAULT_HISTORY_DIR, help="Price history directory")
+    parser.add_argument("--snapshots", default=DEFAULT_SNAPSHOT_DIR, help="Snapshot store directory")
+    parser.add_argument("--rebuild", action="store_true", help="Recreate all series from the snapshot store")
+    parser.add_argument("--asin", help="Print one product's history and 30-day insight")
+    args = parser.parse_args()
+
+    history = PriceHistory(args.root)
+    if args.rebuild:
+        print(f"📈 Rebuilt {history.rebuild(SnapshotStore(args.snapshots))} price observations")
+    if args.asin:
+        series = history.series(args.asin)
+        for when, price in zip(series.times, series.prices):
+            print(f"  {datetime.fromtimestamp(when).isoformat()}  {price / MINOR_UNITS:>10.2f}")
+        if len(series):
+            current = series.prices[-1] / MINOR_UNITS
+            print(history.insight(args.asin, current, now=series.times[-1]))
+
+
+if __name__ == "__main__":
+    main()
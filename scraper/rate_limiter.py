@@ -0,0 +1,220 @@
+"""
+🚦 Per-Host Token-Bucket Rate Limiter
+=====================================
+One limiter shared by every fetcher in the process (see get_rate_limiter),
+replacing the scattered time.sleep(random.uniform(...)) delays:
+- Each host (or domain family, e.g. every *.amazon.ae host) has its own
+  bucket with a requests-per-second budget and a burst size
+- Callers reserve a slot and only wait for their own slot, so worker
+  threads and coroutines coordinate instead of sleeping blindly
+- Random jitter is added on top of each slot; it never eats into the budget
+- Hosts without a configured rate are not throttled
+- AIMD feedback: each block (503 / captcha) halves a bucket's rate, each
+  run of successes adds a small step back, within [min_rate, max_rate];
+  current rate and block rate are exposed via RateLimiter.metrics()
+
+Usage:
+    limiter = get_rate_limiter()
+    limiter.configure("amazon.ae", rate=0.5, burst=2)
+    limiter.acquire_sync(url)   # blocking
+    await limiter.acquire(url)  # async
+    limiter.record(url, blocked=False)  # feedback after the response
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Requests-per-second budget and burst per domain
+DEFAULT_RATES: Dict[str, Tuple[float, int]] = {
+    "amazon.ae": (0.4, 2),  # Roughly the old 2 workers x 3-6s delay
+}
+DEFAULT_JITTER = 0.5  # Extra random wait, as a fraction of the refill interval
+
+# AIMD tuning
+DECREASE_FACTOR = 0.5  # Multiply the rate by this on a block
+INCREASE_STEP = 0.05  # Requests per second added after each success streak
+SUCCESS_STREAK = 10  # Consecutive successes needed before ramping up
+DECREASE_COOLDOWN = 10.0  # Seconds; blocks from requests already in flight count once
+METRICS_WINDOW = 100  # Recent outcomes used for the block rate
+
+
+class TokenBucket:
+    """Reservation-based token bucket.
+
+    reserve() hands out the next free slot and returns how long the caller
+    must wait for it, so concurrent callers are spaced 1/rate apart without
+    polling.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, jitter: float = DEFAULT_JITTER,
+                 min_rate: Optional[float] = None, max_rate: Optional[float] = None):
+        """
+        Args:
+            rate: Starting requests per second
+            burst: Requests allowed back-to-back after an idle period
+            jitter: Extra random wait per request, as a fraction of 1/rate
+            min_rate: Floor for adaptive decreases (rate / 8 by default)
+            max_rate: Ceiling for adaptive increases (2 x rate by default)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.jitter = max(0.0, jitter)
+        self.min_rate = min_rate if min_rate is not None else rate / 8
+        self.max_rate = max_rate if max_rate is not None else rate * 2
+        self._next_free = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Feedback state
+        self._streak = 0
+        self._last_decrease = float("-inf")
+        self._outcomes: deque = deque(maxlen=METRICS_WINDOW)
+        self.requests = 0
+        self.blocks = 0
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate
+
+    def reserve(self) -> float:
+        """Claim one token, returning the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            # An idle bucket refills up to `burst` tokens, never more
+            earliest = now - (self.burst - 1) * self.interval
+            slot = max(self._next_free, earliest)
+            self._next_free = slot + self.interval
+            wait = max(0.0, slot - now)
+        return wait + random.uniform(0, self.jitter * self.interval)
+
+    def set_rate(self, rate: float):
+        """Change the sustained rate; already reserved slots are kept"""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self.rate = rate
+
+    def record(self, blocked: bool):
+        """Feed back one response: multiplicative decrease, additive increase"""
+        with self._lock:
+            self.requests += 1
+            self._outcomes.append(blocked)
+            if blocked:
+                self.blocks += 1
+                self._streak = 0
+                now = time.monotonic()
+                if now - self._last_decrease >= DECREASE_COOLDOWN:
+                    self._last_decrease = now
+                    self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+                    # Requests already queued at the old spacing must not burst through
+                    self._next_free = max(self._next_free, now) + 1.0 / self.rate
+            else:
+                self._streak += 1
+                if self._streak >= SUCCESS_STREAK:
+                    self._streak = 0
+                    self.rate = min(self.max_rate, self.rate + INCREASE_STEP)
+
+    @property
+    def block_rate(self) -> float:
+        """Share of blocked responses among the recent outcomes"""
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return sum(self._outcomes) / len(self._outcomes)
+
+
+class RateLimiter:
+    """Token buckets keyed by host, with domain-wide budgets"""
+
+    def __init__(self, rates: Optional[Dict[str, Tuple[float, int]]] = None,
+                 jitter: float = DEFAULT_JITTER):
+        """
+        Args:
+            rates: {domain: (requests per second, burst)}; a domain also covers its subdomains
+            jitter: Default jitter for every bucket (fraction of the refill interval)
+        """
+        self.jitter = jitter
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        for domain, (rate, burst) in (DEFAULT_RATES if rates is None else rates).items():
+            self.configure(domain, rate, burst)
+
+    def configure(self, domain: str, rate: float, burst: int = 1, jitter: Optional[float] = None,
+                  min_rate: Optional[float] = None, max_rate: Optional[float] = None):
+        """Set (or replace) the budget for a domain and its subdomains"""
+        bucket = TokenBucket(rate, burst, self.jitter if jitter is None else jitter,
+                             min_rate=min_rate, max_rate=max_rate)
+        with self._lock:
+            self._buckets[domain.lower()] = bucket
+
+    def bucket_for(self, url: str) -> Optional[TokenBucket]:
+        """Bucket governing a URL, or None if its host is unthrottled"""
+        host = (urlsplit(url).hostname or "").lower()
+        with self._lock:
+            for domain, bucket in self._buckets.items():
+                if host == domain or host.endswith("." + domain):
+                    return bucket
+        return None
+
+    def reserve(self, url: str) -> float:
+        """Claim a slot for a request to this URL, returning the wait in seconds"""
+        bucket = self.bucket_for(url)
+        return bucket.reserve() if bucket else 0.0
+
+    async def acquire(self, url: str):
+        """Wait (without blocking the event loop) until a request may be sent"""
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, url: str):
+        """Blocking variant of acquire()"""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, url: str, blocked: bool):
+        """Report whether a response was a block (503 / captcha) to adapt the rate"""
+        bucket = self.bucket_for(url)
+        if bucket:
+            bucket.record(blocked)
+
+    def metrics(self) -> Dict[str, dict]:
+        """Current rate and block rate per throttled domain"""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {
+            domain: {
+                "rate": round(bucket.rate, 3),
+                "block_rate": round(bucket.block_rate, 3),
+                "requests": bucket.requests,
+                "blocks": bucket.blocks,
+            }
+            for domain, bucket in buckets.items()
+        }
+
+    def format_metrics(self) -> str:
+        """One-line summary for progress output"""
+        return " | ".join(
+            f"{domain}: {m['rate']:.2f} req/s, {100 * m['block_rate']:.0f}% blocked"
+            for domain, m in self.metrics().items()
+        )
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter shared by every fetch engine"""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
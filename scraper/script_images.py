@@ -0,0 +1,149 @@
+"""
+🧾 Inline Script Image Extractor
+================================
+Product pages ship their gallery as data inside inline scripts, most
+importantly the ImageBlockATF block:
+
+    'colorImages': { 'initial': [{"hiRes": "...", "large": "...", "thumb": "...",
+                                  "main": {"<url>": [1500, 1500], ...}, "variant": "MAIN"}, ...] }
+    'imageGalleryData' : [{"mainUrl": "...", "dimensions": [1500, 1500]}, ...]
+
+extract_script_images() finds each payload once, decodes it as JSON and
+returns typed ImageRecords, instead of running a separate regex over the
+whole script body per field. Payloads that are not valid JSON fall back to
+one combined regex pass.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+COLOR_IMAGES_MARKERS = ("'colorImages'", '"colorImages"')
+GALLERY_MARKERS = ("'imageGalleryData'", '"imageGalleryData"')
+
+# Quoted object key followed by a colon, e.g.  'initial':  or  "Black" :
+KEY_PATTERN = re.compile(r'\s*,?\s*([\'"])(.*?)\1\s*:\s*')
+# Fallback for payloads json can't decode: every field of interest in one pass
+FIELD_PATTERN = re.compile(r'"(hiRes|large|thumb|mainUrl)"\s*:\s*"([^"]+)"')
+HIGH_RES_PATTERN = re.compile(r'_SL1\d{3}_|_SL\d{4}_')
+
+_decoder = json.JSONDecoder()
+
+
+@dataclass(frozen=True)
+class ImageRecord:
+    """One image URL found in a gallery payload"""
+    url: str
+    kind: str  # "hiRes", "large", "thumb", "main" (a sized rendition) or "mainUrl" (imageGalleryData)
+    variant: str = ""  # Gallery slot: MAIN, PT01, ...
+    color: str = ""  # colorImages key: 'initial' or a color/style name
+    width: int = 0
+    height: int = 0
+
+    @property
+    def is_high_res(self) -> bool:
+        """True for 1000px+ SL renditions"""
+        return bool(HIGH_RES_PATTERN.search(self.url))
+
+
+def has_image_payload(script: str) -> bool:
+    """Cheap pre-check before extract_script_images()"""
+    return any(marker in script for marker in COLOR_IMAGES_MARKERS + GALLERY_MARKERS)
+
+
+def extract_script_images(script: str) -> List[ImageRecord]:
+    """All image records from a script's colorImages / imageGalleryData payloads"""
+    records: List[ImageRecord] = []
+    decoded = True
+
+    start = _find_marker(script, COLOR_IMAGES_MARKERS)
+    if start is not None:
+        try:
+            records.extend(_color_images(script, start))
+        except ValueError:
+            decoded = False
+
+    start = _find_marker(script, GALLERY_MARKERS)
+    if start is not None:
+        try:
+            records.extend(_gallery_images(script, start))
+        except ValueError:
+            decoded = False
+
+    if not decoded:
+        # Unusual formatting: keep what was decoded, regex the rest
+        seen = {(record.url, record.kind) for record in records}
+        for kind, url in FIELD_PATTERN.findall(script):
+            if (url, kind) not in seen and url != "null":
+                seen.add((url, kind))
+                records.append(ImageRecord(url=url, kind=kind))
+    return records
+
+
+def _find_marker(script: str, markers) -> Optional[int]:
+    """Index just past the first marker's colon, or None"""
+    for marker in markers:
+        index = script.find(marker)
+        if index != -1:
+            colon = script.find(":", index + len(marker))
+            if colon != -1:
+                return colon + 1
+    return None
+
+
+def _skip_to(script: str, pos: int, char: str) -> int:
+    while pos < len(script) and script[pos].isspace():
+        pos += 1
+    if pos >= len(script) or script[pos] != char:
+        raise ValueError(f"expected {char!r} at {pos}")
+    return pos
+
+
+def _color_images(script: str, pos: int) -> Iterator[ImageRecord]:
+    """Walk the {'color': [entries], ...} object key by key"""
+    pos = _skip_to(script, pos, "{") + 1
+    while True:
+        while pos < len(script) and script[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(script) and script[pos] == "}":
+            return
+        key = KEY_PATTERN.match(script, pos)
+        if not key:
+            raise ValueError(f"expected a key at {pos}")
+        entries, pos = _decoder.raw_decode(script, key.end())
+        for entry in entries if isinstance(entries, list) else ():
+            if isinstance(entry, dict):
+                yield from _entry_records(entry, color=key.group(2))
+
+
+def _entry_records(entry: dict, color: str) -> Iterator[ImageRecord]:
+    variant = entry.get("variant") or ""
+    for kind in ("hiRes", "large", "thumb"):
+        url = entry.get(kind)
+        if isinstance(url, str) and url.startswith("http"):
+            yield ImageRecord(url=url, kind=kind, variant=variant, color=color)
+    renditions = entry.get("main")
+    if isinstance(renditions, dict):
+        for url, size in renditions.items():
+            width, height = _dimensions(size)
+            yield ImageRecord(url=url, kind="main", variant=variant, color=color,
+                              width=width, height=height)
+
+
+def _gallery_images(script: str, pos: int) -> Iterator[ImageRecord]:
+    pos = _skip_to(script, pos, "[")
+    entries, _ = _decoder.raw_decode(script, pos)
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get("mainUrl"), str):
+            continue
+        width, height = _dimensions(entry.get("dimensions"))
+        yield ImageRecord(url=entry["mainUrl"], kind="mainUrl", width=width, height=height)
+
+
+def _dimensions(size) -> tuple:
+    """(width, height) from a [w, h] pair, zeros when missing"""
+    if not isinstance(size, list):
+        return 0, 0
+    width, height = (size + [0, 0])[:2]
+    return int(width or 0), int(height or 0)
@@ -0,0 +1,254 @@
+"""
+📊 Columnar Snapshot Export
+===========================
+Flattens the product snapshot history (see snapshot_store.py) into a
+partitioned Parquet dataset, one row per snapshot, so price-history and
+ranking analytics scan a few typed columns instead of re-parsing nested
+JSON records.
+
+Layout:
+    scraped_data/parquet/
+        scraped_month=2026-01/part-<run>-0.parquet
+
+Columns: asin, scraped_at, title, brand, category (taxonomy), raw_category,
+subcategory, current_price, original_price, discount_percent, currency,
+rating, total_reviews, image_count, spec_count, in_stock.
+
+Exports are incremental: each run appends the snapshots written since the
+previous export (a watermark kept in the snapshot index); --full rewrites
+the dataset. Reading goes through pyarrow.dataset, so filters on asin,
+category or scraped_at prune partitions and row groups before any data is
+decoded. Requires the `pyarrow` package.
+
+Usage:
+    python snapshot_export.py                 # Append new snapshots
+    python snapshot_export.py --full --stats  # Rewrite, then print per-ASIN price stats
+
+    table = read_snapshots(asins=["B019HUU8TQ"], columns=["scraped_at", "current_price"])
+"""
+
+import argparse
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from snapshot_store import DEFAULT_SNAPSHOT_DIR, SnapshotStore
+from taxonomy import product_categories
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:  # Optional dependency
+    pa = pc = ds = None
+
+DEFAULT_EXPORT_DIR = os.path.join(os.path.dirname(DEFAULT_SNAPSHOT_DIR), "parquet")
+EXPORT_MARKER = "snapshot_export"
+BATCH_ROWS = 50_000
+PARTITION_COLUMN = "scraped_month"
+
+
+def _schema():
+    return pa.schema([
+        ("asin", pa.string()),
+        ("scraped_at", pa.timestamp("us")),
+        ("title", pa.string()),
+        ("brand", pa.string()),
+        ("category", pa.string()),
+        ("raw_category", pa.string()),
+        ("subcategory", pa.string()),
+        ("current_price", pa.float64()),
+        ("original_price", pa.float64()),
+        ("discount_percent", pa.float64()),
+        ("currency", pa.string()),
+        ("rating", pa.float64()),
+        ("total_reviews", pa.int64()),
+        ("image_count", pa.int32()),
+        ("spec_count", pa.int32()),
+        ("in_stock", pa.bool_()),
+        (PARTITION_COLUMN, pa.string()),
+    ])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Parquet export (pip install pyarrow)")
+
+
+def _float(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _int(value) -> Optional[int]:
+    number = _float(value)
+    return None if number is None else int(number)
+
+
+def _timestamp(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def flatten_snapshot(record: dict, category: Optional[str] = None) -> Dict:
+    """One export row from a nested product snapshot"""
+    price = record.get("price") or {}
+    reviews = record.get("reviews") if isinstance(record.get("reviews"), dict) else {}
+    scraped_at = _timestamp(record.get("scraped_at"))
+    rating = _float(record.get("rating"))
+    return {
+        "asin": record.get("asin"),
+        "scraped_at": scraped_at,
+        "title": record.get("title"),
+        "brand": record.get("brand"),
+        "category": category or record.get("category"),
+        "raw_category": record.get("raw_category"),
+        "subcategory": record.get("subcategory"),
+        "current_price": _float(price.get("current_price")),
+        "original_price": _float(price.get("original_price")),
+        "discount_percent": _float(price.get("discount_percent")),
+        "currency": price.get("currency"),
+        "rating": rating if rating is not None else _float(reviews.get("average_rating")),
+        "total_reviews": _int(reviews.get("total_reviews")),
+        "image_count": len(record.get("all_images") or []),
+        "spec_count": len(record.get("specifications") or {}),
+        "in_stock": record.get("in_stock"),
+        PARTITION_COLUMN: scraped_at.strftime("%Y-%m") if scraped_at else "unknown",
+    }
+
+
+def _record_batches(records: Iterable[dict], batch_rows: int) -> Iterator["pa.RecordBatch"]:
+    """Flattened snapshots as record batches of up to batch_rows rows"""
+    schema = _schema()
+    chunk: List[dict] = []
+
+    def flush():
+        categories = product_categories(chunk)
+        rows = [flatten_snapshot(record, category) for record, category in zip(chunk, categories)]
+        return pa.RecordBatch.from_pylist(rows, schema=schema)
+
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= batch_rows:
+            yield flush()
+            chunk = []
+    if chunk:
+        yield flush()
+
+
+def export_snapshots(store: Optional[SnapshotStore] = None, out_dir: str = DEFAULT_EXPORT_DIR,
+                     full: bool = False, batch_rows: int = BATCH_ROWS) -> int:
+    """Write snapshots to the Parquet dataset; returns the number of rows written"""
+    _require_pyarrow()
+    store = store or SnapshotStore()
+    since = None if full else store.get_marker(EXPORT_MARKER)
+    refs = store.refs_since(since)
+    if not refs:
+        return 0
+
+    records = (store.load(ref) for ref in refs)
+    written = 0
+
+    def counted(batches):
+        nonlocal written
+        for batch in batches:
+            written += batch.num_rows
+            yield batch
+
+    ds.write_dataset(
+        counted(_record_batches(records, batch_rows)),
+        out_dir,
+        schema=_schema(),
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive"),
+        basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+        existing_data_behavior="delete_matching" if full else "overwrite_or_ignore",
+    )
+    store.set_marker(EXPORT_MARKER, max(ref.scraped_at for ref in refs))
+    return written
+
+
+def open_dataset(out_dir: str = DEFAULT_EXPORT_DIR) -> "ds.Dataset":
+    """The exported snapshots as a lazily scanned pyarrow dataset"""
+    _require_pyarrow()
+    return ds.dataset(out_dir, format="parquet", partitioning="hive", schema=_schema())
+
+
+def read_snapshots(out_dir: str = DEFAULT_EXPORT_DIR, columns: Optional[List[str]] = None,
+                   asins: Optional[Iterable[str]] = None, category: Optional[str] = None,
+                   since: Optional[str] = None, until: Optional[str] = None) -> "pa.Table":
+    """Snapshot rows matching the filters, sorted by asin and scraped_at
+
+    since/until are ISO dates or datetimes; whole partitions outside the
+    range are skipped.
+    """
+    dataset = open_dataset(out_dir)
+    conditions = []
+    if asins is not None:
+        conditions.append(pc.field("asin").isin(list(asins)))
+    if category is not None:
+        conditions.append(pc.field("category") == category)
+    if since is not None:
+        conditions.append(pc.field(PARTITION_COLUMN) >= since[:7])
+        conditions.append(pc.field("scraped_at") >= pa.scalar(datetime.fromisoformat(since), pa.timestamp("us")))
+    if until is not None:
+        conditions.append(pc.field(PARTITION_COLUMN) <= until[:7])
+        conditions.append(pc.field("scraped_at") < pa.scalar(datetime.fromisoformat(until), pa.timestamp("us")))
+
+    condition = None
+    for part in conditions:
+        condition = part if condition is None else condition & part
+    table = dataset.to_table(columns=columns, filter=condition)
+    sort_keys = [(name, "ascending") for name in ("asin", "scraped_at") if name in table.column_names]
+    return table.sort_by(sort_keys) if sort_keys else table
+
+
+def latest_snapshots(table: "pa.Table") -> "pa.Table":
+    """Newest row per ASIN of a read_snapshots() table"""
+    newest = table.group_by("asin").aggregate([("scraped_at", "max")])
+    newest = newest.rename_columns(["asin", "scraped_at"])
+    return table.join(newest, keys=["asin", "scraped_at"], join_type="inner")
+
+
+def price_stats(table: "pa.Table") -> "pa.Table":
+    """Per-ASIN snapshot count and min/max/mean current price"""
+    priced = table.filter(pc.is_valid(table["current_price"]))
+    return priced.group_by("asin").aggregate([
+        ("current_price", "count"),
+        ("current_price", "min"),
+        ("current_price", "max"),
+        ("current_price", "mean"),
+        ("scraped_at", "max"),
+    ]).sort_by([("asin", "ascending")])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export product snapshots to Parquet")
+    parser.add_argument("--snapshots", default=DEFAULT_SNAPSHOT_DIR, help="Snapshot store directory")
+    parser.add_argument("--out", default=DEFAULT_EXPORT_DIR, help="Parquet dataset directory")
+    parser.add_argument("--full", action="store_true", help="Rewrite the dataset from every snapshot")
+    parser.add_argument("--stats", action="store_true", help="Print per-ASIN price statistics")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.snapshots)
+    rows = export_snapshots(store, args.out, full=args.full)
+    print(f"📊 Exported {rows} snapshots to {args.out}")
+
+    if args.stats:
+        table = read_snapshots(args.out, columns=["asin", "scraped_at", "current_price"])
+        stats = price_stats(table)
+        print(f"\n{'ASIN':<12} {'Snaps':>5} {'Min':>10} {'Max':>10} {'Mean':>10}")
+        for row in stats.to_pylist():
+            print(f"{row['asin']:<12} {row['current_price_count']:>5} {row['current_price_min']:>10.2f} "
+                  f"{row['current_price_max']:>10.2f} {row['current_price_mean']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
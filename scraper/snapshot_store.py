@@ -0,0 +1,510 @@
+"""
+📦 Product Snapshot Store
+=========================
+Append-only, segmented store for scraped product records, replacing one
+pretty-printed JSON file per scrape in scraped_data/. Every change to a
+product is kept, so price and rating history can be rebuilt later. save()
+compares a content hash of the record (ignoring scraped_at) with the
+product's latest snapshot and, when nothing changed, only logs a "seen at"
+heartbeat to seen.jsonl.
+
+Layout:
+    scraped_data/snapshots/
+        segment-000001.jsonl.zst   One compressed frame per record, appended
+        segment-000002.jsonl.zst   New segment once the current one is full
+        seen.jsonl                 One {"asin", "seen_at"} line per unchanged scrape
+        index.sqlite               asin, scraped_at -> segment, offset, length, content hash;
+                                   the latest snapshot per ASIN, heartbeats and watermarks
+
+Each record is compressed as its own zstd frame (gzip member without the
+`zstandard` package). Concatenated frames are still a valid .zst/.gz stream,
+so `zstdcat segment-000001.jsonl.zst` shows a segment as JSONL, while the
+index gives random access to any single snapshot by (segment, offset).
+The index is updated with every append; consumers such as
+scripts/import_products.py keep a watermark in it and read only the latest
+snapshots scraped since. If index.sqlite is lost or behind (interrupted
+run), it is rebuilt from the segments and seen.jsonl; only the consumer
+watermarks live in the index alone.
+
+Usage:
+    store = SnapshotStore()
+    store.save(product)                   # product["asin"] is the key; -> (ref, changed)
+    store.latest("B0CHX1W1XY")            # newest snapshot dict
+    store.history("B0CHX1W1XY")           # every snapshot, oldest first
+    store.iter_latest(since="2026-01-01")  # (ref, newest snapshot) per ASIN changed since
+
+    python snapshot_store.py --import-json ../scraped_data   # Migrate old JSON files
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from dataclasses import astuple, dataclass, replace
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from page_archive import compress, decompress
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+SCRIPT_DIR = os.path.dirname(__file__)
+DEFAULT_SNAPSHOT_DIR = os.path.join(SCRIPT_DIR, "..", "scraped_data", "snapshots")
+
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+SEGMENT_PATTERN = re.compile(r'^segment-(\d{6})\.jsonl\.(zst|gz)$')
+SEEN_LOG = "seen.jsonl"
+
+# Fields that change on every scrape without the product changing
+VOLATILE_FIELDS = frozenset({"scraped_at"})
+
+REF_COLUMNS = "asin, segment, offset, length, scraped_at, content_hash"
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    asin TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    scraped_at TEXT NOT NULL,
+    content_hash TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (segment, offset)
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_asin ON snapshots (asin, scraped_at);
+CREATE TABLE IF NOT EXISTS latest (
+    asin TEXT PRIMARY KEY,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    scraped_at TEXT NOT NULL,
+    content_hash TEXT NOT NULL DEFAULT '',
+    last_seen_at TEXT
+);
+CREATE INDEX IF NOT EXISTS latest_by_scraped_at ON latest (scraped_at);
+CREATE TABLE IF NOT EXISTS seen (
+    asin TEXT NOT NULL,
+    seen_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seen_by_asin ON seen (asin, seen_at);
+CREATE TABLE IF NOT EXISTS markers (
+    name TEXT PRIMARY KEY,
+    scraped_at TEXT NOT NULL
+);
+"""
+# Columns added after the first index.sqlite layout: table -> [(column, definition)]
+INDEX_MIGRATIONS = {
+    "snapshots": [("content_hash", "TEXT NOT NULL DEFAULT ''")],
+    "latest": [("content_hash", "TEXT NOT NULL DEFAULT ''"), ("last_seen_at", "TEXT")],
+}
+
+
+@dataclass(frozen=True)
+class SnapshotRef:
+    """Where one snapshot lives"""
+    asin: str
+    segment: str
+    offset: int
+    length: int
+    scraped_at: str
+    content_hash: str = ""
+
+
+def content_hash(record: dict) -> str:
+    """Hash of a record's canonical JSON, ignoring VOLATILE_FIELDS"""
+    content = {key: value for key, value in record.items() if key not in VOLATILE_FIELDS}
+    canonical = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _segment_name(number: int, codec: str) -> str:
+    return f"segment-{number:06d}.jsonl.{codec}"
+
+
+def _decompressor(codec: str):
+    """Streaming decompressor that stops at the end of one frame/member"""
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst snapshot segments")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+
+
+def _read_frames(data: bytes, codec: str, start: int = 0) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (offset, length, payload) for each complete frame in data[start:]"""
+    offset = start
+    while offset < len(data):
+        decompressor = _decompressor(codec)
+        try:
+            payload = decompressor.decompress(data[offset:])
+        except (zlib.error, getattr(zstandard, "ZstdError", zlib.error)):
+            return  # Torn tail from an interrupted write
+        if not decompressor.eof:
+            return
+        length = len(data) - offset - len(decompressor.unused_data)
+        yield offset, length, payload
+        offset += length
+
+
+class SnapshotStore:
+    """Append-only, compressed history of scraped product records"""
+
+    def __init__(self, root: str = DEFAULT_SNAPSHOT_DIR, segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        self.root = root
+        self.index_path = os.path.join(root, "index.sqlite")
+        self.seen_path = os.path.join(root, SEEN_LOG)
+        self.segment_max_bytes = segment_max_bytes
+        self._db: Optional[sqlite3.Connection] = None
+        self._segment_ends: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def append(self, record: dict) -> SnapshotRef:
+        """Store one product snapshot, even if unchanged; record["asin"] is required"""
+        return self._write(record, dedupe=False)[0]
+
+    def save(self, record: dict) -> Tuple[SnapshotRef, bool]:
+        """Store a snapshot only if it differs from the product's latest one
+
+        An unchanged record is logged as a "seen at" heartbeat instead.
+        Returns (ref, changed); for a heartbeat, ref is the existing snapshot.
+        """
+        return self._write(record, dedupe=True)
+
+    def _write(self, record: dict, dedupe: bool) -> Tuple[SnapshotRef, bool]:
+        asin = record.get("asin")
+        if not asin:
+            raise ValueError("snapshot record has no asin")
+        scraped_at = record.get("scraped_at") or datetime.now().isoformat()
+        digest = content_hash(record)
+
+        with self._lock:
+            db = self._connect_locked()
+            if dedupe:
+                row = db.execute(f"SELECT {REF_COLUMNS} FROM latest WHERE asin = ?", (asin,)).fetchone()
+                latest = SnapshotRef(*row) if row else None
+                if latest is not None and not latest.content_hash:
+                    # Indexed before snapshots were hashed
+                    latest = self._backfill_hash(db, latest)
+                if latest is not None and latest.content_hash == digest:
+                    # The log is the durable copy; the index rows are derived from it
+                    line = json.dumps({"asin": asin, "seen_at": scraped_at}, separators=(",", ":")) + "\n"
+                    with open(self.seen_path, 'a', encoding='utf-8') as f:
+                        f.write(line)
+                    with db:
+                        self._index_heartbeats(db, [(asin, scraped_at)])
+                    return latest, False
+
+            line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            frame, codec = compress(line.encode("utf-8"))
+            segment = self._writable_segment(codec, len(frame))
+            path = os.path.join(self.root, segment)
+            with open(path, 'ab') as f:
+                offset = f.tell()
+                f.write(frame)
+            self._segment_ends[segment] = offset + len(frame)
+
+            ref = SnapshotRef(asin=asin, segment=segment, offset=offset, length=len(frame),
+                              scraped_at=scraped_at, content_hash=digest)
+            with db:
+                self._index_refs(db, [ref])
+        return ref, True
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def asins(self) -> List[str]:
+        """Every ASIN with at least one snapshot"""
+        return [row[0] for row in self._query("SELECT asin FROM latest ORDER BY asin")]
+
+    def refs(self, asin: str) -> List[SnapshotRef]:
+        """Snapshot locations for an ASIN, oldest first"""
+        rows = self._query(f"SELECT {REF_COLUMNS} FROM snapshots WHERE asin = ? "
+                           "ORDER BY scraped_at, segment, offset", (asin,))
+        return [SnapshotRef(*row) for row in rows]
+
+    def latest_refs(self, since: Optional[str] = None) -> List[SnapshotRef]:
+        """Newest snapshot location per ASIN, optionally only those scraped after `since`"""
+        rows = self._query(f"SELECT {REF_COLUMNS} FROM latest WHERE scraped_at > ? "
+                           "ORDER BY scraped_at", (since or "",))
+        return [SnapshotRef(*row) for row in rows]
+
+    def refs_since(self, since: Optional[str] = None) -> List[SnapshotRef]:
+        """Every snapshot location scraped after `since`, in segment order"""
+        rows = self._query(f"SELECT {REF_COLUMNS} FROM snapshots WHERE scraped_at > ? "
+                           "ORDER BY segment, offset", (since or "",))
+        return [SnapshotRef(*row) for row in rows]
+
+    def load(self, ref: SnapshotRef) -> dict:
+        """Read one snapshot"""
+        with open(os.path.join(self.root, ref.segment), 'rb') as f:
+            f.seek(ref.offset)
+            frame = f.read(ref.length)
+        return json.loads(decompress(frame, self._codec(ref.segment)))
+
+    def latest(self, asin: str) -> Optional[dict]:
+        """Newest snapshot of a product"""
+        rows = self._query(f"SELECT {REF_COLUMNS} FROM latest WHERE asin = ?", (asin,))
+        return self.load(SnapshotRef(*rows[0])) if rows else None
+
+    def history(self, asin: str) -> List[dict]:
+        """All snapshots of a product, oldest first"""
+        return [self.load(ref) for ref in self.refs(asin)]
+
+    def iter_latest(self, since: Optional[str] = None) -> Iterator[Tuple[SnapshotRef, dict]]:
+        """(ref, snapshot) for the newest snapshot of each ASIN scraped after `since`"""
+        for ref in self.latest_refs(since):
+            yield ref, self.load(ref)
+
+    def iter_snapshots(self) -> Iterator[dict]:
+        """Every snapshot in write order, one sequential read per segment"""
+        for segment in self._segments():
+            with open(os.path.join(self.root, segment), 'rb') as f:
+                data = f.read()
+            for _, _, payload in _read_frames(data, self._codec(segment)):
+                yield json.loads(payload)
+
+    def count(self) -> int:
+        """Number of stored snapshots"""
+        return self._query("SELECT COUNT(*) FROM snapshots")[0][0]
+
+    def heartbeat_count(self) -> int:
+        """Number of scrapes that found a product unchanged"""
+        return self._query("SELECT COUNT(*) FROM seen")[0][0]
+
+    def last_seen(self, asin: str) -> Optional[str]:
+        """When a product was last scraped, changed or not"""
+        rows = self._query("SELECT MAX(scraped_at, COALESCE(last_seen_at, '')) FROM latest WHERE asin = ?", (asin,))
+        return rows[0][0] if rows else None
+
+    def seen_times(self, asin: str) -> List[str]:
+        """Every scrape of a product, snapshots and heartbeats, oldest first"""
+        rows = self._query("SELECT scraped_at FROM snapshots WHERE asin = ? "
+                           "UNION ALL SELECT seen_at FROM seen WHERE asin = ? ORDER BY 1", (asin, asin))
+        return [row[0] for row in rows]
+
+    # ------------------------------------------------------------------
+    # Consumer watermarks (e.g. the last snapshot import_products.py imported)
+    # ------------------------------------------------------------------
+    def get_marker(self, name: str) -> Optional[str]:
+        """scraped_at watermark saved by a consumer, or None"""
+        rows = self._query("SELECT scraped_at FROM markers WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    def set_marker(self, name: str, scraped_at: str):
+        """Save a consumer's scraped_at watermark"""
+        with self._lock:
+            db = self._connect_locked()
+            with db:
+                db.execute("INSERT INTO markers (name, scraped_at) VALUES (?, ?) "
+                           "ON CONFLICT(name) DO UPDATE SET scraped_at = excluded.scraped_at",
+                           (name, scraped_at))
+
+    def rebuild_index(self) -> int:
+        """Re-create the index from the segments and the heartbeat log; returns the snapshot count"""
+        with self._lock:
+            db = self._connect_locked()
+            self._segment_ends = {}
+            with db:
+                db.execute("DELETE FROM snapshots")
+                db.execute("DELETE FROM latest")
+                for segment in self._segments():
+                    self._index_refs(db, self._scan_segment(segment, 0))
+                self._reload_heartbeats(db)
+        return self.count()
+
+    def close(self):
+        """Close the index database"""
+        with self._lock:
+            db, self._db = self._db, None
+        if db is not None:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _codec(segment: str) -> str:
+        return segment.rsplit(".", 1)[-1]
+
+    def _segments(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if SEGMENT_PATTERN.match(name))
+
+    def _writable_segment(self, codec: str, frame_size: int) -> str:
+        """Current segment, or a new one when it is full or uses another codec"""
+        segments = self._segments()
+        if segments:
+            current = segments[-1]
+            number, current_codec = SEGMENT_PATTERN.match(current).groups()
+            end = self._segment_ends.get(current, 0)
+            if current_codec == codec and end + frame_size <= self.segment_max_bytes:
+                return current
+            return _segment_name(int(number) + 1, codec)
+        return _segment_name(1, codec)
+
+    def _scan_segment(self, segment: str, start: int) -> List[SnapshotRef]:
+        """Index the complete frames of a segment from `start`, dropping a torn tail"""
+        path = os.path.join(self.root, segment)
+        with open(path, 'rb') as f:
+            data = f.read()
+        refs = []
+        end = start
+        for offset, length, payload in _read_frames(data, self._codec(segment), start):
+            end = offset + length
+            try:
+                record = json.loads(payload)
+            except json.JSONDecodeError:
+                continue
+            refs.append(SnapshotRef(asin=record.get("asin", ""), segment=segment, offset=offset,
+                                    length=length, scraped_at=record.get("scraped_at", ""),
+                                    content_hash=content_hash(record)))
+        if end < len(data):
+            with open(path, 'r+b') as f:
+                f.truncate(end)
+        self._segment_ends[segment] = end
+        return refs
+
+    def _backfill_hash(self, db: sqlite3.Connection, ref: SnapshotRef) -> SnapshotRef:
+        ref = replace(ref, content_hash=content_hash(self.load(ref)))
+        with db:
+            db.execute("UPDATE snapshots SET content_hash = ? WHERE segment = ? AND offset = ?",
+                       (ref.content_hash, ref.segment, ref.offset))
+            db.execute("UPDATE latest SET content_hash = ? WHERE asin = ?", (ref.content_hash, ref.asin))
+        return ref
+
+    @staticmethod
+    def _index_refs(db: sqlite3.Connection, refs: List[SnapshotRef]):
+        """Add refs to the snapshot table and move each ASIN's latest pointer forward"""
+        rows = [astuple(ref) for ref in refs]
+        db.executemany(f"INSERT OR IGNORE INTO snapshots ({REF_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        db.executemany(f"INSERT INTO latest ({REF_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?) "
+                       "ON CONFLICT(asin) DO UPDATE SET segment = excluded.segment, "
+                       "offset = excluded.offset, length = excluded.length, "
+                       "scraped_at = excluded.scraped_at, content_hash = excluded.content_hash "
+                       "WHERE excluded.scraped_at >= latest.scraped_at", rows)
+
+    @staticmethod
+    def _index_heartbeats(db: sqlite3.Connection, heartbeats: List[Tuple[str, str]]):
+        db.executemany("INSERT INTO seen (asin, seen_at) VALUES (?, ?)", heartbeats)
+        db.executemany("UPDATE latest SET last_seen_at = MAX(COALESCE(last_seen_at, ''), ?) "
+                       "WHERE asin = ?", [(seen_at, asin) for asin, seen_at in heartbeats])
+
+    def _read_heartbeats(self) -> List[Tuple[str, str]]:
+        """(asin, seen_at) per complete line of the heartbeat log, dropping a torn tail"""
+        if not os.path.exists(self.seen_path):
+            return []
+        with open(self.seen_path, 'rb') as f:
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            with open(self.seen_path, 'r+b') as f:
+                f.truncate(end)
+        heartbeats = []
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("asin") and entry.get("seen_at"):
+                heartbeats.append((entry["asin"], entry["seen_at"]))
+        return heartbeats
+
+    def _reload_heartbeats(self, db: sqlite3.Connection):
+        """Replace the index's heartbeat rows with the log's"""
+        db.execute("DELETE FROM seen")
+        db.execute("UPDATE latest SET last_seen_at = NULL")
+        self._index_heartbeats(db, self._read_heartbeats())
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._connect_locked().execute(sql, params).fetchall()
+
+    def _connect_locked(self) -> sqlite3.Connection:
+        if self._db is not None:
+            return self._db
+
+        os.makedirs(self.root, exist_ok=True)
+        db = sqlite3.connect(self.index_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        with db:
+            for table, columns in INDEX_MIGRATIONS.items():
+                existing = {row[1] for row in db.execute(f"PRAGMA table_info({table})")}
+                for column, definition in columns:
+                    if existing and column not in existing:
+                        db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            db.executescript(INDEX_SCHEMA)
+
+        # Records written after the last indexed one (crash between the two writes),
+        # or every record when the index is new
+        for segment, end in db.execute("SELECT segment, MAX(offset + length) FROM snapshots GROUP BY segment"):
+            self._segment_ends[segment] = end
+        with db:
+            for segment in self._segments():
+                indexed_end = self._segment_ends.get(segment, 0)
+                if os.path.getsize(os.path.join(self.root, segment)) > indexed_end:
+                    self._index_refs(db, self._scan_segment(segment, indexed_end))
+
+            # Heartbeats logged but not indexed (crash, or a new index)
+            if not os.path.exists(self.seen_path):
+                # Index written before heartbeats were logged: its rows become the log
+                rows = db.execute("SELECT asin, seen_at FROM seen ORDER BY rowid").fetchall()
+                with open(self.seen_path, 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps({"asin": asin, "seen_at": seen_at}, separators=(",", ":")) + "\n"
+                                 for asin, seen_at in rows)
+            else:
+                with open(self.seen_path, 'rb') as f:
+                    logged = f.read().count(b"\n")
+                if logged != db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]:
+                    self._reload_heartbeats(db)
+
+        self._db = db
+        return db
+
+
+def import_json_files(store: SnapshotStore, data_dir: str) -> int:
+    """Save legacy scraped_data/*.json files to the store, oldest first;
+    returns how many were stored as changed snapshots"""
+    records = []
+    for name in os.listdir(data_dir):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(record, dict) and record.get("asin"):
+            records.append(record)
+    records.sort(key=lambda record: record.get("scraped_at") or "")
+    return sum(store.save(record)[1] for record in records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Product snapshot store maintenance")
+    parser.add_argument("--root", default=DEFAULT_SNAPSHOT_DIR, help="Snapshot store directory")
+    parser.add_argument("--import-json", metavar="DIR", help="Append legacy per-scrape JSON files from DIR")
+    parser.add_argument("--rebuild-index", action="store_true", help="Rebuild index.sqlite from the segments")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.root)
+    if args.import_json:
+        print(f"📥 Imported {import_json_files(store, args.import_json)} snapshots from {args.import_json}")
+    if args.rebuild_index:
+        print(f"🔁 Re-indexed {store.rebuild_index()} snapshots")
+
+    print(f"📦 {store.count()} snapshots of {len(store.asins())} products in {args.root} "
+          f"({store.heartbeat_count()} unchanged scrapes)")
+
+
+if __name__ == "__main__":
+    main()
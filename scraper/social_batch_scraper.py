@@ -13,21 +13,24 @@ Features:
 
 import os
 import json
-import time
 import re
 import csv
 import shutil
-import random
 from datetime import datetime
 from dataclasses import dataclass, asdict, field
 from typing import List, Dict, Optional, Any
 from collections import defaultdict
 
-from curl_cffi import requests as crequests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 from enhanced_ai_generator import EnhancedAIGenerator
+from fetch_engine import FetchEngine
+from http_session import SessionPool
+from http_cache import ResponseCache
+from image_urls import large_image_url
+from page_archive import PageArchive
+from rate_limiter import get_rate_limiter
 
 # Load environment variables
 load_dotenv()
@@ -56,12 +59,18 @@ HEADERS = {
 
 CONFIG = {
     "max_products": 50,  # Default max products to process
-    "min_delay": 2.0,
-    "max_delay": 4.0,
+    "requests_per_second": 0.33,  # amazon.ae page budget (images are not throttled)
     "max_images_per_product": 5,
     "priority_threshold": 100,  # Only process products with priority >= this
 }
 
+# Persistent per-host sessions (Amazon pages, image CDN, Ollama)
+SESSIONS = SessionPool(pool_size=CONFIG["max_images_per_product"])
+
+# Shared pooled fetcher, throttled by the process-wide rate limiter
+get_rate_limiter().configure("amazon.ae", CONFIG["requests_per_second"])
+ENGINE = FetchEngine(headers=HEADERS, sessions=SESSIONS, archive=PageArchive(), cache=ResponseCache())
+
 
 # ============================================================================
 # DATA STRUCTURES
@@ -95,16 +104,7 @@ class SocialContent:
 # ============================================================================
 def get_soup(url: str) -> Optional[BeautifulSoup]:
     """Fetch a URL and return BeautifulSoup object"""
-    try:
-        time.sleep(random.uniform(CONFIG["min_delay"], CONFIG["max_delay"]))
-        response = crequests.get(url, headers=HEADERS, impersonate="chrome110", timeout=30)
-        if response.status_code == 200:
-            return BeautifulSoup(response.content, "html.parser")
-        else:
-            print(f"  ❌ HTTP {response.status_code}")
-    except Exception as e:
-        print(f"  ❌ Error: {e}")
-    return None
+    return ENGINE.get_soup(url)
 
 
 def extract_product_data(soup: BeautifulSoup, url: str) -> Optional[Dict]:
@@ -221,9 +221,7 @@ def extract_images(soup: BeautifulSoup) -> List[Dict]:
                 src = img.get("src", "")
                 if src:
                     # Convert thumbnail to full size
-                    full_url = re.sub(r'_AC_US\d+_', '_AC_SL1500_', src)
-                    full_url = re.sub(r'_S[XY]\d+_', '_SL1500_', full_url)
-                    full_url = re.sub(r'_SS\d+_', '_SL1500_', full_url)
+                    full_url = large_image_url(src)
                     
                     if full_url not in seen_urls and full_url.startswith("http"):
                         images.append({"url": full_url, "type": "gallery"})
@@ -247,8 +245,8 @@ def download_image(url: str, folder: str, index: int) -> Optional[str]:
         filename = f"image_{index}.{ext}"
         filepath = os.path.join(folder, filename)
         
-        response = crequests.get(url, headers=HEADERS, impersonate="chrome110", timeout=30)
-        if response.status_code == 200:
+        response = ENGINE.fetch_sync(url, retries=1, page_type="image")
+        if response is not None:
             with open(filepath, 'wb') as f:
                 f.write(response.content)
             return filepath
@@ -379,29 +377,27 @@ class SocialContentGenerator:
     
     def __init__(self):
         try:
-            self.generator = EnhancedAIGenerator(OLLAMA_API_URL, OLLAMA_MODEL)
+            self.generator = EnhancedAIGenerator(OLLAMA_API_URL, OLLAMA_MODEL, sessions=SESSIONS)
             print("✅ AI Generator initialized")
         except Exception as e:
             print(f"⚠️ AI initialization failed: {e}")
             self.generator = None
     
     def generate_all_platforms(self, product_data: Dict) -> Dict[str, str]:
-        """Generate content for all social platforms"""
-        content = {}
-        
-        for platform in PLATFORMS:
+        """Generate content for all social platforms (one AI call for all of them)"""
+        if self.generator:
             try:
-                if self.generator:
-                    text = self.generator.generate_social_content(product_data, platform)
-                else:
-                    text = self._fallback_content(product_data, platform)
-                
-                content[platform] = text
-                print(f"    ✓ {platform.title()}: {len(text)} chars")
-                
+                content = self.generator.generate_all_social_content(product_data, PLATFORMS)
             except Exception as e:
-                print(f"    ❌ {platform.title()}: {e}")
+                print(f"    ❌ Social content: {e}")
+                content = {}
+        else:
+            content = {}
+        
+        for platform in PLATFORMS:
+            if not content.get(platform):
                 content[platform] = self._fallback_content(product_data, platform)
+            print(f"    ✓ {platform.title()}: {len(content[platform])} chars")
         
         return content
     
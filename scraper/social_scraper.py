@@ -1,14 +1,17 @@
 import os
 import json
-import time
 import re
 import csv
 from dotenv import load_dotenv
-from curl_cffi import requests as crequests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import shutil
 from enhanced_ai_generator import EnhancedAIGenerator
+from fetch_engine import FetchEngine
+from http_session import SessionPool
+from http_cache import ResponseCache
+from image_urls import large_image_url
+from script_images import extract_script_images, has_image_payload
+from page_archive import PageArchive
 
 # Load environment variables from .env file
 load_dotenv()
@@ -25,17 +28,18 @@ HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
 }
 
+# Persistent per-host sessions (Amazon pages, image CDN, Ollama)
+SESSIONS = SessionPool()
+
+# Shared pooled fetcher
+ENGINE = FetchEngine(headers=HEADERS, sessions=SESSIONS, archive=PageArchive(), cache=ResponseCache())
+
 def get_soup(url):
     """Fetch a URL and return BeautifulSoup object"""
-    try:
-        response = crequests.get(url, headers=HEADERS, impersonate="chrome110", timeout=30)
-        if response.status_code == 200:
-            return BeautifulSoup(response.content, "html.parser")
-        else:
-            print(f"❌ Failed to fetch {url}: Status {response.status_code}")
-    except Exception as e:
-        print(f"❌ Error fetching {url}: {e}")
-    return None
+    soup = ENGINE.get_soup(url)
+    if soup is None:
+        print(f"❌ Failed to fetch {url}")
+    return soup
 
 def extract_price(soup):
     """Extract price information from product page"""
@@ -145,10 +149,7 @@ def extract_all_images(soup):
                 if src:
                     # Amazon thumbnail URLs can be converted to full size
                     # e.g., _AC_US40_ -> _AC_SL1500_
-                    full_url = re.sub(r'_AC_US\d+_', '_AC_SL1500_', src)
-                    full_url = re.sub(r'_SX\d+_', '_SL1500_', full_url)
-                    full_url = re.sub(r'_SS\d+_', '_SL1500_', full_url)
-                    full_url = re.sub(r'_SY\d+_', '_SL1500_', full_url)
+                    full_url = large_image_url(src)
                     
                     if full_url not in seen_urls and full_url.startswith("http"):
                         images.append({"url": full_url, "type": "gallery", "alt": img.get("alt", "")})
@@ -157,18 +158,11 @@ def extract_all_images(soup):
         # Method 3: Alt images from script data
         scripts = soup.find_all("script", type="text/javascript")
         for script in scripts:
-            if script.string and "'colorImages'" in script.string:
-                try:
-                    # Extract image data from colorImages
-                    match = re.search(r"'colorImages':\s*\{([^}]+)\}", script.string)
-                    if match:
-                        img_match = re.findall(r'"hiRes"\s*:\s*"([^"]+)"', script.string)
-                        for url in img_match:
-                            if url not in seen_urls:
-                                images.append({"url": url, "type": "color_variant", "alt": ""})
-                                seen_urls.add(url)
-                except:
-                    pass
+            if script.string and has_image_payload(script.string):
+                for record in extract_script_images(script.string):
+                    if record.kind == "hiRes" and record.url not in seen_urls:
+                        images.append({"url": record.url, "type": "color_variant", "alt": ""})
+                        seen_urls.add(record.url)
         
         # Method 4: Fallback
         if len(images) == 0:
@@ -204,14 +198,14 @@ def download_image(url, folder, index):
         filepath = os.path.join(folder, filename)
         
         # Download
-        response = crequests.get(url, headers=HEADERS, impersonate="chrome110", timeout=30)
-        if response.status_code == 200:
+        response = ENGINE.fetch_sync(url, retries=1, page_type="image")
+        if response is not None:
             with open(filepath, 'wb') as f:
                 f.write(response.content)
             # print(f"  ⬇️ Downloaded: {filename}")
             return filepath
         else:
-            print(f"  ❌ Failed to download {url}: {response.status_code}")
+            print(f"  ❌ Failed to download {url}")
     except Exception as e:
         print(f"  ❌ Error downloading {url}: {e}")
     return None
@@ -221,7 +215,7 @@ def generate_enhanced_review(product_data):
     print("🤖 Generating Professional Review with AI...")
     
     try:
-        generator = EnhancedAIGenerator(OLLAMA_API_URL, OLLAMA_MODEL)
+        generator = EnhancedAIGenerator(OLLAMA_API_URL, OLLAMA_MODEL, sessions=SESSIONS)
         
         # Generate comprehensive review
         review = generator.generate_professional_review(product_data, language="en")
@@ -267,7 +261,7 @@ def generate_basic_review(product_data):
             "stream": False
         }
         
-        response = crequests.post(OLLAMA_API_URL, json=payload, impersonate="chrome110", timeout=300)
+        response = SESSIONS.session(OLLAMA_API_URL).post(OLLAMA_API_URL, json=payload, timeout=300)
         
         if response.status_code == 200:
             data = response.json()
@@ -298,7 +292,7 @@ def generate_social_content(product_data, platform="instagram"):
     print(f"📱 Generating {platform.title()} Content...")
     
     try:
-        generator = EnhancedAIGenerator(OLLAMA_API_URL, OLLAMA_MODEL)
+        generator = EnhancedAIGenerator(OLLAMA_API_URL, OLLAMA_MODEL, sessions=SESSIONS)
         content = generator.generate_social_content(product_data, platform)
         return content
     except Exception as e:
@@ -0,0 +1,408 @@
+"""
+🏷️ Product Category Taxonomy
+============================
+The one category table shared by the scraper and the Supabase scripts
+(scripts/import_products.py, scripts/seed_categories_stats.py):
+
+    CATEGORY_MAPPING       Amazon breadcrumb name -> category
+    SUBCATEGORY_KEYWORDS   Title keywords per category, for pages without
+                           a usable breadcrumb
+    CATEGORY_DETAILS       Arabic name, icon, color and descriptions per
+                           category, for the categories table
+    LEGACY_CATEGORY_DETAILS  The same for older category names already
+                           seeded into the categories table
+    IMPORT_CATEGORY_ALIASES  Exact breadcrumb segments the old importer
+                           mapped itself (import-only, not used at scrape time)
+    CATEGORY_ALIASES       Names older scraper/import versions stored
+
+Products are classified once, at scrape time, with classify(); the result is
+saved as the product's "category". Importers only re-classify records whose
+category isn't one of CATEGORIES: first by IMPORT_CATEGORY_ALIASES, then
+with the same compiled classifier.
+
+Usage:
+    from taxonomy import classify, canonical_category, category_details
+    classify("Kitchen - Container Sets", "Airtight food storage")   # "Home & Kitchen"
+    canonical_category("Baby Products")                              # "Baby & Kids"
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from category_classifier import DEFAULT_CATEGORY, CategoryClassifier
+
+# Category mapping for consistent product classification
+CATEGORY_MAPPING = {
+    # Electronics
+    "Electronics": "Electronics",
+    "Computers": "Electronics",
+    "Cell Phones & Accessories": "Electronics",
+    "Camera & Photo": "Electronics",
+    "Television & Video": "Electronics",
+    "Car Electronics": "Electronics",
+    "Wearable Technology": "Electronics",
+    "Headphones": "Electronics",
+    "Portable Audio & Video": "Electronics",
+    
+    # Home & Kitchen
+    "Home & Kitchen": "Home & Kitchen",
+    "Kitchen & Dining": "Home & Kitchen",
+    "Furniture": "Home & Kitchen",
+    "Bedding": "Home & Kitchen",
+    "Bath": "Home & Kitchen",
+    "Home Décor": "Home & Kitchen",
+    "Lighting & Ceiling Fans": "Home & Kitchen",
+    "Heating, Cooling & Air Quality": "Home & Kitchen",
+    
+    # Fashion
+    "Clothing, Shoes & Jewelry": "Fashion",
+    "Men's Fashion": "Fashion",
+    "Women's Fashion": "Fashion",
+    "Girls' Fashion": "Fashion",
+    "Boys' Fashion": "Fashion",
+    "Watches": "Fashion",
+    "Luggage & Travel Gear": "Fashion",
+    
+    # Beauty & Personal Care
+    "Beauty & Personal Care": "Beauty & Health",
+    "Health & Household": "Beauty & Health",
+    "Personal Care": "Beauty & Health",
+    "Skin Care": "Beauty & Health",
+    "Hair Care": "Beauty & Health",
+    
+    # Sports & Outdoors
+    "Sports & Outdoors": "Sports & Outdoors",
+    "Exercise & Fitness": "Sports & Outdoors",
+    "Outdoor Recreation": "Sports & Outdoors",
+    "Sports": "Sports & Outdoors",
+    
+    # Toys & Games
+    "Toys & Games": "Toys & Games",
+    "Games": "Toys & Games",
+    "Video Games": "Toys & Games",
+    
+    # Books & Media
+    "Books": "Books & Media",
+    "Kindle Store": "Books & Media",
+    "Movies & TV": "Books & Media",
+    "Music": "Books & Media",
+    
+    # Baby & Kids
+    "Baby": "Baby & Kids",
+    "Baby Products": "Baby & Kids",
+    "Kids' Fashion": "Baby & Kids",
+    
+    # Office & School
+    "Office Products": "Office & School",
+    "Office & School Supplies": "Office & School",
+    
+    # Automotive
+    "Automotive": "Automotive",
+    "Car & Motorbike": "Automotive",
+    
+    # Pet Supplies
+    "Pet Supplies": "Pet Supplies",
+    
+    # Tools & Home Improvement
+    "Tools & Home Improvement": "Tools & DIY",
+    "DIY & Tools": "Tools & DIY",
+    
+    # Grocery
+    "Grocery & Gourmet Food": "Grocery",
+    "Grocery": "Grocery",
+}
+
+# Subcategory keywords for better classification
+SUBCATEGORY_KEYWORDS = {
+    "Electronics": ["phone", "laptop", "computer", "tablet", "camera", "headphone", "speaker", "tv", "monitor", "keyboard", "mouse", "charger", "cable", "battery", "drone", "smartwatch", "earbuds", "gaming"],
+    "Home & Kitchen": ["kitchen", "furniture", "bedding", "curtain", "rug", "lamp", "table", "chair", "sofa", "mattress", "pillow", "cookware", "appliance", "blender", "coffee"],
+    "Fashion": ["shirt", "dress", "pants", "shoes", "jacket", "watch", "bag", "wallet", "sunglasses", "jewelry", "ring", "necklace", "bracelet"],
+    "Beauty & Health": ["skincare", "makeup", "shampoo", "cream", "lotion", "vitamin", "supplement", "toothbrush", "razor", "perfume"],
+    "Sports & Outdoors": ["fitness", "gym", "yoga", "running", "cycling", "camping", "hiking", "sports", "exercise", "weights"],
+    "Toys & Games": ["toy", "game", "puzzle", "lego", "doll", "action figure", "board game", "playstation", "xbox", "nintendo"],
+    "Books & Media": ["book", "novel", "kindle", "audiobook", "magazine"],
+    "Baby & Kids": ["baby", "infant", "toddler", "diaper", "stroller", "crib"],
+    "Automotive": ["car", "vehicle", "auto", "motor", "tire", "oil"],
+    "Pet Supplies": ["dog", "cat", "pet", "aquarium", "bird"],
+}
+
+# Display details for every category the classifier can return
+CATEGORY_DETAILS = {
+    "Electronics": {
+        "name_ar": "إلكترونيات",
+        "icon": "Laptop",
+        "color": "text-blue-400",
+        "description_en": "Latest gadgets and electronics",
+        "description_ar": "أحدث الأجهزة والإلكترونيات"
+    },
+    "Home & Kitchen": {
+        "name_ar": "المنزل والمطبخ",
+        "icon": "Home",
+        "color": "text-amber-400",
+        "description_en": "Home essentials and kitchen appliances",
+        "description_ar": "مستلزمات المنزل وأجهزة المطبخ"
+    },
+    "Fashion": {
+        "name_ar": "أزياء",
+        "icon": "Shirt",
+        "color": "text-pink-400",
+        "description_en": "Trendy fashion and accessories",
+        "description_ar": "أزياء عصرية وإكسسوارات"
+    },
+    "Beauty & Health": {
+        "name_ar": "جمال وعناية شخصية",
+        "icon": "Heart",
+        "color": "text-rose-400",
+        "description_en": "Beauty products and personal care",
+        "description_ar": "منتجات التجميل والعناية الشخصية"
+    },
+    "Sports & Outdoors": {
+        "name_ar": "رياضة وخارجية",
+        "icon": "Dumbbell",
+        "color": "text-lime-400",
+        "description_en": "Sports equipment and outdoor gear",
+        "description_ar": "معدات رياضية وخارجية"
+    },
+    "Toys & Games": {
+        "name_ar": "ألعاب",
+        "icon": "Gamepad2",
+        "color": "text-indigo-400",
+        "description_en": "Toys, games and gaming consoles",
+        "description_ar": "ألعاب وأجهزة ألعاب وإكسسوارات"
+    },
+    "Books & Media": {
+        "name_ar": "كتب",
+        "icon": "BookOpen",
+        "color": "text-emerald-400",
+        "description_en": "Books and e-readers",
+        "description_ar": "كتب وقارئات إلكترونية"
+    },
+    "Baby & Kids": {
+        "name_ar": "أطفال",
+        "icon": "Baby",
+        "color": "text-yellow-400",
+        "description_en": "Baby products and essentials",
+        "description_ar": "منتجات ومستلزمات الأطفال"
+    },
+    "Office & School": {
+        "name_ar": "مستلزمات المكتب والمدرسة",
+        "icon": "Briefcase",
+        "color": "text-sky-400",
+        "description_en": "Office and school supplies",
+        "description_ar": "مستلزمات المكتب والمدرسة"
+    },
+    "Automotive": {
+        "name_ar": "سيارات",
+        "icon": "Car",
+        "color": "text-slate-400",
+        "description_en": "Car accessories and tools",
+        "description_ar": "إكسسوارات وأدوات السيارات"
+    },
+    "Pet Supplies": {
+        "name_ar": "مستلزمات الحيوانات",
+        "icon": "PawPrint",
+        "color": "text-orange-400",
+        "description_en": "Pet food and accessories",
+        "description_ar": "طعام وإكسسوارات الحيوانات"
+    },
+    "Tools & DIY": {
+        "name_ar": "أدوات وتحسين المنزل",
+        "icon": "Wrench",
+        "color": "text-teal-400",
+        "description_en": "Tools and home improvement",
+        "description_ar": "أدوات وتحسين المنزل"
+    },
+    "Grocery": {
+        "name_ar": "بقالة",
+        "icon": "ShoppingBasket",
+        "color": "text-green-400",
+        "description_en": "Food and grocery essentials",
+        "description_ar": "مواد غذائية ومستلزمات البقالة"
+    },
+    DEFAULT_CATEGORY: {
+        "name_ar": "عام",
+        "icon": "Package",
+        "color": "text-gray-400",
+        "description_en": "General products",
+        "description_ar": "منتجات عامة"
+    }
+}
+
+# Display details for category names already in the categories table
+# (supabase/migrations/009_seed_categories_stats.sql); seeding must not
+# overwrite them with their canonical category's details
+LEGACY_CATEGORY_DETAILS = {
+    "Audio & Headphones": {
+        "name_ar": "سماعات وصوتيات",
+        "icon": "Headphones",
+        "color": "text-purple-400",
+        "description_en": "Premium audio equipment",
+        "description_ar": "معدات صوتية فاخرة"
+    },
+    "Watches": {
+        "name_ar": "ساعات",
+        "icon": "Watch",
+        "color": "text-rose-400",
+        "description_en": "Smartwatches and accessories",
+        "description_ar": "ساعات ذكية وإكسسوارات"
+    },
+    "Camera & Photo": {
+        "name_ar": "كاميرات وتصوير",
+        "icon": "Camera",
+        "color": "text-cyan-400",
+        "description_en": "Cameras and photography gear",
+        "description_ar": "كاميرات ومعدات تصوير"
+    },
+    "Gaming": {
+        "name_ar": "ألعاب",
+        "icon": "Gamepad2",
+        "color": "text-indigo-400",
+        "description_en": "Gaming consoles and accessories",
+        "description_ar": "أجهزة ألعاب وإكسسوارات"
+    },
+    "Beauty & Personal Care": {
+        "name_ar": "جمال وعناية شخصية",
+        "icon": "Heart",
+        "color": "text-rose-400",
+        "description_en": "Beauty products and personal care",
+        "description_ar": "منتجات التجميل والعناية الشخصية"
+    },
+    "Books": {
+        "name_ar": "كتب",
+        "icon": "BookOpen",
+        "color": "text-emerald-400",
+        "description_en": "Books and e-readers",
+        "description_ar": "كتب وقارئات إلكترونية"
+    },
+    "Baby": {
+        "name_ar": "أطفال",
+        "icon": "Baby",
+        "color": "text-yellow-400",
+        "description_en": "Baby products and essentials",
+        "description_ar": "منتجات ومستلزمات الأطفال"
+    },
+    "Tools & Home Improvement": {
+        "name_ar": "أدوات وتحسين المنزل",
+        "icon": "Wrench",
+        "color": "text-teal-400",
+        "description_en": "Tools and home improvement",
+        "description_ar": "أدوات وتحسين المنزل"
+    },
+}
+
+# Amazon.ae breadcrumb segments scripts/import_products.py used to map
+# itself. Matched exactly against a legacy record's breadcrumb segments,
+# never by substring, so scrape-time classification is unaffected.
+IMPORT_CATEGORY_ALIASES = {
+    "home": "Home & Kitchen",
+    "kitchen": "Home & Kitchen",
+    "string mops": "Home & Kitchen",
+    "beauty": "Beauty & Health",
+    "health": "Beauty & Health",
+    "toys": "Toys & Games",
+    "videogames": "Toys & Games",
+    "smart tvs": "Electronics",
+    "all-in-one digital cameras": "Electronics",
+    "audio": "Electronics",  # The old importer stored "Audio", a CATEGORY_ALIASES name
+}
+
+# Category names written by older scraper and import versions
+CATEGORY_ALIASES = {
+    "Audio": "Electronics",
+    "Audio & Headphones": "Electronics",
+    "Watches": "Fashion",
+    "Gaming": "Toys & Games",
+    "Beauty & Personal Care": "Beauty & Health",
+    "Books": "Books & Media",
+    "Baby": "Baby & Kids",
+    "Tools & Home Improvement": "Tools & DIY",
+}
+
+CATEGORIES: List[str] = list(CATEGORY_DETAILS)
+
+CLASSIFIER = CategoryClassifier(CATEGORY_MAPPING, SUBCATEGORY_KEYWORDS)
+
+
+def category_slug(name: str) -> str:
+    """URL slug of a category name ("Home & Kitchen" -> "home-kitchen")"""
+    return name.lower().replace(" & ", "-").replace(" ", "-")
+
+
+def _build_index() -> Dict[str, str]:
+    """Lowercased name/slug of every known category, alias and breadcrumb -> category"""
+    index: Dict[str, str] = {}
+    sources = [(name, name) for name in CATEGORIES]
+    sources += list(CATEGORY_ALIASES.items()) + list(CATEGORY_MAPPING.items())
+    for name, category in sources:
+        index.setdefault(name.lower(), category)
+        index.setdefault(category_slug(name), category)
+    return index
+
+
+CATEGORY_INDEX = _build_index()
+
+
+def canonical_category(name: Optional[str]) -> Optional[str]:
+    """Taxonomy category for a stored category name, or None if unknown"""
+    if not name:
+        return None
+    if name in CATEGORY_DETAILS:
+        return name
+    return CATEGORY_INDEX.get(name.strip().lower())
+
+
+def category_details(name: Optional[str]) -> Dict[str, str]:
+    """Display details for a category name, looked up by exact name (General's when unknown)
+
+    Aliases are deliberately not resolved: a legacy name keeps its own
+    details instead of its canonical category's.
+    """
+    details = CATEGORY_DETAILS.get(name) or LEGACY_CATEGORY_DETAILS.get(name)
+    return details or CATEGORY_DETAILS[DEFAULT_CATEGORY]
+
+
+def import_category_alias(raw_category: Optional[str]) -> Optional[str]:
+    """Category an old import mapped a breadcrumb to by one of its exact segments"""
+    if not raw_category:
+        return None
+    for segment in raw_category.split(" - "):
+        category = IMPORT_CATEGORY_ALIASES.get(segment.strip().lower())
+        if category:
+            return category
+    return None
+
+
+def classify(raw_category: Optional[str], title: str = "") -> str:
+    """Category for an Amazon breadcrumb ("Primary - Subcategory") and product title"""
+    return CLASSIFIER.classify(raw_category, title)
+
+
+def classify_many(items: Iterable[Tuple[Optional[str], str]]) -> List[str]:
+    """classify() for many (raw_category, title) pairs at once"""
+    return CLASSIFIER.classify_many(items)
+
+
+def product_category(product: dict) -> str:
+    """Category of a scraped product record: its stored category when the
+    scraper already classified it, otherwise classified from its breadcrumb"""
+    return product_categories([product])[0]
+
+
+def product_categories(products: Iterable[dict]) -> List[str]:
+    """product_category() for many records, classifying the leftovers in one batch"""
+    results: List[Optional[str]] = []
+    pending: List[int] = []
+    items: List[Tuple[Optional[str], str]] = []
+    for product in products:
+        category = canonical_category(product.get("category"))
+        if category is None or (category == DEFAULT_CATEGORY and product.get("raw_category")):
+            alias = import_category_alias(product.get("raw_category") or product.get("category"))
+            if alias:
+                results.append(alias)
+                continue
+            pending.append(len(results))
+            items.append((product.get("raw_category") or product.get("category"),
+                          product.get("title") or ""))
+        results.append(category)
+    for index, category in zip(pending, classify_many(items)):
+        results[index] = category
+    return results
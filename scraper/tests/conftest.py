@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scraper modules import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,72 @@
+import pytest
+
+from dom_index import DomIndex
+from parser_backends import available_backends, make_soup
+
+PAGE = """
+<html><body>
+  <div id="dp">
+    <span id="productTitle" class="a-size-large product-title-word-break"> Wireless Earbuds </span>
+    <div id="corePrice_feature_div">
+      <span class="a-price"><span class="a-offscreen">AED 99.00</span></span>
+      <span class="a-price a-text-price"><span class="a-offscreen">AED 149.00</span></span>
+    </div>
+    <ul id="feature-bullets" class="a-unordered-list">
+      <li><span class="a-list-item">Noise cancelling</span></li>
+      <li><span class="a-list-item">30h battery</span></li>
+    </ul>
+    <div id="altImages"><ul>
+      <li class="item"><img src="https://m.media-amazon.com/images/I/1._SS40_.jpg"></li>
+      <li class="item"><img src="https://m.media-amazon.com/images/I/2._SS40_.jpg"></li>
+    </ul></div>
+    <div data-hook="review"><span data-hook="review-body">Great sound</span></div>
+    <div data-hook="review"><span data-hook="review-body">Battery lasts</span></div>
+    <a id="bylineInfo" href="/stores/Brand">Visit the Brand Store</a>
+  </div>
+</body></html>
+"""
+
+FIND_CALLS = [
+    (("span",), {"id": "productTitle"}),
+    (("span", {"id": "productTitle"}), {}),
+    (("span", {"class": "a-offscreen"}), {}),
+    ((), {"class_": "a-price"}),
+    (("div", {"data-hook": "review"}), {}),
+    (("span",), {"attrs": {"data-hook": "review-body"}}),
+    (("a",), {"id": "bylineInfo"}),
+    (("ul",), {"id": "missing"}),
+    (("img",), {"src": True}),
+]
+
+SELECTORS = [
+    "#altImages li img",
+    "#feature-bullets li span.a-list-item",
+    "span.a-price.a-text-price span.a-offscreen",
+    "div#corePrice_feature_div .a-offscreen, #productTitle",
+    "[data-hook='review-body']",
+    "li:nth-of-type(2) img",
+]
+
+
+@pytest.fixture(params=available_backends())
+def soup(request):
+    return make_soup(PAGE, backend=request.param)
+
+
+@pytest.mark.parametrize("args, kwargs", FIND_CALLS)
+def test_find_matches_soup(soup, args, kwargs):
+    page = DomIndex(soup)
+    assert page.find(*args, **kwargs) is soup.find(*args, **kwargs)
+    assert page.find_all(*args, **kwargs) == soup.find_all(*args, **kwargs)
+
+
+@pytest.mark.parametrize("selector", SELECTORS)
+def test_select_matches_soup(soup, selector):
+    assert DomIndex(soup).select(selector) == soup.select(selector)
+
+
+def test_unsupported_lookups_fall_back_to_soup(soup):
+    page = DomIndex(soup)
+    assert page.find("span", string="Great sound") is soup.find("span", string="Great sound")
+    assert page.select("[data-hook='review-body']") == soup.select("[data-hook='review-body']")
+    assert page.fallbacks == 2
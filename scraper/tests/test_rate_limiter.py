@@ -0,0 +1,53 @@
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter, TokenBucket
+
+URL = "https://www.amazon.ae/dp/B000000001"
+
+
+@pytest.fixture
+def limiter():
+    limiter = RateLimiter(rates={})
+    limiter.configure("amazon.ae", rate=2.0, burst=1, jitter=0.0)
+    return limiter
+
+
+def test_503_halves_the_rate_and_delays_the_next_request(limiter):
+    bucket = limiter.bucket_for(URL)
+    limiter.reserve(URL)
+    limiter.record(URL, blocked=True)
+
+    assert bucket.rate == 2.0 * rate_limiter.DECREASE_FACTOR
+    assert limiter.metrics()["amazon.ae"]["blocks"] == 1
+    # Already-spaced requests are pushed out to the new, slower interval
+    assert limiter.reserve(URL) >= bucket.interval
+
+
+def test_blocks_within_the_cooldown_count_once(limiter):
+    for _ in range(3):
+        limiter.record(URL, blocked=True)
+    assert limiter.bucket_for(URL).rate == 2.0 * rate_limiter.DECREASE_FACTOR
+
+
+def test_rate_never_drops_below_min_rate(monkeypatch):
+    bucket = TokenBucket(rate=1.0, jitter=0.0, min_rate=0.4)
+    monkeypatch.setattr(rate_limiter, "DECREASE_COOLDOWN", 0.0)
+    for _ in range(5):
+        bucket.record(blocked=True)
+    assert bucket.rate == 0.4
+
+
+def test_success_streak_ramps_back_up(limiter):
+    bucket = limiter.bucket_for(URL)
+    limiter.record(URL, blocked=True)
+    slowed = bucket.rate
+    for _ in range(rate_limiter.SUCCESS_STREAK):
+        limiter.record(URL, blocked=False)
+    assert bucket.rate == pytest.approx(slowed + rate_limiter.INCREASE_STEP)
+
+
+def test_unthrottled_hosts_are_not_tracked(limiter):
+    limiter.record("https://example.com/", blocked=True)
+    assert limiter.reserve("https://example.com/") == 0.0
+    assert list(limiter.metrics()) == ["amazon.ae"]
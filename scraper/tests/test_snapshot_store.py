@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from snapshot_store import SnapshotStore
+
+
+def product(asin, scraped_at, price):
+    return {"asin": asin, "title": f"Product {asin}", "price": {"current_price": price},
+            "scraped_at": scraped_at}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.save(product("B000000001", "2026-01-01T10:00:00", 10.0))
+    store.save(product("B000000001", "2026-01-02T10:00:00", 10.0))  # Unchanged: heartbeat
+    store.save(product("B000000001", "2026-01-03T10:00:00", 12.5))
+    store.save(product("B000000002", "2026-01-02T11:00:00", 99.0))
+    store.set_marker("import_products", "2026-01-02T11:00:00")
+    yield store
+    store.close()
+
+
+def snapshot_state(store):
+    return {
+        "count": store.count(),
+        "heartbeats": store.heartbeat_count(),
+        "asins": store.asins(),
+        "latest": [store.latest(asin) for asin in store.asins()],
+        "history": [store.history(asin) for asin in store.asins()],
+        "seen": [store.seen_times(asin) for asin in store.asins()],
+        "last_seen": [store.last_seen(asin) for asin in store.asins()],
+    }
+
+
+def test_save_dedupes_unchanged_snapshots(store):
+    assert store.count() == 3
+    assert store.heartbeat_count() == 1
+    assert store.latest("B000000001")["price"]["current_price"] == 12.5
+    assert store.seen_times("B000000001") == [
+        "2026-01-01T10:00:00", "2026-01-02T10:00:00", "2026-01-03T10:00:00"]
+
+
+def test_index_is_rebuilt_after_deletion(store, tmp_path):
+    before = snapshot_state(store)
+    store.close()
+    os.remove(tmp_path / "index.sqlite")
+
+    reopened = SnapshotStore(str(tmp_path))
+    try:
+        assert snapshot_state(reopened) == before
+        # Markers live only in the index, so consumers start over
+        assert reopened.get_marker("import_products") is None
+    finally:
+        reopened.close()
+
+
+def test_rebuild_index_keeps_contents(store):
+    before = snapshot_state(store)
+    assert store.rebuild_index() == before["count"]
+    assert snapshot_state(store) == before
+
+
+def test_rebuild_drops_torn_tails(store, tmp_path):
+    before = snapshot_state(store)
+    store.close()
+    segment = next(name for name in os.listdir(tmp_path) if name.startswith("segment-"))
+    with open(tmp_path / segment, "ab") as f:
+        f.write(b"\x28\xb5\x2f")  # Start of a frame cut off mid-write
+    with open(tmp_path / "seen.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"asin":"B000000002","seen_')
+    os.remove(tmp_path / "index.sqlite")
+
+    reopened = SnapshotStore(str(tmp_path))
+    try:
+        assert snapshot_state(reopened) == before
+        reopened.save(product("B000000002", "2026-01-04T09:00:00", 95.0))
+        assert reopened.latest("B000000002")["price"]["current_price"] == 95.0
+    finally:
+        reopened.close()
@@ -5,12 +5,19 @@ Imports scraped products from JSON files into Supabase database
 """
 
 import os
+import sys
+import argparse
 import json
 import random
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Any, Optional, Set
 from datetime import datetime
 
+# Shared taxonomy and snapshot store live with the scraper
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scraper'))
+from snapshot_store import SnapshotStore
+from taxonomy import product_categories
+
 # You'll need to install: pip install supabase python-dotenv
 try:
     from supabase import create_client, Client
@@ -33,42 +40,10 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Category mapping for better organization
-CATEGORY_MAPPING = {
-    'electronics': 'Electronics',
-    'smart tvs': 'Electronics',
-    'all-in-one digital cameras': 'Electronics',
-    'home': 'Home & Kitchen',
-    'string mops': 'Home & Kitchen',
-    'kitchen': 'Home & Kitchen',
-    'beauty': 'Beauty & Health',
-    'health': 'Beauty & Health',
-    'fashion': 'Fashion',
-    'sports': 'Sports & Outdoors',
-    'toys': 'Toys & Games',
-    'baby': 'Baby & Kids',
-    'automotive': 'Automotive',
-    'pet': 'Pet Supplies',
-    'books': 'Books & Media',
-    'audio': 'Audio',
-}
-
-def map_category(raw_category: str) -> str:
-    """Map raw category to standardized category"""
-    if not raw_category:
-        return 'General'
-    
-    raw_lower = raw_category.lower()
-    for key, value in CATEGORY_MAPPING.items():
-        if key in raw_lower:
-            return value
-    
-    # Extract main category from "Category - Subcategory" format
-    if ' - ' in raw_category:
-        main_cat = raw_category.split(' - ')[0].strip()
-        return main_cat if main_cat else 'General'
-    
-    return raw_category if raw_category else 'General'
+# Snapshot store watermark: scraped_at up to which every snapshot has been handled
+IMPORT_MARKER = 'import_products'
+# ASINs per "already in the database?" query
+EXISTING_LOOKUP_CHUNK = 200
 
 def generate_ai_score(rating: float, reviews_count: int, has_discount: bool) -> int:
     """Generate AI recommendation score based on product metrics"""
@@ -119,12 +94,18 @@ def clean_brand(brand: str) -> str:
     brand = brand.replace('Brand: ', '').replace('Visit the ', '').replace(' Store', '').strip()
     return brand if brand else None
 
-def process_json_file(filepath: Path) -> Dict[str, Any]:
-    """Process a single JSON file and return product data"""
+def load_json_file(filepath: Path) -> Optional[Dict[str, Any]]:
+    """Read a scraped product JSON file"""
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
+            return json.load(f)
+    except Exception as e:
+        print(f"Error reading {filepath}: {e}")
+        return None
+
+def build_product(data: Dict[str, Any], category: str, source: Any = None) -> Dict[str, Any]:
+    """Turn a scraped product record into a products table row"""
+    try:
         # Extract price info
         price_data = data.get('price', {})
         current_price = price_data.get('current_price', 0)
@@ -156,7 +137,7 @@ def process_json_file(filepath: Path) -> Dict[str, Any]:
             'description_ar': generate_arabic_description(data.get('raw_desc', '')),
             'image_url': data.get('image_url'),
             'affiliate_link': data.get('affiliate_link'),
-            'category': map_category(data.get('raw_category', data.get('category', 'General'))),
+            'category': category,
             'subcategory': data.get('subcategory'),
             'brand': clean_brand(data.get('brand')),
             'price': current_price,
@@ -178,57 +159,93 @@ def process_json_file(filepath: Path) -> Dict[str, Any]:
         return product
     
     except Exception as e:
-        print(f"Error processing {filepath}: {e}")
+        print(f"Error processing {source or data.get('asin')}: {e}")
         return None
 
-def import_products(scraped_dir: str = 'scraped_data', batch_size: int = 20):
-    """Import all products from scraped_data directory"""
+def handled_marker(latest, handled_asins: Set[str], marker: Optional[str]) -> Optional[str]:
+    """Newest scraped_at the import can resume after without losing a snapshot
+
+    Snapshots come oldest first; the marker stops short of the first one whose
+    product was neither inserted nor already in the database.
+    """
+    pending = [ref.scraped_at for ref, _ in latest if ref.asin not in handled_asins]
+    for ref, _ in latest:
+        if pending and ref.scraped_at >= pending[0]:
+            break
+        marker = ref.scraped_at
+    return marker
+
+def import_products(scraped_dir: str = 'scraped_data', batch_size: int = 20, full: bool = False):
+    """Import products from the scraped_data snapshot store (and legacy JSON files)
+    
+    Only the newest snapshot per ASIN is read, and only snapshots scraped
+    since the last import unless full=True. The import only inserts: products
+    already in the database are left as they are, and their snapshots count
+    as handled. Snapshots that fail to build or insert are read again next run.
+    """
     scraped_path = Path(scraped_dir)
     
     if not scraped_path.exists():
         print(f"Error: Directory {scraped_dir} not found")
         return
     
-    # Get all JSON files
-    json_files = list(scraped_path.glob('*.json'))
-    print(f"Found {len(json_files)} JSON files")
+    # Latest snapshot of every product scraped since the last import
+    store = SnapshotStore(str(scraped_path / 'snapshots'))
+    since = None if full else store.get_marker(IMPORT_MARKER)
+    latest = list(store.iter_latest(since))
+    loaded = [(f"snapshot {ref.asin}", data) for ref, data in latest]
+    print(f"Found {len(loaded)} products in the snapshot store scraped since {since or 'the beginning'}")
     
-    # Process files and deduplicate by ASIN
+    # Plus JSON files written before the snapshot store existed (first or full import only)
+    if since is None:
+        json_files = list(scraped_path.glob('*.json'))
+        print(f"Found {len(json_files)} JSON files")
+        loaded += [(filepath, load_json_file(filepath)) for filepath in json_files]
+    loaded = [(source, data) for source, data in loaded if data is not None]
+    
+    # Process records and deduplicate by ASIN
     products_by_asin: Dict[str, Dict] = {}
+    scraped_at_by_asin: Dict[str, str] = {}
+    
+    # Scraped records are already classified; only older ones get classified here, in one batch
+    categories = product_categories([data for _, data in loaded])
     
-    for filepath in json_files:
-        product = process_json_file(filepath)
+    for (source, data), category in zip(loaded, categories):
+        product = build_product(data, category, source)
         if product and product.get('asin'):
             asin = product['asin']
-            # Keep the latest version (higher timestamp in filename)
-            if asin not in products_by_asin:
+            # Keep the latest version
+            scraped_at = data.get('scraped_at') or ''
+            if asin not in products_by_asin or scraped_at > scraped_at_by_asin[asin]:
                 products_by_asin[asin] = product
-            # Could compare timestamps here if needed
+                scraped_at_by_asin[asin] = scraped_at
     
     print(f"Found {len(products_by_asin)} unique products")
     
-    # Get existing ASINs to avoid duplicates
-    existing = supabase.table('products').select('asin').execute()
-    existing_asins = {p['asin'] for p in existing.data if p.get('asin')}
-    print(f"Found {len(existing_asins)} existing products in database")
+    # Get existing ASINs to avoid duplicates (only among the candidates)
+    candidate_asins = list(products_by_asin)
+    existing_asins = set()
+    for i in range(0, len(candidate_asins), EXISTING_LOOKUP_CHUNK):
+        chunk = candidate_asins[i:i + EXISTING_LOOKUP_CHUNK]
+        existing = supabase.table('products').select('asin').in_('asin', chunk).execute()
+        existing_asins.update(p['asin'] for p in existing.data if p.get('asin'))
+    print(f"Found {len(existing_asins)} of them already in database")
     
     # Filter out existing products
     new_products = [p for asin, p in products_by_asin.items() if asin not in existing_asins]
     print(f"Importing {len(new_products)} new products")
     
-    if not new_products:
-        print("No new products to import")
-        return
-    
     # Import in batches
     imported = 0
     errors = 0
+    inserted_asins: Set[str] = set()
     
     for i in range(0, len(new_products), batch_size):
         batch = new_products[i:i + batch_size]
         try:
             result = supabase.table('products').insert(batch).execute()
             imported += len(batch)
+            inserted_asins.update(p['asin'] for p in batch)
             print(f"Imported batch {i//batch_size + 1}: {len(batch)} products")
         except Exception as e:
             print(f"Error importing batch: {e}")
@@ -237,13 +254,25 @@ def import_products(scraped_dir: str = 'scraped_data', batch_size: int = 20):
                 try:
                     supabase.table('products').insert(product).execute()
                     imported += 1
+                    inserted_asins.add(product['asin'])
                 except Exception as e2:
                     print(f"Error importing {product.get('asin')}: {e2}")
                     errors += 1
     
-    print(f"\n=== Import Complete ===")
-    print(f"Imported: {imported} products")
-    print(f"Errors: {errors}")
+    if new_products:
+        print(f"\n=== Import Complete ===")
+        print(f"Imported: {imported} products")
+        print(f"Errors: {errors}")
+    else:
+        print("No new products to import")
+    
+    # Next run starts after the snapshots handled here; failed ones are retried
+    marker = handled_marker(latest, existing_asins | inserted_asins, since)
+    if marker != since:
+        store.set_marker(IMPORT_MARKER, marker)
+    
+    if not new_products:
+        return
     
     # Update site stats
     try:
@@ -253,4 +282,8 @@ def import_products(scraped_dir: str = 'scraped_data', batch_size: int = 20):
         print(f"Could not update stats: {e}")
 
 if __name__ == '__main__':
-    import_products()
+    parser = argparse.ArgumentParser(description="Import scraped products into Supabase")
+    parser.add_argument('--scraped-dir', default='scraped_data', help="Directory holding snapshots/ and legacy JSON")
+    parser.add_argument('--full', action='store_true', help="Re-read every product, ignoring the last import")
+    args = parser.parse_args()
+    import_products(args.scraped_dir, full=args.full)
@@ -1,6 +1,12 @@
 import os
+import sys
+from pathlib import Path
 from supabase import create_client, Client
 
+# Shared category taxonomy lives with the scraper
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scraper'))
+from taxonomy import category_details, category_slug
+
 # Get Supabase credentials from environment
 SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
 SUPABASE_KEY = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
@@ -12,118 +18,6 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Category mappings with icons and colors
-CATEGORY_CONFIG = {
-    "Electronics": {
-        "name_ar": "إلكترونيات",
-        "icon": "Laptop",
-        "color": "text-blue-400",
-        "description_en": "Latest gadgets and electronics",
-        "description_ar": "أحدث الأجهزة والإلكترونيات"
-    },
-    "Home & Kitchen": {
-        "name_ar": "المنزل والمطبخ",
-        "icon": "Home",
-        "color": "text-amber-400",
-        "description_en": "Home essentials and kitchen appliances",
-        "description_ar": "مستلزمات المنزل وأجهزة المطبخ"
-    },
-    "Fashion": {
-        "name_ar": "أزياء",
-        "icon": "Shirt",
-        "color": "text-pink-400",
-        "description_en": "Trendy fashion and accessories",
-        "description_ar": "أزياء عصرية وإكسسوارات"
-    },
-    "Audio & Headphones": {
-        "name_ar": "سماعات وصوتيات",
-        "icon": "Headphones",
-        "color": "text-purple-400",
-        "description_en": "Premium audio equipment",
-        "description_ar": "معدات صوتية فاخرة"
-    },
-    "Watches": {
-        "name_ar": "ساعات",
-        "icon": "Watch",
-        "color": "text-rose-400",
-        "description_en": "Smartwatches and accessories",
-        "description_ar": "ساعات ذكية وإكسسوارات"
-    },
-    "Camera & Photo": {
-        "name_ar": "كاميرات وتصوير",
-        "icon": "Camera",
-        "color": "text-cyan-400",
-        "description_en": "Cameras and photography gear",
-        "description_ar": "كاميرات ومعدات تصوير"
-    },
-    "Gaming": {
-        "name_ar": "ألعاب",
-        "icon": "Gamepad2",
-        "color": "text-indigo-400",
-        "description_en": "Gaming consoles and accessories",
-        "description_ar": "أجهزة ألعاب وإكسسوارات"
-    },
-    "Sports & Outdoors": {
-        "name_ar": "رياضة وخارجية",
-        "icon": "Dumbbell",
-        "color": "text-lime-400",
-        "description_en": "Sports equipment and outdoor gear",
-        "description_ar": "معدات رياضية وخارجية"
-    },
-    "Beauty & Personal Care": {
-        "name_ar": "جمال وعناية شخصية",
-        "icon": "Heart",
-        "color": "text-rose-400",
-        "description_en": "Beauty products and personal care",
-        "description_ar": "منتجات التجميل والعناية الشخصية"
-    },
-    "Books": {
-        "name_ar": "كتب",
-        "icon": "BookOpen",
-        "color": "text-emerald-400",
-        "description_en": "Books and e-readers",
-        "description_ar": "كتب وقارئات إلكترونية"
-    },
-    "Baby": {
-        "name_ar": "أطفال",
-        "icon": "Baby",
-        "color": "text-yellow-400",
-        "description_en": "Baby products and essentials",
-        "description_ar": "منتجات ومستلزمات الأطفال"
-    },
-    "Automotive": {
-        "name_ar": "سيارات",
-        "icon": "Car",
-        "color": "text-slate-400",
-        "description_en": "Car accessories and tools",
-        "description_ar": "إكسسوارات وأدوات السيارات"
-    },
-    "Pet Supplies": {
-        "name_ar": "مستلزمات الحيوانات",
-        "icon": "PawPrint",
-        "color": "text-orange-400",
-        "description_en": "Pet food and accessories",
-        "description_ar": "طعام وإكسسوارات الحيوانات"
-    },
-    "Tools & Home Improvement": {
-        "name_ar": "أدوات وتحسين المنزل",
-        "icon": "Wrench",
-        "color": "text-teal-400",
-        "description_en": "Tools and home improvement",
-        "description_ar": "أدوات وتحسين المنزل"
-    },
-    "General": {
-        "name_ar": "عام",
-        "icon": "Package",
-        "color": "text-gray-400",
-        "description_en": "General products",
-        "description_ar": "منتجات عامة"
-    }
-}
-
-def create_slug(name):
-    return name.lower().replace(" & ", "-").replace(" ", "-")
-
 def seed_categories():
     print("Fetching distinct categories from products...")
     
@@ -148,12 +42,12 @@ def seed_categories():
     order = 1
     
     for cat_name in sorted(categories):
-        config = CATEGORY_CONFIG.get(cat_name, CATEGORY_CONFIG["General"])
+        config = category_details(cat_name)
         
         category_entry = {
             'name_en': cat_name,
             'name_ar': config['name_ar'],
-            'slug': create_slug(cat_name),
+            'slug': category_slug(cat_name),
             'description_en': config['description_en'],
             'description_ar': config['description_ar'],
             'icon': config['icon'],